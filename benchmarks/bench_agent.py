@@ -0,0 +1,253 @@
+"""End-to-end task time of the agent loops against the local model stub.
+
+Runs main.py and/or gemini_implement.py as subprocesses in a scratch folder,
+feeds them scripted queries on stdin, and lets the model stub answer with the
+scripted steps of each scenario (the Flask hello-world and COVID dashboard
+examples from the prompts, adapted to run offline). The per-span trace of
+each run (see tracing.py) gives task time, model calls per task, the time
+spent in the model, in tools and in the loop itself, and the prompt tokens
+per task with the share the (emulated) provider prompt cache served.
+
+    python benchmarks/bench_agent.py --loops main,gemini --repeat 3 --token-rate 80
+    python benchmarks/bench_agent.py --output results.json
+    python benchmarks/bench_agent.py --baseline results.json   # flag regressions
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mycursor.hedging import percentile
+from model_stub import serve
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+LOOPS = {
+    # script, shell tool, exit command
+    "main": ("main.py", "exec_command", "thanks"),
+    "gemini": ("gemini_implement.py", "run_command", "bye"),
+}
+
+APP = "from flask import Flask\n\napp = Flask(__name__)\n\n\n@app.route('/')\ndef hello():\n    return 'Hello, World!'\n"
+DASH_APP = (
+    "import dash\nfrom dash import dcc, html\nimport pandas as pd\n\n"
+    "df = pd.read_csv('data/covid.csv')\napp = dash.Dash(__name__)\n\n\n"
+    "def layout():\n    return html.Div([dcc.Dropdown(sorted(df.country.unique()), id='country'), dcc.Graph(id='trend')])\n\n\n"
+    "app.layout = layout()\n\nif __name__ == '__main__':\n    app.run_server(debug=True)\n"
+)
+CSV = "date,country,cases\n" + "".join(
+    f"2020-03-{day:02d},{country},{day * factor}\n"
+    for day in range(1, 31)
+    for country, factor in (("India", 7), ("Italy", 11), ("Brazil", 5))
+)
+
+
+def scenarios(shell):
+    """The scripted scenarios, with ``shell`` as the name of the loop's shell tool."""
+    return [
+        {
+            "name": "flask_hello",
+            "query": "Create a basic Flask backend with a route that says 'Hello, World!' in a file named 'app.py'.",
+            "replies": [
+                {"steps": [
+                    {"step": "plan", "content": "Create hello_flask with app.py and requirements.txt."},
+                    {"step": "action", "function": "edit_file", "independent": True,
+                     "input": {"file_name": "app.py", "folder_path": "./hello_flask", "content": APP}},
+                    {"step": "action", "function": "edit_file", "independent": True,
+                     "input": {"file_name": "requirements.txt", "folder_path": "./hello_flask", "content": "flask\n"}},
+                ]},
+                {"steps": [
+                    {"step": "plan", "content": "Check the Python version the project will use."},
+                    {"step": "action", "function": shell, "input": "python --version"},
+                ]},
+                {"step": "action", "function": "find_symbol",
+                 "input": {"name": "hello", "file_name": "app.py", "folder_path": "./hello_flask"}},
+                {"step": "action", "function": "search_replace",
+                 "input": {"file_name": "app.py", "folder_path": "./hello_flask",
+                           "search": "'Hello, World!'", "replace": "'Hello, World!\\n'"}},
+                {"step": "output", "content": "Created hello_flask/app.py. Run it with `flask run` from the project folder."},
+            ],
+        },
+        {
+            "name": "covid_dashboard",
+            "query": "Build a dashboard using Dash to show COVID-19 trends from a CSV file with line charts and filters.",
+            "replies": [
+                {"steps": [
+                    {"step": "plan", "content": "Create covid_dashboard with the data, the Dash app and a README."},
+                    {"step": "action", "function": "edit_file", "independent": True,
+                     "input": {"file_name": "covid.csv", "folder_path": "./covid_dashboard/data", "content": CSV}},
+                    {"step": "action", "function": "edit_file", "independent": True,
+                     "input": {"file_name": "app.py", "folder_path": "./covid_dashboard", "content": DASH_APP}},
+                    {"step": "action", "function": "edit_file", "independent": True,
+                     "input": {"file_name": "README.md", "folder_path": "./covid_dashboard",
+                               "content": "# COVID Dashboard\n\nRun with `python app.py`.\n"}},
+                ]},
+                {"steps": [
+                    {"step": "plan", "content": "Check the CSV loads and count its rows."},
+                    {"step": "action", "function": shell,
+                     "input": "python -c \"import csv; print(len(list(csv.DictReader(open('covid_dashboard/data/covid.csv')))))\""},
+                ]},
+                {"step": "action", "function": "read_file",
+                 "input": {"file_name": "app.py", "folder_path": "./covid_dashboard", "start_line": 1, "end_line": 10}},
+                {"step": "action", "function": "replace_lines",
+                 "input": {"file_name": "app.py", "folder_path": "./covid_dashboard", "start_line": 13, "end_line": 13,
+                           "content": "app.layout = layout\n"}},
+                {"step": "output", "content": "The dashboard is in covid_dashboard/. Run it using the README instructions."},
+            ],
+        },
+    ]
+
+
+def run_loop(loop, args, workdir):
+    script, shell, exit_command = LOOPS[loop]
+    tasks = scenarios(shell)
+    server = serve(0, token_delay=1.0 / args.token_rate, first_token_delay=args.latency, scenarios=tasks)
+    base = f"http://127.0.0.1:{server.server_port}"
+    trace = os.path.join(workdir, "trace.jsonl")
+    env = {
+        **os.environ,
+        "OPENAI_BASE_URL": f"{base}/v1",
+        "GEMINI_BASE_URL": base,
+        "OPENAPI_KEY": "stub",
+        "GEMINI_API_KEY": "stub",
+        "MYCURSOR_CACHE": "0",
+        "MYCURSOR_RPM": "1000000",
+        "MYCURSOR_SESSION": "bench",
+        "MYCURSOR_TRACE": "1",
+        "MYCURSOR_TRACE_FILE": trace,
+        "MYCURSOR_METRICS_FILE": os.path.join(workdir, "metrics.prom"),
+        "PYTHONIOENCODING": "utf-8",
+    }
+    queries = [task["query"] for _ in range(args.repeat) for task in tasks]
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            [sys.executable, os.path.join(ROOT, script)],
+            cwd=workdir,
+            env=env,
+            input="\n".join(queries + [exit_command]) + "\n",
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            timeout=args.timeout,
+        )
+    finally:
+        server.shutdown()
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{script} exited with {proc.returncode}:\n{proc.stderr[-2000:]}")
+    names = [task["name"] for _ in range(args.repeat) for task in tasks]
+    return task_metrics(trace, names), wall, server.state.calls
+
+
+def task_metrics(trace, names):
+    """Per-query totals from a trace: task time, calls and time per stage."""
+    with open(trace, encoding="utf-8") as f:
+        spans = [json.loads(line) for line in f if line.strip()]
+    by_trace = {}
+    for span in spans:
+        by_trace.setdefault(span["trace"], []).append(span)
+    queries = sorted((span for span in spans if span["name"] == "query"), key=lambda span: span["start"])
+    results = []
+    for name, query in zip(names, queries):
+        stages = {}
+        prompt = cached = 0
+        for span in by_trace[query["trace"]]:
+            if span["name"] != "query":
+                stages[span["name"]] = stages.get(span["name"], 0.0) + span["duration"]
+            prompt += span.get("prompt_tokens") or 0
+            cached += span.get("cached_prompt_tokens") or 0
+        results.append({
+            "scenario": name,
+            "task": query["duration"],
+            "calls": query.get("calls", 0),
+            "completed": query.get("completed", False),
+            "model": stages.get("model", 0.0),
+            "tool": stages.get("tool", 0.0),
+            "parse": stages.get("parse", 0.0),
+            "log": stages.get("log", 0.0),
+            "prompt_tokens": prompt,
+            "cached_tokens": cached,
+        })
+    return results
+
+
+def aggregate(results):
+    summary = {}
+    for result in results:
+        summary.setdefault(result["scenario"], []).append(result)
+    rows = {}
+    for name, runs in summary.items():
+        tasks = [run["task"] for run in runs]
+        tool = sum(run["tool"] for run in runs)
+        rows[name] = {
+            "runs": len(runs),
+            "completed": sum(run["completed"] for run in runs),
+            "task_p50": percentile(tasks, 50),
+            "task_p95": percentile(tasks, 95),
+            "calls_per_task": sum(run["calls"] for run in runs) / len(runs),
+            "model_per_task": sum(run["model"] for run in runs) / len(runs),
+            "tool_per_task": tool / len(runs),
+            "tool_share": tool / sum(tasks) if sum(tasks) else 0.0,
+            "loop_per_task": sum(run["parse"] + run["log"] for run in runs) / len(runs),
+            "prompt_per_task": sum(run["prompt_tokens"] for run in runs) / len(runs),
+            "cached_share": sum(run["cached_tokens"] for run in runs) / (sum(run["prompt_tokens"] for run in runs) or 1),
+        }
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--loops", default="main,gemini")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of every scenario per loop")
+    parser.add_argument("--token-rate", type=float, default=100.0, help="stub output tokens per second")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub time to first token (s)")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    report = {"config": {"token_rate": args.token_rate, "latency": args.latency, "repeat": args.repeat}, "loops": {}}
+    for loop in args.loops.split(","):
+        with tempfile.TemporaryDirectory() as workdir:
+            results, wall, calls = run_loop(loop, args, workdir)
+        report["loops"][loop] = {"wall": wall, "stub_calls": calls, "scenarios": aggregate(results)}
+        print(f"\n{loop}: {wall:.2f}s wall for {len(results)} tasks, {calls} stub calls")
+        print(f"{'scenario':<18}{'done':>6}{'p50':>8}{'p95':>8}{'calls':>7}{'model':>8}{'tools':>8}{'tool %':>8}{'loop':>8}{'prompt':>8}{'cached':>8}")
+        for name, row in report["loops"][loop]["scenarios"].items():
+            print(
+                f"{name:<18}{row['completed']:>3}/{row['runs']:<2}{row['task_p50']:>7.2f}s{row['task_p95']:>7.2f}s"
+                f"{row['calls_per_task']:>7.1f}{row['model_per_task']:>7.2f}s{row['tool_per_task']:>7.2f}s"
+                f"{row['tool_share'] * 100:>7.1f}%{row['loop_per_task'] * 1000:>6.0f}ms"
+                f"{row['prompt_per_task']:>8.0f}{row['cached_share'] * 100:>7.0f}%"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = 0
+        for loop, data in report["loops"].items():
+            for name, row in data["scenarios"].items():
+                old = baseline.get("loops", {}).get(loop, {}).get("scenarios", {}).get(name)
+                if not old:
+                    continue
+                for key in ("task_p50", "calls_per_task"):
+                    if row[key] > old[key] * (1 + args.tolerance):
+                        regressions += 1
+                        print(f"🔴 {loop}/{name}: {key} {old[key]:.2f} -> {row[key]:.2f}")
+        print("✅ no regressions" if not regressions else f"🔴 {regressions} regressions")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
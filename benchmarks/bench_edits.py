@@ -0,0 +1,75 @@
+"""Output tokens and wall time of a small edit: full rewrite vs the patch tools.
+
+Builds a generated Flask app of --lines lines, changes one route, and
+measures for each edit tool the tokens of the action the model has to emit
+and the time to produce it (at --tokens-per-second) plus apply it.
+
+    python benchmarks/bench_edits.py --lines 400 --tokens-per-second 60
+"""
+import argparse
+import difflib
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mycursor.context_window import count_tokens
+from mycursor.edit_tools import apply_patch, edit_file, replace_lines, search_replace
+
+
+def generated_app(lines):
+    body = ["from flask import Flask, jsonify", "", "app = Flask(__name__)", ""]
+    i = 0
+    while len(body) < lines:
+        body += [f"@app.route('/api/item{i}')", f"def item{i}():", f"    return jsonify({{'id': {i}, 'name': 'item {i}'}})", ""]
+        i += 1
+    return "\n".join(body) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=400)
+    parser.add_argument("--tokens-per-second", type=float, default=60.0)
+    args = parser.parse_args()
+
+    original = generated_app(args.lines)
+    old = "    return jsonify({'id': 7, 'name': 'item 7'})\n"
+    new = "    return jsonify({'id': 7, 'name': 'item 7', 'tags': ['new']})\n"
+    changed = original.replace(old, new)
+    line_no = original.splitlines().index(old.rstrip("\n")) + 1
+    diff = "".join(difflib.unified_diff(
+        original.splitlines(keepends=True), changed.splitlines(keepends=True), "a/app.py", "b/app.py", n=1
+    ))
+
+    edits = {
+        "edit_file (full rewrite)": (edit_file, {"file_name": "app.py", "content": changed}),
+        "search_replace": (search_replace, {"file_name": "app.py", "search": old, "replace": new}),
+        "replace_lines": (replace_lines, {"file_name": "app.py", "start_line": line_no, "end_line": line_no, "content": new}),
+        "apply_patch": (apply_patch, {"file_name": "app.py", "diff": diff}),
+    }
+
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"{'tool':<26}{'output tokens':>14}{'generate':>12}{'apply':>10}{'total':>10}")
+        for name, (fn, params) in edits.items():
+            path = os.path.join(folder, "app.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(original)
+            params = dict(params, folder_path=folder)
+            action = json.dumps({"step": "action", "function": fn.__name__, "input": {
+                k: v for k, v in params.items() if k != "folder_path"
+            }})
+            tokens = count_tokens(action)
+            generate = tokens / args.tokens_per_second
+            start = time.perf_counter()
+            result = fn(params)
+            apply = time.perf_counter() - start
+            with open(path, encoding="utf-8") as f:
+                assert f.read() == changed, result
+            print(f"{name:<26}{tokens:>14}{generate:>11.2f}s{apply * 1000:>8.1f}ms{generate + apply:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Correctness and speed of JSON step extraction from Gemini-style outputs.
+
+Compares the old fence-strip + ``re.findall(r'\\{.*?\\}')`` approach with
+JSONObjectExtractor on benchmarks/corpus/gemini_outputs.jsonl, fuzzes the
+extractor with random chunk boundaries and prose, and times it on growing
+inputs to show linear scaling, including adversarial ones: nested prose
+braces that never parse and a long run of unclosed braces.
+
+    python benchmarks/bench_extractor.py --fuzz 2000
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mycursor.step_stream import JSONObjectExtractor
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus", "gemini_outputs.jsonl")
+PROSE = ["Sure! ", "Here is the next step: ", "Note: use {placeholders} carefully. ", "```json\n", "\n```\n", "Done :-}"]
+
+
+def regex_extract(output):
+    """What gemini_implement.py used to do."""
+    output = output.strip()
+    if output.startswith("```json"):
+        output = output.replace("```json", "").replace("```", "").strip()
+    elif output.startswith("```"):
+        output = output.replace("```", "").strip()
+    return [json.loads(obj) for obj in re.findall(r"\{.*?\}", output, re.DOTALL)]
+
+
+def stream_extract(output, chunk_sizes):
+    extractor = JSONObjectExtractor()
+    objects, i = [], 0
+    while i < len(output):
+        size = chunk_sizes()
+        objects.extend(extractor.feed(output[i:i + size]))
+        i += size
+    return objects + extractor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fuzz", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with open(CORPUS, encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f]
+
+    scores = {"regex": 0, "extractor": 0}
+    for entry in corpus:
+        try:
+            regex_ok = regex_extract(entry["output"]) == entry["expected"]
+        except json.JSONDecodeError:
+            regex_ok = False
+        extractor_ok = stream_extract(entry["output"], lambda: 4096) == entry["expected"]
+        scores["regex"] += regex_ok
+        scores["extractor"] += extractor_ok
+        print(f"{entry['name']:<34} regex {'ok ' if regex_ok else 'BAD'}  extractor {'ok ' if extractor_ok else 'BAD'}")
+    print(f"\ncorpus: regex {scores['regex']}/{len(corpus)}, extractor {scores['extractor']}/{len(corpus)}")
+
+    failures = 0
+    for _ in range(args.fuzz):
+        picks = rng.sample(corpus, rng.randint(1, 4))
+        text, expected = "", []
+        for entry in picks:
+            text += rng.choice(PROSE) + entry["output"] + rng.choice(PROSE)
+            expected.extend(entry["expected"])
+        if stream_extract(text, lambda: rng.randint(1, 64)) != expected:
+            failures += 1
+    print(f"fuzz: {args.fuzz - failures}/{args.fuzz} random chunkings and prose mixes extracted exactly")
+
+    sample = "".join(entry["output"] + "\n" for entry in corpus if entry["expected"])
+    for repeat in (10, 100, 1000):
+        text = sample * repeat
+        start = time.perf_counter()
+        stream_extract(text, lambda: 64)
+        elapsed = time.perf_counter() - start
+        print(f"{len(text) / 1024:9.0f} KiB in {elapsed * 1000:8.1f} ms ({len(text) / elapsed / 1e6:5.1f} MB/s)")
+
+    for label, make in (("nested prose braces", lambda n: "{a " * n + "}" * n), ("unclosed braces", lambda n: "{" * n)):
+        for n in (5000, 50000, 200000):
+            text = make(n)
+            start = time.perf_counter()
+            stream_extract(text, lambda: 4096)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<20} n={n:<7} {len(text) / 1024:6.0f} KiB in {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
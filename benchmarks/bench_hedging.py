@@ -0,0 +1,83 @@
+"""Step latency percentiles with and without hedging across two local stubs.
+
+The primary stub answers slowly on a share of requests (an injected tail),
+the secondary is a bit slower on average but has no tail.
+
+    python benchmarks/bench_hedging.py --steps 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mycursor.hedging import HedgedProvider, percentile
+from model_stub import serve
+from mycursor.providers import Provider, TokenBucket
+
+
+class StubProvider(Provider):
+    """Minimal streaming client for the OpenAI-shaped stub, built on urllib."""
+
+    def __init__(self, name, base_url, **kwargs):
+        kwargs.setdefault("limiter", TokenBucket(rate_per_minute=1e9))
+        super().__init__("stub", **kwargs)
+        self.name = name
+        self.url = base_url + "/chat/completions"
+
+    def _stream(self, messages, config, remaining):
+        body = json.dumps({"model": self.model, "messages": messages, "stream": True}).encode()
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=remaining) as response:
+            for line in response:
+                line = line.decode().strip()
+                if line.startswith("data: ") and line != "data: [DONE]":
+                    delta = json.loads(line[6:])["choices"][0]["delta"].get("content")
+                    if delta:
+                        yield delta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--slow-rate", type=float, default=0.1)
+    parser.add_argument("--slow-delay", type=float, default=1.5)
+    parser.add_argument("--percentile", type=float, default=90)
+    args = parser.parse_args()
+
+    script = [{"step": "plan", "content": "Create the project folder."}]
+    primary_server = serve(0, script, token_delay=0.0, first_token_delay=0.05,
+                           slow_rate=args.slow_rate, slow_delay=args.slow_delay, seed=1)
+    secondary_server = serve(0, script, token_delay=0.0, first_token_delay=0.08, seed=2)
+    primary_url = f"http://127.0.0.1:{primary_server.server_port}/v1"
+    secondary_url = f"http://127.0.0.1:{secondary_server.server_port}/v1"
+
+    for hedging in (False, True):
+        primary = StubProvider("primary", primary_url)
+        secondary = StubProvider("secondary", secondary_url)
+        if hedging:
+            provider = HedgedProvider(primary, secondary, hedge_percentile=args.percentile,
+                                      initial_delay=0.2, min_samples=10)
+        else:
+            provider = primary
+        latencies = []
+        for _ in range(args.steps):
+            start = time.perf_counter()
+            provider.complete([{"role": "user", "content": "next step"}])
+            latencies.append(time.perf_counter() - start)
+        extra = f"  ({provider.hedged} hedged, {provider.secondary_wins} secondary wins)" if hedging else ""
+        print(
+            f"hedging {'on ' if hedging else 'off'}  "
+            f"p50 {percentile(latencies, 50) * 1000:7.1f} ms  "
+            f"p95 {percentile(latencies, 95) * 1000:7.1f} ms  "
+            f"p99 {percentile(latencies, 99) * 1000:7.1f} ms{extra}"
+        )
+    primary_server.shutdown()
+    secondary_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
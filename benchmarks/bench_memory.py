@@ -0,0 +1,141 @@
+"""Retrieval memory at scale: index build, incremental adds and query latency.
+
+Logs --messages synthetic messages (user queries, plans, actions with file
+contents, command observations) into a scratch session, with --planted
+distinctive facts spread through it. Then measures indexing the whole log
+from scratch (catch-up) and saving it, reloading the index, adding messages one
+by one as the agent logs them, and top-k queries. Recall is whether the
+planted message is among the hits for a query about it; prompt size compares
+replaying the last 200 messages with a 20-message tail plus the hits.
+
+    python benchmarks/bench_memory.py --messages 100000
+    python benchmarks/bench_memory.py --messages 20000 --k 10
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mycursor.context_window import message_tokens
+from mycursor.hedging import percentile
+from mycursor.memory import Memory
+from mycursor.session_store import SessionStore
+
+
+WORDS = (
+    "app server route template static config database model view form user login page table chart "
+    "dashboard csv column row filter sort index query cache request response json api endpoint test "
+    "error install package module import function class method variable style layout button input"
+).split()
+FRAMEWORKS = ("flask", "django", "fastapi", "dash", "streamlit", "express", "react", "vue")
+COMMANDS = ("pip install -r requirements.txt", "python app.py", "npm install", "pytest -q", "ls -la", "git status")
+
+
+def sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def synthetic(rng, number):
+    project = f"{rng.choice(FRAMEWORKS)}_{rng.choice(WORDS)}"
+    kind = number % 4
+    if kind == 0:
+        return {"role": "user", "content": f"Add a {sentence(rng, 3)} to the {project} project"}
+    if kind == 1:
+        return {"role": "assistant", "content": json.dumps({"step": "plan", "content": sentence(rng, 25)})}
+    if kind == 2:
+        code = "\n".join(f"def {rng.choice(WORDS)}_{i}():\n    return '{sentence(rng, 6)}'" for i in range(rng.randint(3, 12)))
+        return {"role": "assistant", "content": json.dumps({
+            "step": "action", "function": "edit_file",
+            "input": {"file_name": f"{rng.choice(WORDS)}.py", "folder_path": f"./{project}", "content": code},
+        })}
+    return {"role": "user", "content": json.dumps({
+        "step": "observe", "output": f"$ {rng.choice(COMMANDS)}\n{sentence(rng, rng.randint(10, 60))}",
+    })}
+
+
+PLANTED = [
+    ("the payroll service uses port {n} and the kafka topic invoices_{n}", "which port does the payroll service use"),
+    ("renamed the stripe webhook handler to handle_refund_{n} in billing_{n}.py", "where is the stripe refund webhook handler"),
+    ("the grafana dashboard for warehouse {n} reads from the telemetry_{n} bucket", "grafana warehouse telemetry bucket"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--planted", type=int, default=30)
+    parser.add_argument("--adds", type=int, default=2000, help="messages added one by one after the build")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    planted = {}
+    spots = rng.sample(range(args.messages), args.planted)
+    for i, spot in enumerate(spots):
+        fact, question = PLANTED[i % len(PLANTED)]
+        planted[spot] = (fact.format(n=1000 + i), question, 1000 + i)
+
+    with tempfile.TemporaryDirectory() as root:
+        store = SessionStore("bench", root, fsync="never", flush_every=1024)
+        start = time.perf_counter()
+        for number in range(args.messages):
+            if number in planted:
+                store.append({"role": "assistant", "content": json.dumps({"step": "output", "content": planted[number][0]})})
+            else:
+                store.append(synthetic(rng, number))
+        store.flush()
+        print(f"logged {args.messages} messages in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        memory = Memory(root, sessions=["bench"], stores={"bench": store})
+        build = time.perf_counter() - start
+        memory.close()
+        start = time.perf_counter()
+        memory = Memory(root, sessions=["bench"], stores={"bench": store})
+        load = time.perf_counter() - start
+        index = memory.indexes["bench"]
+        size = sum(os.path.getsize(os.path.join(index.path, name)) for name in ("memory.npz", "memory-chunks.jsonl"))
+
+        adds = []
+        for number in range(args.messages, args.messages + args.adds):
+            message = synthetic(rng, number)
+            store.append(message)
+            start = time.perf_counter()
+            memory.add("bench", number, message)
+            adds.append(time.perf_counter() - start)
+
+        latencies = []
+        found = 0
+        spots = sorted(planted)
+        for i in range(args.queries):
+            spot = spots[i % len(spots)]
+            fact, question, n = planted[spot]
+            start = time.perf_counter()
+            hits = memory.search(f"{question} {n}", args.k)
+            latencies.append(time.perf_counter() - start)
+            found += any(number == spot for _, _, number, _ in hits)
+
+        replay = sum(message_tokens(m) for m in store.tail(200))
+        tail = sum(message_tokens(m) for m in store.tail(20))
+        recalled = sum(message_tokens({"role": "user", "content": text}) for _, _, _, text in hits)
+        memory.close()
+        store.close()
+
+    print(f"index           {len(index)} chunks, {index.indices.size} nonzeros, {size / 1e6:.1f} MB on disk")
+    print(f"build + save    {build:.1f}s ({args.messages / build:,.0f} messages/s)")
+    print(f"load            {load * 1000:.0f}ms")
+    print(f"add (per msg)   p50 {percentile(adds, 50) * 1e6:.0f}us  p95 {percentile(adds, 95) * 1e6:.0f}us")
+    print(f"query top-{args.k}     p50 {percentile(latencies, 50) * 1000:.1f}ms  p95 {percentile(latencies, 95) * 1000:.1f}ms")
+    print(f"recall@{args.k}        {found}/{args.queries}")
+    print(f"prompt tokens   200-message replay {replay}, 20-message tail + top-{args.k} {tail + recalled}")
+
+
+if __name__ == "__main__":
+    main()
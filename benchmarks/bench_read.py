@@ -0,0 +1,93 @@
+"""Bytes and tokens injected into the history when the agent reads code.
+
+Builds a workspace of --files generated modules (Python and JS) and compares,
+for a task that needs one function, printing the whole file (`type app.py`)
+against `find_symbol` and a `read_file` line range. Also times a full index
+build against an incremental refresh after one file changes.
+
+    python benchmarks/bench_read.py --files 200 --functions 60
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mycursor.context_window import count_tokens
+from mycursor.workspace import WorkspaceIndex, build_read_tools
+
+
+def python_module(functions):
+    parts = ["import json\n\n"]
+    for i in range(functions):
+        parts.append(f"def handler_{i}(request):\n    data = json.loads(request.body)\n    return {{'id': {i}, 'data': data}}\n\n\n")
+    return "".join(parts)
+
+
+def js_module(functions):
+    return "".join(
+        f"export function render{i}(props) {{\n  return `<div id=\"{i}\">${{props.name}}</div>`;\n}}\n\n"
+        for i in range(functions)
+    )
+
+
+def injected(text):
+    return len(text.encode("utf-8")), count_tokens(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--functions", type=int, default=60)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        for i in range(args.files):
+            folder = os.path.join(root, f"pkg{i % 10}")
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f"mod{i}.py"), "w") as f:
+                f.write(python_module(args.functions))
+            with open(os.path.join(folder, f"view{i}.js"), "w") as f:
+                f.write(js_module(args.functions))
+
+        index = WorkspaceIndex(root)
+        start = time.perf_counter()
+        index.refresh()
+        for path in index.files:
+            index.symbols(path)
+        full = time.perf_counter() - start
+        target = os.path.join(root, "pkg3", "mod3.py")
+        with open(target, "a") as f:
+            f.write("def added():\n    return 1\n")
+        start = time.perf_counter()
+        changed = index.refresh()
+        for path in index.files:
+            index.symbols(path)
+        incremental = time.perf_counter() - start
+        print(f"index: {len(index.files)} files, full build {full * 1000:.1f}ms, "
+              f"refresh after 1 change {incremental * 1000:.1f}ms ({changed} re-parsed)")
+
+        read_file, _, find_symbol = build_read_tools(index)
+        with open(target) as f:
+            whole = f.read()
+        with contextlib.redirect_stdout(io.StringIO()):
+            symbol = find_symbol({"name": "handler_42", "file_name": target})
+            ranged = read_file({"file_name": target, "start_line": 127, "end_line": 131})
+            js = find_symbol({"name": "render7", "file_name": os.path.join(root, "pkg3", "view3.js")})
+        print(f"{'read':<28}{'bytes':>8}{'tokens':>8}")
+        for name, text in (
+            ("type mod3.py (whole file)", whole),
+            ("find_symbol handler_42", symbol),
+            ("read_file lines 127-131", ranged),
+            ("find_symbol render7 (JS)", js),
+        ):
+            size, tokens = injected(text)
+            print(f"{name:<28}{size:>8}{tokens:>8}")
+
+
+if __name__ == "__main__":
+    main()
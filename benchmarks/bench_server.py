@@ -0,0 +1,206 @@
+"""Load test of the multi-session server against the local model stub.
+
+Starts the model stub and ``python -m mycursor.server`` (or uses --server),
+then drives --users concurrent simulated users: each opens a session and
+sends --queries queries one after the other, reading the event stream of
+each to the end. A 429 is retried after its Retry-After. Reports queries per
+second, query latency, time to the first streamed event and rejections.
+
+    python benchmarks/bench_server.py --users 50 --queries 3
+    python benchmarks/bench_server.py --users 200 --task-workers 64 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mycursor.hedging import percentile
+from model_stub import serve
+
+
+QUERY = "Create a Flask hello world app in hello_flask."
+APP = "from flask import Flask\n\napp = Flask(__name__)\n\n\n@app.route('/')\ndef hello():\n    return 'Hello, World!'\n"
+SCENARIO = {
+    "query": QUERY,
+    "replies": [
+        {"steps": [
+            {"step": "plan", "content": "Write app.py and requirements.txt."},
+            {"step": "action", "function": "edit_file", "independent": True,
+             "input": {"file_name": "app.py", "folder_path": "./hello_flask", "content": APP}},
+            {"step": "action", "function": "edit_file", "independent": True,
+             "input": {"file_name": "requirements.txt", "folder_path": "./hello_flask", "content": "flask\n"}},
+        ]},
+        {"step": "action", "function": "find_symbol",
+         "input": {"name": "hello", "file_name": "app.py", "folder_path": "./hello_flask"}},
+        {"step": "output", "content": "Created hello_flask/app.py."},
+    ],
+}
+
+
+async def request(host, port, method, path, body=None):
+    """``(status, headers, reader, writer)`` of one request; the caller reads the body."""
+    reader, writer = await asyncio.open_connection(host, port)
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return status, headers, reader, writer
+
+
+async def request_json(host, port, method, path, body=None):
+    status, _, reader, writer = await request(host, port, method, path, body)
+    data = await reader.read()
+    writer.close()
+    return status, json.loads(data) if data else None
+
+
+async def run_query(host, port, session, query):
+    """Stream one query; returns ``(latency, first_event, completed, rejections)``."""
+    rejections = 0
+    start = time.perf_counter()
+    while True:
+        status, headers, reader, writer = await request(host, port, "POST", f"/sessions/{session}/queries", {"query": query})
+        if status != 429:
+            break
+        rejections += 1
+        await reader.read()
+        writer.close()
+        await asyncio.sleep(float(headers.get("retry-after", 1)))
+    if status != 200:
+        error = await reader.read()
+        writer.close()
+        raise RuntimeError(f"query failed with {status}: {error[:200]!r}")
+    first_event = None
+    completed = False
+    event = None
+    async for line in reader:
+        line = line.decode().rstrip("\n")
+        if line.startswith("event: "):
+            event = line[7:]
+        elif line.startswith("data: "):
+            if event == "text" and first_event is None:
+                first_event = time.perf_counter() - start
+            if event == "done":
+                completed = json.loads(line[6:]).get("completed", False)
+    writer.close()
+    return time.perf_counter() - start, first_event, completed, rejections
+
+
+async def user(host, port, args, results):
+    status, session = await request_json(host, port, "POST", "/sessions", {"provider": args.provider})
+    if status != 201:
+        raise RuntimeError(f"could not open a session: {status} {session}")
+    for _ in range(args.queries):
+        results.append(await run_query(host, port, session["id"], QUERY))
+    await request_json(host, port, "DELETE", f"/sessions/{session['id']}")
+
+
+async def drive(host, port, args):
+    results = []
+    start = time.perf_counter()
+    await asyncio.gather(*(user(host, port, args, results) for _ in range(args.users)))
+    return results, time.perf_counter() - start
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args, workdir, stub_port):
+    port = free_port()
+    base = f"http://127.0.0.1:{stub_port}"
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.path.join(os.path.dirname(__file__), ".."),
+        "OPENAI_BASE_URL": f"{base}/v1",
+        "GEMINI_BASE_URL": base,
+        "OPENAPI_KEY": "stub",
+        "GEMINI_API_KEY": "stub",
+        "MYCURSOR_CACHE": "0",
+        "MYCURSOR_RPM": "1000000",
+        "MYCURSOR_TRACE_FILE": os.path.join(workdir, "trace.jsonl"),
+        "MYCURSOR_METRICS_FILE": os.path.join(workdir, "metrics.prom"),
+        "PYTHONIOENCODING": "utf-8",
+    }
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "mycursor.server", "--port", str(port), "--root", workdir,
+            "--max-sessions", str(args.users), "--task-workers", str(args.task_workers),
+            "--tool-workers", str(args.tool_workers),
+        ],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}:\n{proc.stderr.read()[-2000:]}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc, port
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start in 30s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=3, help="queries per user")
+    parser.add_argument("--provider", default="openai", choices=("openai", "gemini"))
+    parser.add_argument("--token-rate", type=float, default=100.0, help="stub output tokens per second")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub time to first token (s)")
+    parser.add_argument("--task-workers", type=int, default=32)
+    parser.add_argument("--tool-workers", type=int, default=16)
+    parser.add_argument("--server", metavar="HOST:PORT", help="use a running server instead of starting one")
+    args = parser.parse_args()
+
+    stub = serve(0, token_delay=1.0 / args.token_rate, first_token_delay=args.latency, scenarios=[SCENARIO])
+    proc = None
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            if args.server:
+                host, port = args.server.rsplit(":", 1)
+                port = int(port)
+            else:
+                proc, port = start_server(args, workdir, stub.server_port)
+                host = "127.0.0.1"
+            results, wall = asyncio.run(drive(host, port, args))
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait(10)
+            stub.shutdown()
+
+    latencies = [latency for latency, _, _, _ in results]
+    firsts = [first for _, first, _, _ in results if first is not None]
+    print(f"{args.users} users x {args.queries} queries: {wall:.2f}s wall, "
+          f"{len(results) / wall:.1f} queries/s, {stub.state.calls} model calls")
+    print(f"completed      {sum(done for _, _, done, _ in results)}/{len(results)}")
+    print(f"latency        p50 {percentile(latencies, 50):.2f}s  p95 {percentile(latencies, 95):.2f}s  max {max(latencies):.2f}s")
+    if firsts:
+        print(f"first event    p50 {percentile(firsts, 50) * 1000:.0f}ms  p95 {percentile(firsts, 95) * 1000:.0f}ms")
+    print(f"429 retries    {sum(rejected for _, _, _, rejected in results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Cold start of the agent: from process start to the first prompt, and exit.
+
+Times fresh interpreter runs (median of --repeat) of:
+
+- the bare interpreter, as the floor;
+- the import of each dependency the old scripts loaded eagerly at module level
+  (``openai``, ``google.generativeai``, ``requests``, ``dotenv``), skipped when
+  not installed;
+- ``mycursor --version`` (the CLI alone) and ``mycursor -p openai|gemini``
+  started and exited straight away from the REPL;
+- with ``--before REF``, the same REPL start/exit of ``main.py`` and
+  ``gemini_implement.py`` at an older commit, exported with ``git archive``.
+
+    python benchmarks/bench_startup.py --repeat 10
+    python benchmarks/bench_startup.py --before 4404569
+    python benchmarks/bench_startup.py --importtime   # slowest imports of the CLI
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+SDKS = ("openai", "google.generativeai", "requests", "dotenv")
+EXIT_COMMANDS = {"openai": "thanks", "gemini": "bye"}
+OLD_SCRIPTS = {"openai": "main.py", "gemini": "gemini_implement.py"}
+
+
+def timed(argv, cwd, env, stdin="", repeat=5):
+    """Median wall time of ``argv``, or None if it failed."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(argv, cwd=cwd, env=env, input=stdin, capture_output=True, text=True, encoding="utf-8")
+        if proc.returncode != 0:
+            return None, proc.stderr.strip().splitlines()[-1:] or ["exit code %d" % proc.returncode]
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), None
+
+
+def export(ref, dest):
+    """Write the tree of ``ref`` into ``dest``."""
+    archive = subprocess.run(["git", "archive", ref], cwd=ROOT, capture_output=True, check=True).stdout
+    path = os.path.join(dest, "tree.tar")
+    with open(path, "wb") as f:
+        f.write(archive)
+    with tarfile.open(path) as tar:
+        tar.extractall(dest)
+    os.remove(path)
+
+
+def importtime(env, top=12):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import mycursor.cli, mycursor.openai_agent, mycursor.gemini_agent"],
+        env=env, capture_output=True, text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    print(f"\n{'cumulative':>12}  module")
+    for cumulative, module in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>10.1f}ms  {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--before", metavar="REF", help="also time the loop scripts of this commit")
+    parser.add_argument("--importtime", action="store_true", help="list the slowest imports of the CLI")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "PYTHONPATH": ROOT,
+        "OPENAPI_KEY": "stub",
+        "GEMINI_API_KEY": "stub",
+        "MYCURSOR_SESSION": "bench",
+        "PYTHONIOENCODING": "utf-8",
+    }
+    rows = []
+    try:
+        floor, _ = timed([sys.executable, "-c", "pass"], workdir, env, repeat=args.repeat)
+        rows.append(("python -c pass", floor, None))
+        for sdk in SDKS:
+            rows.append((f"import {sdk}", *timed([sys.executable, "-c", f"import {sdk}"], workdir, env, repeat=args.repeat)))
+        rows.append(("mycursor --version", *timed(
+            [sys.executable, "-m", "mycursor", "--version"], workdir, env, repeat=args.repeat
+        )))
+        for provider, exit_command in EXIT_COMMANDS.items():
+            rows.append((f"mycursor -p {provider} (REPL, exit)", *timed(
+                [sys.executable, "-m", "mycursor", "-p", provider], workdir, env, exit_command + "\n", args.repeat
+            )))
+        if args.before:
+            old = os.path.join(workdir, "before")
+            os.makedirs(old)
+            export(args.before, old)
+            old_env = {**env, "PYTHONPATH": old}
+            for provider, script in OLD_SCRIPTS.items():
+                rows.append((f"{args.before}:{script} (REPL, exit)", *timed(
+                    [sys.executable, os.path.join(old, script)], workdir, old_env,
+                    EXIT_COMMANDS[provider] + "\n", args.repeat,
+                )))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'run':<40}{'median':>10}{'over python':>14}")
+    for name, seconds, error in rows:
+        if seconds is None:
+            print(f"{name:<40}{'failed':>10}  {error[0] if error else ''}")
+        else:
+            print(f"{name:<40}{seconds * 1000:>8.0f}ms{(seconds - floor) * 1000:>12.0f}ms")
+    if args.importtime:
+        importtime(env)
+
+
+if __name__ == "__main__":
+    main()
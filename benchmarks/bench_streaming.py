@@ -0,0 +1,77 @@
+"""Time-to-first-output of blocking vs streaming calls against the local stub.
+
+"First output" is the moment the agent loop can show or do something: the
+first plan/output character on screen, or the dispatch of an action.
+
+    python benchmarks/bench_streaming.py --rounds 3
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from model_stub import DEFAULT_SCRIPT, serve
+from mycursor.step_stream import StepStreamParser
+
+
+def post(url, body):
+    request = urllib.request.Request(
+        url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"}
+    )
+    return urllib.request.urlopen(request)
+
+
+def blocking_step(url):
+    start = time.perf_counter()
+    with post(url, {"model": "gpt-4o", "messages": []}) as response:
+        content = json.loads(response.read())["choices"][0]["message"]["content"]
+    json.loads(content)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+def streaming_step(url):
+    start = time.perf_counter()
+    first = None
+    parser = StepStreamParser()
+    with post(url, {"model": "gpt-4o", "messages": [], "stream": True}) as response:
+        for line in response:
+            line = line.decode().strip()
+            if not line.startswith("data: ") or line == "data: [DONE]":
+                continue
+            delta = json.loads(line[6:])["choices"][0]["delta"].get("content") or ""
+            for event, step, _ in parser.feed(delta):
+                if first is None and (event == "delta" or step == "action"):
+                    first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = serve(0, DEFAULT_SCRIPT, args.token_delay, args.first_token_delay)
+    url = f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+    for name, fn in (("blocking", blocking_step), ("streaming", streaming_step)):
+        firsts, totals = [], []
+        for _ in range(args.rounds * len(DEFAULT_SCRIPT)):
+            first, total = fn(url)
+            firsts.append(first)
+            totals.append(total)
+        print(
+            f"{name:<10} first output p50 {statistics.median(firsts) * 1000:7.1f} ms"
+            f"   step total p50 {statistics.median(totals) * 1000:7.1f} ms"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
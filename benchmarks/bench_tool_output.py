@@ -0,0 +1,65 @@
+"""Context cost of long tool outputs, with and without bounding.
+
+Runs a command that prints a pip-install-like log of --lines lines (with one
+error near the middle) through ShellSession, then compares the tokens of the
+observation message sent to the model, and of --steps later requests that
+carry it in the history, with the raw output and with OutputBounder.
+
+    python benchmarks/bench_tool_output.py --lines 2000 --steps 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mycursor.context_window import count_tokens
+from mycursor.shell_session import ShellSession
+from mycursor.steps import observation_message
+from mycursor.tool_output import OutputBounder, OutputStore, build_read_output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    script = (
+        "import sys\n"
+        f"for i in range({args.lines}):\n"
+        "    print(f'Collecting package{i}==1.{i}.0 (from -r requirements.txt (line {i}))')\n"
+        "    print(f'  Downloading package{i}-1.{i}.0-py3-none-any.whl (12 kB)')\n"
+        f"    if i == {args.lines // 2}:\n"
+        "        print('ERROR: Could not build wheels for package%d' % i, file=sys.stderr)\n"
+        "print('Successfully installed ...')\n"
+    )
+    with tempfile.TemporaryDirectory() as folder:
+        with open(os.path.join(folder, "fake_pip.py"), "w") as f:
+            f.write(script)
+        shell = ShellSession(cwd=folder, complete=True)
+        try:
+            result = shell.run(f"{sys.executable} fake_pip.py")
+        finally:
+            shell.close()
+
+        bounder = OutputBounder(OutputStore(os.path.join(folder, "outputs")))
+        raw = observation_message([{"function": "exec_command", "output": result}])
+        bounded_output = bounder(result)
+        bounded = observation_message([{"function": "exec_command", "output": bounded_output}])
+        raw_tokens, bounded_tokens = count_tokens(raw), count_tokens(bounded)
+        print(f"{'observation':<12}{'bytes':>10}{'tokens':>9}{f'tokens over {args.steps} steps':>24}")
+        print(f"{'raw':<12}{len(raw):>10}{raw_tokens:>9}{raw_tokens * args.steps:>24}")
+        print(f"{'bounded':<12}{len(bounded):>10}{bounded_tokens:>9}{bounded_tokens * args.steps:>24}")
+        print("exit code:", bounded_output["exit_code"], "| stderr:", bounded_output["stderr"].strip())
+
+        read_output = build_read_output(bounder.store)
+        ref = bounded_output["stdout"]["ref"]
+        page = read_output({"ref": ref, "grep": f"package{args.lines // 2}\\b"})
+        print(f"read_output grep page: {count_tokens(page)} tokens")
+        print(page)
+
+
+if __name__ == "__main__":
+    main()
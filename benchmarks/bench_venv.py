@@ -0,0 +1,74 @@
+"""Project venv creation: python -m venv + pip install vs a cloned template.
+
+The baseline is the best case of what the prompts used to do: a fresh venv
+and a ``pip install`` served from the local wheel cache (no downloads). The
+template is built once (not timed), then venvs are cloned from it with
+hardlinks and with full copies. Every venv is checked by importing the
+requirements with its own python.
+
+    python benchmarks/bench_venv.py --requirements flask --repeat 3
+    python benchmarks/bench_venv.py --requirements "dash pandas" --offline --wheels ./wheels
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mycursor.venv_cache import VenvCache, _python, normalize_requirements
+
+
+def check(venv, modules):
+    subprocess.run([_python(venv), "-c", "import " + ", ".join(modules)], check=True)
+
+
+def baseline(cache, dest, requirements):
+    subprocess.run([sys.executable, "-m", "venv", dest], check=True)
+    subprocess.run(
+        [_python(dest), "-m", "pip", "install", "--quiet", "--disable-pip-version-check", "--no-index",
+         *cache._find_links(), *requirements],
+        check=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requirements", default="flask", help="space-separated requirements")
+    parser.add_argument("--modules", help="modules to import as a check (default: the requirement names)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--wheels", action="append", help="local wheel directory")
+    parser.add_argument("--offline", action="store_true")
+    args = parser.parse_args()
+
+    requirements = normalize_requirements(args.requirements.split())
+    modules = (args.modules or " ".join(r.split("=")[0].split("<")[0].split(">")[0] for r in requirements)).split()
+    with tempfile.TemporaryDirectory() as workdir:
+        cache = VenvCache(os.path.join(workdir, "cache"), args.wheels, args.offline or None)
+        start = time.perf_counter()
+        cache.template(requirements)
+        print(f"template built in {time.perf_counter() - start:.1f}s (one-off)")
+
+        results = {"venv + pip install": [], "template, hardlinked": [], "template, copied": []}
+        for run in range(args.repeat):
+            for index, (name, make) in enumerate((
+                ("venv + pip install", lambda dest: baseline(cache, dest, requirements)),
+                ("template, hardlinked", lambda dest: cache.create(dest, requirements)),
+                ("template, copied", lambda dest: cache.create(dest, requirements, link=False)),
+            )):
+                dest = os.path.join(workdir, f"project-{index}-{run}", "venv")
+                start = time.perf_counter()
+                make(dest)
+                results[name].append(time.perf_counter() - start)
+                check(dest, modules)
+
+    print(f"{'method':<24}{'median':>10}{'min':>10}")
+    for name, times in results.items():
+        print(f"{name:<24}{statistics.median(times):>9.2f}s{min(times):>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""get_weather lookups: bare requests.get vs the pooled, cached WeatherClient.
+
+A local wttr.in stand-in answers every lookup after --delay seconds.
+
+    python benchmarks/bench_weather.py --cities London Indore Delhi Bangalore Mumbai
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mycursor.weather import WeatherClient
+
+
+def serve(delay):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(delay)
+            body = "Partly cloudy +15°C".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    print(f"{label:<34} {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cities", nargs="+", default=["London", "Indore", "Delhi", "Bangalore", "Mumbai"])
+    parser.add_argument("--delay", type=float, default=0.1)
+    args = parser.parse_args()
+
+    server = serve(args.delay)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    def bare():
+        for city in args.cities:
+            requests.get(f"{base_url}/{city}?format=%C+%t")
+
+    client = WeatherClient(base_url=base_url)
+    timed("bare requests.get, sequential", bare)
+    timed("WeatherClient.get_many, cold", lambda: client.get_many(args.cities))
+    timed("WeatherClient.get_many, cached", lambda: client.get_many(args.cities))
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
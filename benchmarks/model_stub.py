@@ -0,0 +1,260 @@
+"""Local OpenAI- and Gemini-compatible model stub for offline benchmarks.
+
+Serves the OpenAI chat-completions shape on ``/v1/chat/completions`` and the
+Gemini generate-content shape on ``/v1beta/models/<model>:generateContent``
+and ``:streamGenerateContent``, so both agent loops can run against it by
+pointing OPENAI_BASE_URL / GEMINI_BASE_URL here.
+
+Replies are scripted. A request whose latest user query is one of the
+``scenarios`` gets the next reply of that scenario (worked out from the
+model turns already in the request, so retries and hedged duplicates get
+the same answer); any other request gets the next step of ``script``.
+Replies are emitted token by token with a configurable delay. Prompt caching
+is emulated the way OpenAI reports it: the longest prefix shared with a recent
+request counts as cached once it reaches 1024 tokens, in steps of 128.
+
+    python benchmarks/model_stub.py --port 8765 --token-delay 0.02
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_SCRIPT = [
+    {"step": "plan", "content": "The user wants a Flask app with a 'Hello, World!' route. I will first create the project folder, then write app.py."},
+    {"step": "action", "function": "make_directory", "input": "./hello_flask"},
+    {"step": "action", "function": "edit_file", "input": {"file_name": "app.py", "folder_path": "./hello_flask", "content": "from flask import Flask\napp = Flask(__name__)\n\n@app.route('/')\ndef hello():\n    return 'Hello, World!'\n"}},
+    {"step": "output", "content": "Created hello_flask/app.py. Run it with `flask run` from the project folder."},
+]
+
+FINAL_REPLY = {"step": "output", "content": "Done."}
+
+_GEMINI_PATH = re.compile(r"^/v1(?:beta)?/models/(?P<model>[^:/]+):(?P<method>generateContent|streamGenerateContent)")
+
+
+def split_tokens(text, size=4):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _texts(body):
+    """``(role, text)`` of every message of an OpenAI or Gemini request body."""
+    if "contents" in body:
+        return [
+            (content.get("role", "user"), "".join(part.get("text", "") for part in content.get("parts", [])))
+            for content in body["contents"]
+        ]
+    return [(message.get("role"), message.get("content") or "") for message in body.get("messages", [])]
+
+
+def _is_observation(text):
+    return text.lstrip().startswith('{"step": "observe"')
+
+
+class StubState:
+    def __init__(self, script, token_delay, first_token_delay, slow_rate=0.0, slow_delay=0.0, seed=None, scenarios=None):
+        self.script = itertools.cycle(script)
+        self.scenarios = {scenario["query"]: scenario["replies"] for scenario in scenarios or ()}
+        self.token_delay = token_delay
+        self.first_token_delay = first_token_delay
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.recent = deque(maxlen=64)
+
+    def cached_tokens(self, body):
+        """Tokens of the longest prefix this request shares with a recent one (~4 chars/token)."""
+        text = "".join(f"{role}\n{content}\n" for role, content in _texts(body))
+        with self.lock:
+            shared = max((len(os.path.commonprefix([text, old])) for old in self.recent), default=0)
+            self.recent.append(text)
+        tokens = shared // 4
+        return tokens // 128 * 128 if tokens >= 1024 else 0
+
+    def first_delay(self):
+        """First-token delay, with an injected slow tail on ``slow_rate`` of the requests."""
+        with self.lock:
+            slow = self.random.random() < self.slow_rate
+        return self.first_token_delay + (self.slow_delay if slow else 0.0)
+
+    def next_reply(self, body):
+        with self.lock:
+            self.calls += 1
+        messages = _texts(body)
+        for index in range(len(messages) - 1, -1, -1):
+            role, text = messages[index]
+            replies = self.scenarios.get(text.strip()) if role == "user" else None
+            if replies is not None:
+                turns = sum(
+                    1 for role, text in messages[index + 1:]
+                    if role in ("assistant", "model") and not _is_observation(text)
+                )
+                return json.dumps(replies[turns] if turns < len(replies) else FINAL_REPLY)
+        with self.lock:
+            return json.dumps(next(self.script))
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            gemini = _GEMINI_PATH.match(self.path)
+            reply = state.next_reply(body)
+            tokens = split_tokens(reply)
+            prompt_tokens = sum(len(text) for _, text in _texts(body)) // 4
+            cached_tokens = min(state.cached_tokens(body), prompt_tokens)
+            time.sleep(state.first_delay())
+            if gemini:
+                stream = gemini.group("method") == "streamGenerateContent"
+                chunks = [self._gemini_chunk(token) for token in tokens]
+                usage = {
+                    "promptTokenCount": prompt_tokens,
+                    "candidatesTokenCount": len(tokens),
+                    "totalTokenCount": prompt_tokens + len(tokens),
+                    "cachedContentTokenCount": cached_tokens,
+                }
+                if stream:
+                    chunks[-1]["usageMetadata"] = usage
+                    self._stream(chunks, done=False)
+                else:
+                    time.sleep(state.token_delay * len(tokens))
+                    self._send_json({**self._gemini_chunk(reply), "usageMetadata": usage})
+            elif body.get("stream"):
+                chunks = [self._openai_chunk(body, {"content": token}) for token in tokens]
+                if body.get("stream_options", {}).get("include_usage"):
+                    usage_chunk = self._openai_chunk(body, None)
+                    usage_chunk["usage"] = self._openai_usage(prompt_tokens, len(tokens), cached_tokens)
+                    chunks.append(usage_chunk)
+                self._stream(chunks, done=True)
+            else:
+                time.sleep(state.token_delay * len(tokens))
+                self._send_json({
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stub"),
+                    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": reply}}],
+                    "usage": self._openai_usage(prompt_tokens, len(tokens), cached_tokens),
+                })
+
+        @staticmethod
+        def _openai_usage(prompt_tokens, completion_tokens, cached_tokens=0):
+            return {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            }
+
+        @staticmethod
+        def _openai_chunk(body, delta):
+            return {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None}] if delta else [],
+                "usage": None,
+            }
+
+        @staticmethod
+        def _gemini_chunk(text):
+            return {
+                "candidates": [{
+                    "content": {"role": "model", "parts": [{"text": text}]},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }],
+            }
+
+        def _send_json(self, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, chunks, done):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for chunk in chunks:
+                try:
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                except OSError:
+                    return  # the client closed the stream (e.g. a cancelled hedge)
+                if chunk.get("choices") or chunk.get("candidates"):
+                    time.sleep(state.token_delay)
+            if done:
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+            self.close_connection = True
+
+    return Handler
+
+
+def serve(
+    port=0,
+    script=None,
+    token_delay=0.02,
+    first_token_delay=0.2,
+    slow_rate=0.0,
+    slow_delay=0.0,
+    seed=None,
+    scenarios=None,
+):
+    """Start the stub on a background thread and return the running server."""
+    state = StubState(
+        script or DEFAULT_SCRIPT, token_delay, first_token_delay, slow_rate, slow_delay, seed, scenarios
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="share of requests that get --slow-delay added")
+    parser.add_argument("--slow-delay", type=float, default=0.0)
+    parser.add_argument("--script", help="JSONL file with one step object per reply")
+    parser.add_argument("--scenarios", help="JSON file with a list of {query, replies} scenarios")
+    args = parser.parse_args()
+    script = scenarios = None
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            script = [json.loads(line) for line in f if line.strip()]
+    if args.scenarios:
+        with open(args.scenarios, encoding="utf-8") as f:
+            scenarios = json.load(f)
+    server = serve(
+        args.port, script, args.token_delay, args.first_token_delay, args.slow_rate, args.slow_delay,
+        scenarios=scenarios,
+    )
+    print(f"Model stub listening on http://127.0.0.1:{server.server_port} "
+          f"(OpenAI: /v1, Gemini: /v1beta)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,7 @@
+"""mycursor: a terminal coding agent with OpenAI and Gemini backends.
+
+Importing the package is cheap: the model SDKs, ``requests`` and ``tiktoken``
+are only imported when a backend or tool first needs them. Run it with the
+``mycursor`` command or ``python -m mycursor``.
+"""
+__version__ = "0.1.0"
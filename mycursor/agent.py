@@ -0,0 +1,422 @@
+import atexit
+import importlib.util
+import os
+import time
+
+from .completion_cache import CompletionCache
+from .context_window import ContextWindow
+from .edit_tools import build_edit_tools
+from .hedging import HedgedProvider
+from .jobs import JobManager, build_job_tools
+from .prompt_prefix import PromptPrefix
+from .providers import CachedProvider
+from .sandbox import Sandbox
+from .session_store import DEFAULT_ROOT as SESSIONS_DIR
+from .session_store import SessionStore, list_sessions, valid_session_name
+from .shell_session import ShellSession
+from .steps import CallStats
+from .tool_executor import ToolExecutor
+from .tool_output import OutputBounder, build_read_output
+from .tracing import Tracer
+from .venv_cache import VenvCache, build_venv_tools
+from .workspace import WorkspaceIndex, build_read_tools
+
+
+# How many logged messages are replayed when a session is resumed.
+RESUME_MESSAGES = int(os.getenv("MYCURSOR_RESUME_MESSAGES", "200"))
+# With retrieval memory only a short tail is replayed; older messages are
+# recalled by similarity to the query instead (see memory.py).
+MEMORY_RESUME_MESSAGES = int(os.getenv("MYCURSOR_MEMORY_RESUME_MESSAGES", "20"))
+MEMORY_K = int(os.getenv("MYCURSOR_MEMORY_K", "5"))
+
+
+class Agent:
+    """State and REPL shared by the OpenAI and Gemini agent loops.
+
+    A subclass sets the provider, prompts and exit command, adds its own tools
+    in ``build_tools()`` and implements ``run_task()``, one user query from
+    the first model call to the final ``output`` step. Nothing is contacted
+    at construction time: the model SDK is loaded on the first call.
+    """
+
+    name = "agent"
+    prompt = "> "
+    exit_command = "bye"
+    default_session = "default"
+    # The instructions sent first in every request, and the role they are sent with.
+    system_prompt = ""
+    system_role = "system"
+
+    def __init__(
+        self,
+        session=None,
+        hedge=None,
+        cache=None,
+        root=None,
+        store_root=None,
+        tracer=None,
+        pool=None,
+        sandbox=False,
+        shell_tools=True,
+        venvs=None,
+        memory="all",
+        provider=None,
+        echo=print,
+    ):
+        if hedge is None:
+            hedge = os.getenv("MYCURSOR_HEDGE") == "1"
+        # Everything the loop shows the user goes through echo (print in the REPL,
+        # the session's event stream in the server).
+        self.echo = echo
+        self.root = os.path.abspath(root or os.getcwd())
+        self.store_root = store_root or SESSIONS_DIR
+        self.cache = cache or CompletionCache.from_env()
+        # A provider passed in (e.g. a FakeProvider in tests) replaces the subclass's backend.
+        self.provider = CachedProvider(provider or self.build_provider(hedge), self.cache)
+
+        # One shell for the whole session, so `cd`, venv activation and exported
+        # variables carry over between commands. Its output comes back whole so the
+        # OutputBounder below can spill all of it and keep the head as well as the tail.
+        self.shell = ShellSession(
+            cwd=self.root, on_output=lambda stream, line: self.echo(line, end=""), complete=True
+        )
+        # Files are read in ranges (or by symbol) instead of being dumped whole into the history.
+        self.workspace = WorkspaceIndex(self.root)
+        # Long tool output (pip installs, build logs) is cut to head/tail plus error lines
+        # before it reaches the history; the full text is spilled to disk for read_output.
+        self.outputs = OutputBounder()
+        # Dev servers and watchers run as background jobs so the loop keeps going;
+        # they start in the shell's current folder and are stopped on exit.
+        self.jobs = JobManager()
+        atexit.register(self.jobs.close)
+        # Project venvs are cloned from cached templates instead of pip-installed each time.
+        self.venvs = venvs or VenvCache()
+
+        self.tools = self.build_tools()
+        if not shell_tools:
+            self.tools = {name: tool for name, tool in self.tools.items() if not tool.get("shell")}
+        if sandbox:
+            self.tools = Sandbox(self.root).tools(self.tools)
+        # System prompt plus the schema of the tools left after the filters above,
+        # frozen so every request starts with the same bytes (see prompt_prefix.py).
+        self.prefix = PromptPrefix(self.system_prompt, self.tools, role=self.system_role)
+        self.stats = CallStats()
+        self.context = ContextWindow()
+        # Spans per query, model call, parse, tool call and log write (see tracing.py).
+        # A tracer or tool pool passed in is shared with other agents and left open on close().
+        self._owns_tracer = tracer is None
+        self.tracer = tracer or Tracer.from_env()
+        self.executor = ToolExecutor(self.tools, bound=self.outputs, tracer=self.tracer, pool=pool)
+
+        # Retrieval over the logged sessions ("all", or only this "session"); the
+        # index (and numpy) is loaded on the first query, not at startup.
+        if os.getenv("MYCURSOR_MEMORY") == "0" or importlib.util.find_spec("numpy") is None:
+            memory = None
+        self.memory_scope = memory
+        self._memory = None
+
+        self.store = self.open_session(session or os.getenv("MYCURSOR_SESSION") or self.default_session)
+        self.messages = self.initial_messages() + self.resume()
+
+    def initial_messages(self):
+        """The history of a fresh session: just the frozen prompt prefix."""
+        return [self.prefix.message]
+
+    # Subclasses implement these.
+    @classmethod
+    def build_provider(cls, hedge):
+        raise NotImplementedError
+
+    def run_task(self):
+        """Run the pending query to completion; returns ``(final, calls)``.
+
+        ``final`` is the ``output`` step that ended the task, or None if the
+        loop gave up (invalid response, unknown function, failed model call).
+        """
+        raise NotImplementedError
+
+    def build_tools(self):
+        """The tools both loops share; subclasses add their shell tool and extras.
+
+        ``"files"`` marks the tools a ``Sandbox`` keeps inside the session root,
+        ``"shell"`` the ones left out with ``shell_tools=False``.
+        """
+        # Tools report their calls through echo, so in the server they reach the session's stream.
+        edit_file, apply_patch, replace_lines, search_replace = build_edit_tools(echo=self.echo)
+        read_file, list_files, find_symbol = build_read_tools(self.workspace, echo=self.echo)
+        read_output = build_read_output(self.outputs.store, echo=self.echo)
+        make_venv = build_venv_tools(self.venvs, cwd=lambda: self.root, echo=self.echo)
+        start_job, job_output, check_job, stop_job, list_jobs = build_job_tools(
+            self.jobs, cwd=lambda: self.shell.cwd, echo=self.echo
+        )
+        return {
+            "edit_file": {
+                "description": "Takes a file name, content and folder path as an input and writes the whole file",
+                "fn": edit_file,
+                "concurrency": 4,
+                "timeout": 30,
+                "files": True,
+            },
+            "search_replace": {
+                "description": "Replaces a unique piece of text (or the first one after an anchor) in an existing file",
+                "fn": search_replace,
+                "concurrency": 4,
+                "timeout": 30,
+                "files": True,
+            },
+            "replace_lines": {
+                "description": "Replaces a line range of an existing file, optionally checking its current text",
+                "fn": replace_lines,
+                "concurrency": 4,
+                "timeout": 30,
+                "files": True,
+            },
+            "apply_patch": {
+                "description": "Applies a unified diff to a file; all hunks apply or nothing is written",
+                "fn": apply_patch,
+                "concurrency": 4,
+                "timeout": 30,
+                "files": True,
+            },
+            "read_file": {
+                "description": "Returns a line (or byte) range of a file with line numbers",
+                "fn": read_file,
+                "concurrency": 4,
+                "timeout": 30,
+                "paged": True,
+                "files": True,
+                "path_input": True,
+            },
+            "list_files": {
+                "description": "Lists workspace files with sizes and top-level symbols",
+                "fn": list_files,
+                "concurrency": 2,
+                "timeout": 60,
+                "files": True,
+            },
+            "find_symbol": {
+                "description": "Returns the source of a top-level Python/JS function, class or variable",
+                "fn": find_symbol,
+                "concurrency": 4,
+                "timeout": 60,
+                "files": True,
+            },
+            "make_venv": {
+                "description": "Creates a project venv with the given requirements installed, cloned from a cached template environment",
+                "fn": make_venv,
+                "concurrency": 2,
+                "timeout": 1800,
+                "files": True,
+            },
+            "read_output": {
+                "description": "Returns a line range (optionally grep-filtered) of a spilled tool output by reference id",
+                "fn": read_output,
+                "concurrency": 4,
+                "timeout": 30,
+                "paged": True,
+            },
+            "start_job": {
+                "description": "Starts a long-running command in the background and returns its job id, optionally after a port/url health check",
+                "fn": start_job,
+                "concurrency": 4,
+                "timeout": 180,
+                "shell": True,
+            },
+            "job_output": {
+                "description": "Returns the new output of a background job since the last read",
+                "fn": job_output,
+                "concurrency": 4,
+                "timeout": 30,
+                "shell": True,
+            },
+            "check_job": {
+                "description": "Returns the status of a background job, optionally waiting for a port/url health check",
+                "fn": check_job,
+                "concurrency": 4,
+                "timeout": 180,
+                "shell": True,
+            },
+            "stop_job": {
+                "description": "Stops a background job and its child processes",
+                "fn": stop_job,
+                "concurrency": 4,
+                "timeout": 30,
+                "shell": True,
+            },
+            "list_jobs": {
+                "description": "Lists the background jobs of this session",
+                "fn": list_jobs,
+                "concurrency": 4,
+                "timeout": 30,
+                "shell": True,
+            },
+        }
+
+    def open_session(self, name):
+        session = SessionStore(name, root=self.store_root)
+        # One-time import of the old single-file log into the default session; the
+        # file is renamed afterwards so a later reset is not undone by a re-import.
+        if name == "default" and len(session) == 0 and os.path.exists("session_memory.jsonl"):
+            session.import_jsonl("session_memory.jsonl")
+            os.replace("session_memory.jsonl", "session_memory.jsonl.imported")
+        return session
+
+    def resume(self):
+        """The tail of the current session that is replayed into the history."""
+        messages = self.store.tail(MEMORY_RESUME_MESSAGES if self.memory_scope else RESUME_MESSAGES)
+        # Older messages are the ones memory may recall.
+        self._resumed_from = len(self.store) - len(messages)
+        return messages
+
+    @property
+    def memory(self):
+        if self._memory is None and self.memory_scope:
+            from .memory import Memory
+
+            with self.tracer.span("memory_load"):
+                self._memory = Memory(
+                    self.store_root,
+                    sessions=[self.store.name] if self.memory_scope == "session" else None,
+                    stores={self.store.name: self.store},
+                )
+        return self._memory
+
+    def recall(self, user_query):
+        """A note with the logged snippets most similar to the query, or None."""
+        if not self.memory_scope:
+            return None
+        with self.tracer.span("recall", session=self.store.name) as span:
+            hits = self.memory.search(user_query, MEMORY_K, exclude={self.store.name: self._resumed_from})
+            span.set(hits=len(hits))
+        if not hits:
+            return None
+        lines = ["Relevant snippets from earlier in this and other sessions (for reference; they may be outdated):"]
+        for score, name, number, text in hits:
+            lines.append(f"--- session '{name}', message {number} (similarity {score:.2f})\n{text}")
+        return "\n".join(lines)
+
+    def log_message(self, message):
+        try:
+            if hasattr(message, "dict"):  # handle OpenAI object
+                message = message.dict()
+            number = len(self.store)
+            with self.tracer.span("log"):
+                self.store.append(message)
+                if self._memory is not None:
+                    self._memory.add(self.store.name, number, message)
+        except Exception as e:
+            self.echo("⚠️ Failed to log message:", e)
+
+    def ask(self, user_query):
+        """Run one query as a task, with its spans and log entries."""
+        # Recalled snippets go into the history but not the log, so they are
+        # never indexed (or recalled) themselves.
+        note = self.recall(user_query)
+        if note:
+            self.messages.append({"role": "user", "content": note})
+        self.messages.append({"role": "user", "content": user_query})
+        self.log_message({"role": "user", "content": user_query})
+        self.stats.start_task()
+        query_span = self.tracer.start("query", session=self.store.name)
+        final, calls = self.run_task()
+        query_span.end(calls=calls, completed=bool(final))
+        self.tracer.flush()
+        return final
+
+    def handle(self, user_query):
+        """Handle one line of input; returns False once the user has said goodbye."""
+        command = user_query.strip().lower()
+        if not command:
+            return True
+        if command == "sessions":
+            self.echo("🗂️ Sessions:", ", ".join(list_sessions(self.store_root)), f"(current: {self.store.name})")
+        elif command.startswith("session "):
+            name = user_query.split(" ", 1)[1].strip()
+            if not valid_session_name(name):
+                self.echo(f"🔴 Invalid session name '{name}': use letters, digits, '_', '.' and '-', not starting with '.'.")
+                return True
+            self.store.close()
+            self.store = self.open_session(name)
+            self.messages = self.initial_messages() + self.resume()
+            if self._memory is not None:
+                self._memory.stores[self.store.name] = self.store
+                self._memory.open(self.store.name)
+            self.echo(f"🗂️ Switched to session '{self.store.name}' ({len(self.store)} messages).")
+        elif command == "reset":
+            self.store.reset()
+            self.messages = self.initial_messages()
+            self._resumed_from = 0
+            if self._memory is not None:
+                self._memory.forget(self.store.name)
+            self.echo("🧽 Session reset.")
+        elif command == self.exit_command:
+            self.close()
+            return False
+        else:
+            self.ask(user_query)
+        return True
+
+    def repl(self):
+        try:
+            while self.handle(input(self.prompt)):
+                pass
+        except (EOFError, KeyboardInterrupt):
+            print()
+            self.close()
+
+    def record_model_call(self, model_span, retries, busy, first_token):
+        """End a model span with its usage, retries and time to first token.
+
+        ``busy`` is the time spent on our side of the stream (parsing,
+        printing, running actions); it is taken out of the model span.
+        """
+        # Asked of this agent's CachedProvider: the cache itself may be shared
+        # with other sessions, so its hit count can move during our call.
+        cached = self.provider.last_hit
+        usage = {} if cached else self.provider.last_usage or {}
+        prompt_tokens, cached_tokens = usage.get("prompt_tokens"), usage.get("cached_tokens")
+        self.prefix.record(prompt_tokens, cached_tokens)
+        model_span.end(
+            time.perf_counter() - model_span.start - busy,
+            prompt_tokens=prompt_tokens,
+            cached_prompt_tokens=cached_tokens,
+            uncached_prompt_tokens=prompt_tokens - (cached_tokens or 0) if prompt_tokens is not None else None,
+            completion_tokens=usage.get("completion_tokens"),
+            retries=getattr(self.provider, "retries", 0) - retries,
+            cached=cached,
+            time_to_first_token=round(first_token, 4) if first_token is not None else None,
+        )
+
+    def summaries(self):
+        lines = [
+            self.stats.summary(),
+            self.context.summary(),
+            self.prefix.summary(),
+            self.cache.summary(),
+            self.workspace.summary(),
+            self.outputs.summary(),
+            self.jobs.summary(),
+            self.venvs.summary(),
+        ]
+        if isinstance(self.provider.provider, HedgedProvider):
+            lines.append(self.provider.provider.summary())
+        if self._memory is not None:
+            lines.append(self._memory.summary())
+        lines.append(self.tracer.summary())
+        return lines
+
+    def close(self):
+        for line in self.summaries():
+            self.echo(line)
+        self.executor.shutdown()
+        self.jobs.close()
+        # Let go of the manager (and its output buffers) in a long-running server.
+        atexit.unregister(self.jobs.close)
+        self.shell.close()
+        self.store.close()
+        if self._memory is not None:
+            self._memory.close()
+        if self._owns_tracer:
+            self.tracer.close()
+        else:
+            self.tracer.flush()
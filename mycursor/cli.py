@@ -0,0 +1,130 @@
+"""Command line entry point.
+
+    mycursor                                  # interactive, OpenAI backend
+    mycursor -p gemini -s blog                # Gemini, resume session "blog"
+    mycursor -q "Create a Flask hello world"  # one-shot: run, print summaries, exit
+    mycursor --batch queries.txt              # one query per line ("-" reads stdin)
+    mycursor -p fake --fake-replies steps.json -q "..."   # offline, scripted replies
+
+Exits with 1 when a one-shot or batch query did not finish with an output step.
+"""
+import argparse
+import json
+import os
+import sys
+
+from . import __version__
+from .session_store import valid_session_name
+
+PROVIDERS = ("openai", "gemini", "fake")
+FAKE_REPLIES = [{"step": "output", "content": "Done."}]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="mycursor", description="Terminal coding agent.")
+    parser.add_argument(
+        "-p", "--provider", choices=PROVIDERS, default=os.getenv("MYCURSOR_PROVIDER", "openai"),
+        help="model backend (default: $MYCURSOR_PROVIDER or openai)",
+    )
+    parser.add_argument("-s", "--session", help="session to resume or create (default: $MYCURSOR_SESSION)")
+    parser.add_argument("-q", "--query", action="append", default=[], help="run a query and exit; repeatable")
+    parser.add_argument("--batch", metavar="FILE", help="run every non-empty line of FILE ('-' for stdin) and exit")
+    parser.add_argument(
+        "--hedge", action="store_true", default=None,
+        help="race the other backend against slow calls (replies then arrive whole, not streamed)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the completion cache")
+    parser.add_argument("--replay", action="store_true", help="serve completions only from the cache")
+    parser.add_argument(
+        "--fake-replies", metavar="FILE", default=os.getenv("MYCURSOR_FAKE_REPLIES"),
+        help="JSON list of scripted replies for --provider fake (default: a single output step)",
+    )
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    return parser
+
+
+def read_batch(path):
+    if path == "-":
+        return [line.strip() for line in sys.stdin if line.strip()]
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def create_agent(provider, session=None, hedge=None, cache=None, backend=None, **options):
+    """Build the agent of ``provider``; only that backend's module is imported.
+
+    ``options`` go to ``Agent`` (root, sandbox, a shared tracer or tool pool, ...).
+    ``backend`` is a model provider to use instead of building one (see
+    ``create_provider``).
+    ``"fake"`` runs the OpenAI loop against a ``FakeProvider`` with
+    ``fake_replies`` (a JSON file path), so nothing is contacted.
+    """
+    fake_replies = options.pop("fake_replies", None)
+    if provider == "fake":
+        from .openai_agent import OpenAIAgent
+        from .providers import FakeProvider
+
+        replies = FAKE_REPLIES
+        if fake_replies:
+            with open(fake_replies, encoding="utf-8") as f:
+                replies = json.load(f)
+        return OpenAIAgent(session=session, hedge=False, cache=cache, provider=FakeProvider(replies), **options)
+    return _agent_class(provider)(session=session, hedge=hedge, cache=cache, provider=backend, **options)
+
+
+def create_provider(provider, hedge=None):
+    """The model backend the agent of ``provider`` would build, to share between agents (e.g. in the server)."""
+    if hedge is None:
+        hedge = os.getenv("MYCURSOR_HEDGE") == "1"
+    return _agent_class(provider).build_provider(hedge)
+
+
+def _agent_class(provider):
+    if provider == "gemini":
+        from .gemini_agent import GeminiAgent
+
+        return GeminiAgent
+    from .openai_agent import OpenAIAgent
+
+    return OpenAIAgent
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    session = args.session or os.getenv("MYCURSOR_SESSION")
+    if session is not None and not valid_session_name(session):
+        parser.error(f"invalid session name '{session}' (letters, digits, '_', '.' and '-', not starting with '.')")
+    queries = list(args.query)
+    if args.batch:
+        queries.extend(read_batch(args.batch))
+
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        pass
+    else:
+        load_dotenv()
+
+    cache = None
+    if args.no_cache or args.replay:
+        from .completion_cache import CompletionCache
+
+        cache = CompletionCache(enabled=not args.no_cache, replay=args.replay)
+    agent = create_agent(args.provider, args.session, args.hedge, cache, fake_replies=args.fake_replies)
+
+    if not queries:
+        agent.repl()
+        return
+    failed = 0
+    for query in queries:
+        if not agent.ask(query):
+            failed += 1
+    agent.close()
+    if failed:
+        print(f"🔴🔴 {failed} of {len(queries)} queries did not complete.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from .context_window import message_text
+
+
+DEFAULT_ROOT = os.getenv("MYCURSOR_CACHE_DIR", os.path.join(".cache", "completions"))
+DEFAULT_MAX_BYTES = int(os.getenv("MYCURSOR_CACHE_BYTES", str(256 * 1024 * 1024)))
+
+
+class CacheMiss(Exception):
+    """Raised in replay mode when a completion is not in the cache."""
+
+
+# Observation fields that differ from run to run (timings, process ids, absolute
+# paths) and are left out of the key, so a recorded session replays.
+VOLATILE_FIELDS = frozenset({"duration", "cwd", "pid", "uptime", "seconds"})
+
+
+def _stable(value):
+    if isinstance(value, dict):
+        return {key: _stable(item) for key, item in value.items() if key not in VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [_stable(item) for item in value]
+    return value
+
+
+def _key_text(message):
+    text = message_text(message)
+    if '"observe"' not in text:
+        return text
+    try:
+        step = json.loads(text)
+    except ValueError:
+        return text
+    if not isinstance(step, dict) or step.get("step") != "observe":
+        return text
+    return json.dumps(_stable(step), sort_keys=True)
+
+
+def normalize_messages(messages):
+    """Role and text of every message, whatever SDK shape it came in, without volatile observation fields."""
+    return [
+        {"role": message.get("role"), "content": _key_text(message)}
+        for message in messages
+    ]
+
+
+class CompletionCache:
+    """Content-addressed on-disk cache of model completions.
+
+    Entries are keyed by a SHA-256 of the model name, the generation config and
+    the normalized messages, and stored as ``<root>/<key[:2]>/<key>.json``. The
+    modification time of an entry is bumped on every hit, and the least
+    recently used entries are evicted once the cache grows past ``max_bytes``.
+
+    With ``replay=True`` the model is never called: a miss raises ``CacheMiss``,
+    which makes recorded sessions rerun offline and deterministically.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, max_bytes=DEFAULT_MAX_BYTES, replay=False, enabled=True):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.replay = replay
+        self.enabled = enabled or replay
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size = None
+
+    @classmethod
+    def from_env(cls):
+        """MYCURSOR_CACHE=0 disables the cache, MYCURSOR_REPLAY=1 serves only from it."""
+        return cls(
+            enabled=os.getenv("MYCURSOR_CACHE", "1") != "0",
+            replay=os.getenv("MYCURSOR_REPLAY", "0") == "1",
+        )
+
+    @staticmethod
+    def key(model, config, messages):
+        payload = json.dumps(
+            {"model": model, "config": config, "messages": normalize_messages(messages)},
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + ".json")
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = json.load(f)["text"]
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            if self.replay:
+                raise CacheMiss(f"No cached completion for {key[:12]} (replay mode).")
+            return None
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, key, text, model=None):
+        if not self.enabled or self.replay:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps({"model": model, "text": text, "created": time.time()}, ensure_ascii=False)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data.encode("utf-8"))
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        if not os.path.isdir(self.root):
+            return
+        for shard in os.listdir(self.root):
+            shard_path = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_path):
+                continue
+            for name in os.listdir(shard_path):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(shard_path, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        # Drop least recently used entries until we are back under 90% of the cap.
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self._size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for path, size, _ in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= size
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        mode = " (replay)" if self.replay else ""
+        return f"💾 completion cache{mode}: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
@@ -0,0 +1,187 @@
+import json
+import os
+from functools import lru_cache
+
+
+DEFAULT_BUDGET = int(os.getenv("MYCURSOR_CONTEXT_TOKENS", "16000"))
+
+# Per-message overhead of the chat format (role, separators).
+MESSAGE_OVERHEAD = 4
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str) -> int:
+    """Count tokens locally, with tiktoken when installed, ~4 chars/token otherwise."""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    # Imported on the first count rather than at startup.
+    try:
+        import tiktoken
+    except ImportError:  # optional: fall back to a character-based estimate
+        return None
+    return tiktoken.get_encoding("o200k_base")
+
+
+def message_text(message) -> str:
+    """The text of an OpenAI-style (`content`) or Gemini-style (`parts`) message."""
+    if "parts" in message:
+        return "\n".join(str(part) for part in message["parts"])
+    return message.get("content") or ""
+
+
+def message_tokens(message) -> int:
+    # The prompt prefix (see prompt_prefix.py) carries its count, computed once.
+    tokens = getattr(message, "tokens", None)
+    if tokens is not None:
+        return tokens
+    return count_tokens(message_text(message)) + MESSAGE_OVERHEAD
+
+
+def _with_text(message, text):
+    if "parts" in message:
+        return {"role": message["role"], "parts": [text]}
+    return {"role": message["role"], "content": text}
+
+
+def _shorten(text, limit):
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _truncate_middle(text, limit):
+    if len(text) <= limit:
+        return text
+    half = limit // 2
+    return f"{text[:half]}\n[... {len(text) - limit} characters truncated ...]\n{text[-half:]}"
+
+
+class ContextWindow:
+    """Chooses which part of the conversation is sent to the model.
+
+    The first message (the system prompt) is always kept. The most recent
+    messages are kept verbatim as long as they fit the token budget; bulky
+    observations among them, apart from the newest ones, are cut down to their
+    head and tail. Everything older is folded into a single summary message.
+    The full history itself is never modified.
+    """
+
+    def __init__(
+        self,
+        budget=DEFAULT_BUDGET,
+        summary_tokens=1500,
+        observation_chars=2000,
+        full_observations=4,
+    ):
+        self.budget = budget
+        self.summary_tokens = summary_tokens
+        self.observation_chars = observation_chars
+        self.full_observations = full_observations
+        self.calls = []
+
+    def build(self, messages):
+        pinned, rest = messages[0], messages[1:]
+        available = self.budget - message_tokens(pinned) - self.summary_tokens
+
+        recent = []
+        observations_seen = 0
+        for message in reversed(rest):
+            if _is_observation(message):
+                observations_seen += 1
+                if observations_seen > self.full_observations:
+                    message = self._compact_observation(message)
+            cost = message_tokens(message)
+            if recent and cost > available:
+                break
+            available -= cost
+            recent.append(message)
+        recent.reverse()
+
+        older = rest[: len(rest) - len(recent)]
+        window = [pinned]
+        if older:
+            window.append(_with_text(pinned, self._summarize(older)))
+        window.extend(recent)
+
+        self.calls.append({
+            "messages": len(messages),
+            "full_tokens": sum(message_tokens(m) for m in messages),
+            "sent_tokens": sum(message_tokens(m) for m in window),
+        })
+        return window
+
+    def _compact_observation(self, message):
+        text = message_text(message)
+        if len(text) <= self.observation_chars:
+            return message
+        return _with_text(message, _truncate_middle(text, self.observation_chars))
+
+    def _summarize(self, messages):
+        lines = []
+        for message in messages:
+            line = _summary_line(message)
+            if line:
+                lines.append(line)
+        # Keep the newest lines when even the summary is over its budget.
+        kept, used = [], 0
+        for line in reversed(lines):
+            used += count_tokens(line) + 1
+            if used > self.summary_tokens:
+                break
+            kept.append(line)
+        kept.reverse()
+        header = f"Summary of the {len(messages)} earlier messages of this session"
+        if len(kept) < len(lines):
+            header += f" ({len(lines) - len(kept)} oldest entries omitted)"
+        return header + ":\n" + "\n".join(kept)
+
+    def summary(self):
+        if not self.calls:
+            return "🧮 No model calls yet."
+        full = sum(c["full_tokens"] for c in self.calls) / len(self.calls)
+        sent = sum(c["sent_tokens"] for c in self.calls) / len(self.calls)
+        return (
+            f"🧮 tokens per call: {sent:.0f} sent vs {full:.0f} for the full history "
+            f"(budget {self.budget})"
+        )
+
+
+def _parse_step(text):
+    try:
+        value = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def _is_observation(message):
+    step = _parse_step(message_text(message))
+    return step is not None and step.get("step") == "observe"
+
+
+def _summary_line(message):
+    text = message_text(message)
+    step = _parse_step(text)
+    if step is None:
+        if message.get("role") == "user":
+            return f"- user: {_shorten(text, 200)}"
+        return None
+    steps = step.get("steps") if isinstance(step.get("steps"), list) else [step]
+    parts = []
+    for item in steps:
+        if not isinstance(item, dict):
+            continue
+        kind = item.get("step")
+        if kind == "action":
+            parts.append(f"ran {item.get('function')}({_shorten(json.dumps(item.get('input')), 80)})")
+        elif kind == "output":
+            parts.append(f"answered: {_shorten(item.get('content'), 200)}")
+        elif kind == "observe":
+            output = item.get("output", item.get("outputs"))
+            parts.append(f"observed: {_shorten(json.dumps(output), 120)}")
+    return f"- {'; '.join(parts)}" if parts else None
@@ -0,0 +1,192 @@
+import functools
+import os
+import re
+import tempfile
+
+
+# How far (in lines) a diff hunk may have drifted from the line numbers in its header.
+PATCH_FUZZ = 50
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class EditConflict(Exception):
+    """The file does not look the way the edit expects; nothing was written."""
+
+
+def _resolve(params):
+    file_name = params["file_name"]
+    folder_path = params.get("folder_path")
+    return os.path.join(folder_path, file_name) if folder_path else file_name
+
+
+def atomic_write(path, content):
+    """Write through a temp file in the same folder and rename it into place."""
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        if os.path.exists(path):
+            os.chmod(tmp, os.stat(path).st_mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def edit_file(params, echo=print) -> str:
+    file_name = params.get("file_name") if isinstance(params, dict) else None
+    try:
+        file_name = _resolve(params)
+        echo("🔨 Tool Called: edit_file", file_name)
+        atomic_write(file_name, params["content"])
+        return f"File '{file_name}' edited successfully."
+
+    except Exception as e:
+        return f"Error editing file '{file_name}': {str(e)}"
+
+
+def _parse_hunks(diff):
+    hunks, hunk = [], None
+    for line in diff.splitlines():
+        header = _HUNK_HEADER.match(line)
+        if header:
+            hunk = {"start": int(header.group(1)), "old": [], "new": []}
+            hunks.append(hunk)
+        elif hunk is None:
+            continue  # "---"/"+++" file headers
+        elif line.startswith("\\"):
+            continue  # "\ No newline at end of file"
+        elif line.startswith("-"):
+            hunk["old"].append(line[1:])
+        elif line.startswith("+"):
+            hunk["new"].append(line[1:])
+        else:
+            text = line[1:] if line.startswith(" ") else line
+            hunk["old"].append(text)
+            hunk["new"].append(text)
+    if not hunks:
+        raise EditConflict("The diff has no @@ hunks.")
+    return hunks
+
+
+def _find_hunk(lines, old, expected):
+    """Index where ``old`` matches ``lines``, searching outwards from ``expected``."""
+    stripped = [line.rstrip("\r\n") for line in old]
+    size = len(stripped)
+    for distance in range(PATCH_FUZZ + 1):
+        for index in (expected - distance, expected + distance):
+            if 0 <= index <= len(lines) - size and all(
+                lines[index + k].rstrip("\r\n") == stripped[k] for k in range(size)
+            ):
+                return index
+            if distance == 0:
+                break
+    return None
+
+
+def _line_ending(text):
+    return "\r\n" if "\r\n" in text else "\n"
+
+
+def apply_patch(params, echo=print) -> str:
+    """Apply a unified diff (``diff``) to ``file_name``; all hunks or nothing."""
+    try:
+        path = _resolve(params)
+        echo("🔨 Tool Called: apply_patch", path)
+        text = _read(path) if os.path.exists(path) else ""
+        newline = _line_ending(text)
+        lines = text.splitlines(keepends=True)
+        offset = 0
+        for number, hunk in enumerate(_parse_hunks(params["diff"]), 1):
+            expected = max(0, hunk["start"] - 1 + offset)
+            index = _find_hunk(lines, hunk["old"], expected)
+            if index is None:
+                raise EditConflict(f"Hunk {number} does not match the file near line {hunk['start']}.")
+            replacement = [line + newline for line in hunk["new"]]
+            if index + len(hunk["old"]) == len(lines) and lines and not lines[-1].endswith("\n") and replacement:
+                replacement[-1] = replacement[-1][: -len(newline)]
+            lines[index:index + len(hunk["old"])] = replacement
+            offset += len(hunk["new"]) - len(hunk["old"])
+        atomic_write(path, "".join(lines))
+        return f"Patch applied to '{path}'."
+    except EditConflict as e:
+        return f"Conflict patching '{params.get('file_name')}': {e} Nothing was written."
+    except Exception as e:
+        return f"Error patching '{params.get('file_name')}': {e}"
+
+
+def replace_lines(params, echo=print) -> str:
+    """Replace lines ``start_line``..``end_line`` (1-based, inclusive) with ``content``.
+
+    If ``expected`` is given it must equal the current text of that range.
+    """
+    try:
+        path = _resolve(params)
+        echo("🔨 Tool Called: replace_lines", path)
+        text = _read(path)
+        newline = _line_ending(text)
+        lines = text.splitlines(keepends=True)
+        start, end = int(params["start_line"]), int(params.get("end_line", params["start_line"]))
+        if start < 1 or end < start - 1 or end > len(lines):
+            raise EditConflict(f"Lines {start}-{end} are outside the file ({len(lines)} lines).")
+        current = "".join(lines[start - 1:end])
+        expected = params.get("expected")
+        if expected is not None and current.rstrip("\r\n") != expected.rstrip("\r\n"):
+            raise EditConflict(f"Lines {start}-{end} no longer contain the expected text.")
+        content = params.get("content", "")
+        if content and not content.endswith("\n") and end < len(lines):
+            content += newline
+        lines[start - 1:end] = [content]
+        atomic_write(path, "".join(lines))
+        return f"Replaced lines {start}-{end} of '{path}'."
+    except EditConflict as e:
+        return f"Conflict editing '{params.get('file_name')}': {e} Nothing was written."
+    except Exception as e:
+        return f"Error editing '{params.get('file_name')}': {e}"
+
+
+def search_replace(params, echo=print) -> str:
+    """Replace the text ``search`` with ``replace``.
+
+    Without an ``anchor``, ``search`` must occur exactly once so an edit never
+    lands in the wrong place; with one, its first occurrence after the anchor
+    text is replaced.
+    """
+    try:
+        path = _resolve(params)
+        echo("🔨 Tool Called: search_replace", path)
+        text = _read(path)
+        search = params["search"]
+        begin = 0
+        anchor = params.get("anchor")
+        if anchor:
+            begin = text.find(anchor)
+            if begin == -1:
+                raise EditConflict("The anchor text was not found.")
+            begin += len(anchor)
+        index = text.find(search, begin)
+        if index == -1:
+            raise EditConflict("The search text was not found.")
+        if not anchor and text.find(search, index + 1) != -1:
+            raise EditConflict("The search text occurs more than once; add an anchor.")
+        text = text[:index] + params.get("replace", "") + text[index + len(search):]
+        atomic_write(path, text)
+        return f"Replaced text in '{path}'."
+    except EditConflict as e:
+        return f"Conflict editing '{params.get('file_name')}': {e} Nothing was written."
+    except Exception as e:
+        return f"Error editing '{params.get('file_name')}': {e}"
+
+
+def build_edit_tools(echo=print):
+    """``edit_file``, ``apply_patch``, ``replace_lines`` and ``search_replace``, reporting calls through ``echo``."""
+    return tuple(functools.partial(fn, echo=echo) for fn in (edit_file, apply_patch, replace_lines, search_replace))
@@ -0,0 +1,372 @@
+import json
+import time
+
+from .agent import Agent
+from .completion_cache import CacheMiss
+from .hedging import HedgedProvider
+from .providers import GeminiProvider, OpenAIProvider, ProviderError
+from .step_stream import JSONObjectExtractor
+from .steps import BATCH_PROMPT, observation_message, parse_steps, run_steps
+
+
+GENERATION_CONFIG = {"temperature": 0.7, "max_output_tokens": 1024}
+
+WEATHER_PROMPT = """ You are an helpfull AI Assistant who is specialized in resolving user query.
+    You work on start, plan, action, observe mode.
+    For the given user query and available tools, plan the step by step execution, based on the planning,
+    select the relevant tool from the available tool. and based on the tool selection you perform an action to call the tool.
+    Wait for the observation and based on the observation from the tool call resolve the user query.
+
+    Rules:
+    - Follow the Output JSON Format.
+    - Perform one step at a time and wait for next input, unless the steps can be batched
+    - Carefully analyse the user query
+    - This is a windows machine. So keep any OS operations windows specific.
+
+    Output JSON Format:
+    {
+        "step": "string",
+        "content": "string",
+        "function": "The name of function if the step is action",
+        "input": "The input parameter for the function"
+    }
+
+    Available Tools:
+    - get_weather: Takes a city name as an input and returns the current weather for the city. Pass a list of city names to compare several cities in one call
+    - run_command: Takes a command as input to execute on system and returns ouput
+
+    Example:
+    User Query: What is the weather of new york?
+    Output: { "step": "plan", "content": "The user is interseted in weather data of new york" }
+    Output: { "step": "plan", "content": "From the available tools I should call get_weather" }
+    Output: { "step": "action", "function": "get_weather", "input": "new york" }
+    Output: { "step": "observe", "output": "12 Degree Cel" }
+    Output: { "step": "output", "content": "The weather for new york seems to be 12 degrees." }
+
+    Tree-of-Thought Prompting: For more complex multi-part queries, allowing the model to explore multiple reasoning paths for each part and then evaluate them can increase the likelihood of a consistent and correct overall response.
+
+Here are a few multi-part weather query scenarios and how a ToT approach might look internally (you would guide the model to consider these options):
+
+**Case 1: Weather in Two Locations with Ambiguity**
+
+User Query: "What's the weather like in London and is it warmer than here?"
+
+Thought 1 (Initial Plan): Get the weather for London and compare it to the current weather. *Potential Issue: "here" is ambiguous.*
+
+Branch 1.1 (Clarification): Ask the user for their current location to make the comparison.
+   * Action: `{"step": "output", "content": "To compare the weather, could you please tell me your current location?"}`
+
+Branch 1.2 (Assume Default Location): Assume the user's current location is the system's default location (Indore).
+   * Action 1: `{"step": "action", "function": "get_weather", "input": "London"}`
+   * Action 2: `{"step": "action", "function": "get_weather", "input": "Indore"}`
+   * Observe 1: `{"step": "observe", "output": "Partly cloudy 15°C"}` (London)
+   * Observe 2: `{"step": "observe", "output": "Sunny 32°C"}` (Indore)
+   * Output: `{"step": "output", "content": "The weather in London is partly cloudy with a temperature of 15°C. That is cooler than the current weather in Indore, which is sunny at 32°C."}`
+
+Evaluation: Branch 1.1 is more robust as it resolves ambiguity. Branch 1.2 makes an assumption that might be incorrect.
+
+**Case 2: Weather Forecast and Specific Conditions**
+
+User Query: "Will it rain in Mumbai tomorrow, and what will the temperature be like in the evening?"
+
+Thought 1 (Linear Plan): Get the forecast for Mumbai and then try to extract evening temperature and rain information. *Potential Issue: Might require parsing a longer forecast string.*
+
+Branch 2.1 (Separate Queries - More Structured):
+   * Action 1: `{"step": "action", "function": "get_weather", "input": "Mumbai tomorrow rain"}` (Assuming the tool can handle specific forecast queries)
+   * Action 2: `{"step": "action", "function": "get_weather", "input": "Mumbai tomorrow evening temperature"}` (Assuming the tool can handle time-specific temperature)
+   * Observe 1: `{"step": "observe", "output": "Yes, there is a 60% chance of rain tomorrow in Mumbai."}`
+   * Observe 2: `{"step": "observe", "output": "The temperature in Mumbai tomorrow evening is expected to be around 28°C."}`
+   * Output: `{"step": "output", "content": "Yes, there is a 60% chance of rain in Mumbai tomorrow. The temperature in the evening is expected to be around 28°C."}`
+
+Branch 2.2 (Single Forecast Query - More Parsing):
+   * Action: `{"step": "action", "function": "get_weather", "input": "Mumbai tomorrow forecast"}`
+   * Observe: `{"step": "observe", "output": "Tomorrow in Mumbai: Morning - Sunny 30°C, Afternoon - Cloudy with showers 32°C, Evening - Light rain 28°C, Night - Partly cloudy 26°C"}`
+   * Thought 2.2.1 (Parsing): Extract rain information (Yes, light rain) and evening temperature (28°C) from the forecast string.
+   * Output: `{"step": "output", "content": "Yes, there will be light rain in Mumbai tomorrow evening. The temperature is expected to be around 28°C."}`
+
+Evaluation: Branch 2.1 relies on more specific tool capabilities but is cleaner. Branch 2.2 requires more complex parsing of the tool's output.
+
+**Case 3: Weather Comparison with Units**
+
+User Query: "Is it hotter in Delhi than in Bangalore right now? Tell me the temperatures in Fahrenheit."
+
+Thought 1 (Direct Comparison): Get temperatures and then compare. *Potential Issue: Default units might be Celsius.*
+
+Branch 3.1 (Unit Conversion in Tool - Ideal): Assume the \`get_weather\` tool can handle unit conversion.
+   * Action 1: \`{"step": "action", "function": "get_weather", "input": "Delhi Fahrenheit"}\`
+   * Action 2: \`{"step": "action", "function": "get_weather", "input": "Bangalore Fahrenheit"}\`
+   * Observe 1: \`{"step": "observe", "output": "Delhi: 95°F"}\`
+   * Observe 2: \`{"step": "observe", "output": "Bangalore: 82°F"}\`
+   * Output: \`{"step": "output", "content": "Yes, it is hotter in Delhi (95°F) than in Bangalore (82°F) right now."}\`
+
+Branch 3.2 (Unit Conversion After Observation - More Complex):
+   * Action 1: \`{"step": "action", "function": "get_weather", "input": "Delhi"}\` (Default Celsius)
+   * Action 2: \`{"step": "action", "function": "get_weather", "input": "Bangalore"}\` (Default Celsius)
+   * Observe 1: \`{"step": "observe", "output": "Delhi: 35°C"}\`
+   * Observe 2: \`{"step": "observe", "output": "Bangalore: 28°C"}\`
+   * Thought 3.2.1 (Conversion): Convert 35°C to Fahrenheit: (35 * 9/5) + 32 = 95°F. Convert 28°C to Fahrenheit: (28 * 9/5) + 32 = 82.4°F (round to 82°F).
+   * Output: \`{"step": "output", "content": "Yes, it is hotter in Delhi (95°F) than in Bangalore (82°F) right now."}\`
+
+Evaluation: Branch 3.1 is cleaner if the tool supports unit conversion. Branch 3.2 requires additional calculation logic.
+"""
+
+FULLSTACK_AGENT_PROMPT = """
+You are a terminal-based AI Agent specialized in building full-stack web development projects.
+
+Your core loop follows a strict 4-phase reasoning pipeline:
+1. **Plan**
+2. **Action**
+3. **Observe**
+4. **Output**
+
+You never skip steps. Steps that do not need a new observation may be batched into one response.
+
+---
+
+## 🧠 Thought Process (Tree-of-Thought Planning)
+
+For each user request, you must **simulate multiple reasoning branches** to evaluate alternative approaches. This allows better tool use and decision-making before executing actions.
+
+Examples of Thought Branching:
+- Should I create a new file or modify an existing one?
+- Should I install packages before generating code, or vice versa?
+- Should I split logic into separate modules?
+
+Only after exploring and evaluating the branches, choose the best path and continue to the next step in the loop.
+
+---
+
+## 🛠️ Terminal-Based Constraints
+
+You operate **only through the terminal (CLI)**. No GUI interaction is allowed.
+
+Supported actions include:
+- Installing packages (`npm install`; Python venvs come from `make_venv`, `pip install` only adds to an existing one)
+- Running build tools (`npm run build`, etc.)
+- Starting dev servers (`flask run`, `npm start`) with `start_job`, never `run_command`, which would
+  block until the server exits; verify them with a `port` or `url` health check
+
+All such commands are executed using the `run_command` tool. Files are written with the file
+tools below, never with `echo ... > file`, and read with `read_file` / `find_symbol`, never
+with `type filename.txt`.
+
+---
+
+## 📦 Responsibilities
+
+You are expected to:
+- Initialize full-stack project folders
+- Generate file structures
+- Create backend routes (Flask, Express, etc.)
+- Setup frontend scaffolds (React, HTML, etc.)
+- Add features (e.g., login/signup) via follow-up prompts
+- Manage package installation
+- Parse existing code and modify files appropriately
+- Always explain your reasoning and next step clearly in the `plan` phase
+- You are working on a "windows" based machine. (strict)
+---
+
+## 🔁 Reasoning Loop Format
+
+For every query, always follow this loop:
+
+1. **Plan** – Decide the sequence of actions and explore options via internal branching.
+2. **Action** – Execute **only one command** using `run_command` (`type`, `mkdir`, etc.) or one file tool.
+3. **Observe** – Wait for and process the result/output or exit code.
+4. **Output** – Give a user-facing update and explain the result. If more steps are required, loop back to Plan.
+
+Each step is its own JSON object; independent steps may be sent together as a batch.
+
+---
+
+## 🧰 Tool Inputs
+
+What each tool does is listed under "Available functions" at the end; this is what its `input` takes.
+
+- `run_command`: a command string (Windows).
+- `get_weather`: a city name, or a list of city names.
+- `edit_file`: `file_name`, `folder_path`, `content`.
+- `search_replace`: `file_name`, `folder_path`, `search` (exact text, must be unique), `replace`, optional `anchor` (text the search starts after).
+- `replace_lines`: `file_name`, `folder_path`, `start_line`, `end_line` (1-based, inclusive), `content`, optional `expected` (current text of the range).
+- `apply_patch`: `file_name`, `folder_path`, `diff` (unified diff).
+- `read_file`: `file_name`, `folder_path`, optional `start_line`, `end_line` (or `start_byte`, `end_byte`).
+- `list_files`: optional `folder_path`, `pattern` (e.g. `*.py`).
+- `find_symbol`: `name`, optional `file_name`, `folder_path`.
+- `start_job`: `command`, optional `port` or `url` to wait for, `timeout` (seconds).
+- `job_output`: `job_id`, optional `max_lines`.
+- `check_job`: `job_id`, optional `port`, `url`, `timeout`.
+- `stop_job`: `job_id`.
+- `list_jobs`: nothing.
+- `make_venv`: `folder_path`, `requirements` (list of packages, or the name of a requirements file in the folder), optional `name` (default `venv`).
+- `read_output`: `ref` (from a cut output), optional `start_line`, `end_line`, `grep` (regex filter).
+
+The `run_command` shell keeps its working directory and activated venv between calls. Jobs start in
+its current folder but do not inherit the venv activation, so call the venv's python/flask/npm
+directly. Use `make_venv` instead of `python -m venv` + `pip install`.
+
+When changing an existing file, only send the part that changes (`search_replace`, `replace_lines`
+or `apply_patch`); never re-emit the whole file. Likewise read only what you need: ask for
+"function X in app.py" with `find_symbol` rather than reading the whole file. Long command
+outputs come back as `head`, `tail`, `error_lines` and a `ref`; check `error_lines` first and use
+`read_output` only for the lines you need.
+
+---
+
+## 🧪 Example: Flask Hello World App
+
+**User Query:** "Create a basic Flask backend with a route that says 'Hello, World!' in a file named 'app.py'."
+
+**Thoughts (Tree-of-Thought Planning):**
+Branch A: First write the Flask code, then install Flask.
+Branch B: Install Flask first, then write the code.
+Evaluation: Installing Flask first ensures smoother execution if the user runs it right away.
+→ Choose Branch B.
+
+Final Response (Step-by-Step):
+
+```json
+{
+  "step": "plan",
+  "content": "The user wants a Flask app with a 'Hello, World!' route. I will first install Flask, then create 'app.py' with the route code."
+}
+"""
+
+
+class GeminiAgent(Agent):
+    """The gemini-2.0-flash loop: free-form replies, JSON objects extracted from the stream."""
+
+    name = "gemini"
+    prompt = "> "
+    exit_command = "bye"
+    default_session = "gemini"
+    # Sent as the first user turn, as the prompt always was.
+    system_prompt = FULLSTACK_AGENT_PROMPT + BATCH_PROMPT
+    system_role = "user"
+
+    def __init__(self, *args, **kwargs):
+        # Created on the first get_weather call, so `requests` is only imported when used.
+        self.weather = None
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def build_provider(cls, hedge):
+        provider = GeminiProvider("gemini-2.0-flash")
+        if hedge:
+            # Race gpt-4o against a slow Gemini step (see hedging.py).
+            provider = HedgedProvider(
+                provider,
+                OpenAIProvider("gpt-4o"),
+                secondary_config={"temperature": 0.7, "max_tokens": 1024},
+            )
+        return provider
+
+    def print_step(self, step):
+        self.echo(f"Step: {step.get('step')}")
+        self.echo(f"Content: {step.get('content')}")
+        if step.get("step") == "observe":
+            self.echo(f"Observation: {step.get('output')}")
+
+    def run_command(self, command):
+        self.echo(command)
+        return self.shell.run(command)
+
+    def get_weather(self, city):
+        import requests
+
+        from .weather import WeatherClient, WeatherError
+
+        self.echo("🔨 Tool Called: get_weather", city)
+        if self.weather is None:
+            self.weather = WeatherClient()
+        # A list of cities (e.g. "London vs Indore") is looked up concurrently.
+        if isinstance(city, list):
+            results = self.weather.get_many(city)
+            return "\n".join(
+                f"The weather in {name} is {result}." if isinstance(result, str) else f"{name}: Something went wrong"
+                for name, result in results.items()
+            )
+        try:
+            return f"The weather in {city} is {self.weather.get(city)}."
+        except (requests.RequestException, WeatherError):
+            return "Something went wrong"
+
+    def build_tools(self):
+        avaiable_tools = {
+            "get_weather": {
+                "fn": self.get_weather,
+                "concurrency": 4,
+                "timeout": 15,
+                "description": "Takes a city name (or a list of city names) as an input and returns the current weather for each city"
+            },
+            "run_command": {
+                "fn": self.run_command,
+                "timeout": 600,
+                "shell": True,
+                "description": "Takes a command as input to execute in a persistent shell session and returns exit_code, stdout, stderr and duration"
+            },
+        }
+        avaiable_tools.update(super().build_tools())
+        return avaiable_tools
+
+    def run_task(self):
+        calls = 0
+        while True:
+            self.stats.record_call()
+            calls += 1
+            # 🧽 Markdown fences and prose around the JSON are skipped by the extractor.
+            extractor = JSONObjectExtractor()
+            objects = []
+            output = ""
+            model_span = self.tracer.start("model", provider=self.provider.name)
+            retries = getattr(self.provider, "retries", 0)
+            parse_time = 0.0
+            first_token = None
+            try:
+                for delta in self.provider.stream(self.context.build(self.messages), GENERATION_CONFIG):
+                    handled = time.perf_counter()
+                    if first_token is None:
+                        first_token = handled - model_span.start - parse_time
+                    output += delta
+                    objects.extend(extractor.feed(delta))
+                    parse_time += time.perf_counter() - handled
+            except (CacheMiss, ProviderError) as e:
+                self.echo(f"⚠️ Gemini call failed: {e}")
+                model_span.end(error=str(e))
+                return None, calls
+            handled = time.perf_counter()
+            objects.extend(extractor.close())
+            parse_time += time.perf_counter() - handled
+            self.record_model_call(model_span, retries, parse_time, first_token)
+            self.tracer.record("parse", parse_time, bytes=len(output))
+            steps = [step for obj in objects for step in parse_steps(obj)]
+
+            if not steps:
+                self.echo("⚠️ No JSON object found in Gemini response.")
+                self.echo(output)
+                return None, calls
+
+            reply = {"role": "assistant", "content": json.dumps({"steps": steps})}
+            self.messages.append(reply)
+            self.log_message(reply)
+            observations, final = run_steps(steps, self.executor, report=self.print_step)
+
+            # Every observation of the batch goes back in a single follow-up call,
+            # and is kept in the history even when the batch ended with its output.
+            if observations:
+                observe = {"role": "user", "content": observation_message(observations)}
+                self.messages.append(observe)
+                self.log_message(observe)
+                self.stats.record_observation(observe["content"])
+
+            if final:
+                self.echo(f"🤖: {final.get('content')}")
+                self.stats.complete_task()
+                return final, calls
+
+            if not observations and any(step.get("step") == "observe" for step in steps):
+                self.messages.append({"role": "user", "content": "Based on the observation, what is the final output?"})
+
+    def close(self):
+        super().close()
+        if self.weather is not None:
+            self.weather.close()
@@ -0,0 +1,157 @@
+import math
+import queue
+import threading
+import time
+from collections import deque
+
+from .providers import Completion, PerThread, ProviderError
+from .step_stream import JSONObjectExtractor
+from .steps import parse_steps
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of ``values`` (``p`` in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def is_valid_step(text):
+    """True if ``text`` holds at least one JSON step (fences and prose allowed)."""
+    extractor = JSONObjectExtractor()
+    objects = extractor.feed(text) + extractor.close()
+    return any(parse_steps(obj) for obj in objects)
+
+
+class HedgedProvider:
+    """Races a secondary provider against a slow primary.
+
+    The primary is asked first. If it has not produced a valid step within the
+    ``hedge_percentile`` of its own recent latencies (``initial_delay`` until
+    ``min_samples`` calls have been seen), the same request is sent to the
+    secondary. The first valid reply wins and the other request is cancelled:
+    its stream is closed at the next chunk. An invalid or failed reply from one
+    side starts the other one right away.
+
+    A reply can only be judged once it is complete, so ``stream()`` yields the
+    winner's whole text as a single chunk: with hedging on, the loops do not
+    show plan/output text as it arrives or dispatch actions while the reply is
+    still streaming.
+    """
+
+    last_usage = PerThread(dict)
+
+    def __init__(
+        self,
+        primary,
+        secondary,
+        secondary_config=None,
+        hedge_percentile=95,
+        initial_delay=5.0,
+        min_samples=20,
+        validate=is_valid_step,
+    ):
+        self.primary = primary
+        self.secondary = secondary
+        self.secondary_config = secondary_config
+        self.hedge_percentile = hedge_percentile
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.validate = validate
+        self.name = f"{primary.name}+{secondary.name}"
+        self.model = primary.model
+        self.timeout = primary.timeout
+        self.primary_latencies = deque(maxlen=500)
+        self.latencies = []
+        self.hedged = 0
+        self.secondary_wins = 0
+
+    def hedge_delay(self):
+        if len(self.primary_latencies) < self.min_samples:
+            return self.initial_delay
+        return percentile(self.primary_latencies, self.hedge_percentile)
+
+    def stream(self, messages, config=None, timeout=None):
+        return iter([self.complete(messages, config, timeout).text])
+
+    def complete(self, messages, config=None, timeout=None):
+        start = time.monotonic()
+        deadline = start + (timeout or self.primary.timeout)
+        cancel = threading.Event()
+        results = queue.Queue()
+
+        def run(label, provider, provider_config):
+            text = ""
+            deltas = None
+            try:
+                deltas = provider.stream(messages, provider_config, deadline - time.monotonic())
+                for delta in deltas:
+                    if cancel.is_set():
+                        return
+                    text += delta
+                # Usage is per thread, so it is read here on the stream's thread.
+                results.put((label, provider, text, None, provider.last_usage))
+            except Exception as e:
+                results.put((label, provider, None, e, {}))
+            finally:
+                # Closing the generator closes the losing HTTP stream.
+                if hasattr(deltas, "close"):
+                    deltas.close()
+
+        def launch(label, provider, provider_config):
+            threading.Thread(
+                target=run, args=(label, provider, provider_config), daemon=True
+            ).start()
+
+        launch("primary", self.primary, config)
+        running, launched_secondary, primary_done, errors = 1, False, False, []
+        wait = self.hedge_delay()
+        try:
+            while running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    label, provider, text, error, usage = results.get(
+                        timeout=min(wait, remaining) if not launched_secondary else remaining
+                    )
+                except queue.Empty:
+                    if not launched_secondary:
+                        launch("secondary", self.secondary, self.secondary_config or config)
+                        launched_secondary, running = True, running + 1
+                        self.hedged += 1
+                    continue
+                running -= 1
+                if label == "primary":
+                    primary_done = True
+                    if error is None:
+                        self.primary_latencies.append(time.monotonic() - start)
+                if error is None and self.validate(text):
+                    if label == "secondary":
+                        self.secondary_wins += 1
+                    self.last_usage = usage
+                    return Completion(text, usage, provider.model)
+                errors.append(f"{label}: {error or 'invalid step'}")
+                if not launched_secondary:
+                    launch("secondary", self.secondary, self.secondary_config or config)
+                    launched_secondary, running = True, running + 1
+            raise ProviderError("Hedged request failed: " + ("; ".join(errors) or "deadline passed"))
+        finally:
+            cancel.set()
+            elapsed = time.monotonic() - start
+            if not primary_done:
+                # The primary lost the race: it took at least this long, which
+                # keeps the hedge deadline from drifting down over time.
+                self.primary_latencies.append(elapsed)
+            self.latencies.append(elapsed)
+
+    def summary(self):
+        return (
+            f"🏁 hedging: {len(self.latencies)} steps, {self.hedged} hedged, "
+            f"{self.secondary_wins} won by {self.secondary.name}; "
+            f"p50 {percentile(self.latencies, 50):.2f}s "
+            f"p95 {percentile(self.latencies, 95):.2f}s "
+            f"p99 {percentile(self.latencies, 99):.2f}s"
+        )
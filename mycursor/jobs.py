@@ -0,0 +1,287 @@
+import itertools
+import os
+import signal
+import socket
+import subprocess
+import threading
+import time
+from collections import deque
+
+from .shell_session import IS_WINDOWS
+
+
+DEFAULT_RING_LINES = 2000
+
+
+class JobError(Exception):
+    pass
+
+
+class RingBuffer:
+    """The last ``limit`` lines of a stream, numbered so readers can resume."""
+
+    def __init__(self, limit=DEFAULT_RING_LINES):
+        self._lines = deque(maxlen=limit)
+        self._next = 1
+        self._lock = threading.Lock()
+
+    def append(self, line):
+        with self._lock:
+            self._lines.append((self._next, line))
+            self._next += 1
+
+    @property
+    def written(self):
+        return self._next - 1
+
+    def read(self, since=0, max_lines=200):
+        """Lines numbered above ``since``: ``(text, last_number, dropped)``.
+
+        ``dropped`` counts lines after ``since`` that already fell out of the ring.
+        """
+        with self._lock:
+            lines = [(number, line) for number, line in self._lines if number > since]
+            first = self._lines[0][0] if self._lines else self._next
+        dropped = max(0, first - since - 1)
+        lines = lines[:max_lines]
+        last = lines[-1][0] if lines else max(since, first - 1)
+        return "".join(line for _, line in lines), last, dropped
+
+
+class Job:
+    __slots__ = ("id", "command", "cwd", "proc", "output", "started", "cursor", "ended")
+
+    def __init__(self, id, command, cwd, proc, output):
+        self.id = id
+        self.command = command
+        self.cwd = cwd
+        self.proc = proc
+        self.output = output
+        self.started = time.monotonic()
+        self.cursor = 0
+        self.ended = None
+
+    def status(self):
+        code = self.proc.poll()
+        if code is None:
+            return "running"
+        if self.ended is None:
+            self.ended = time.monotonic()
+        return f"exited ({code})"
+
+    def uptime(self):
+        return round((self.ended or time.monotonic()) - self.started, 1)
+
+
+class JobManager:
+    """Runs long-lived commands (dev servers, watchers) in the background.
+
+    Each job gets its own process group, so ``stop()`` takes down the whole
+    tree (``flask run`` with its reloader, ``npm start`` and its children).
+    stdout and stderr are merged into a ring buffer of the last
+    ``ring_lines`` lines; ``read()`` resumes where the previous read stopped.
+    """
+
+    def __init__(self, ring_lines=DEFAULT_RING_LINES, on_output=None):
+        self.ring_lines = ring_lines
+        self.on_output = on_output
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, command, cwd=None, env=None):
+        if IS_WINDOWS:
+            kwargs = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            kwargs = {"start_new_session": True}
+        cwd = os.path.abspath(cwd or os.getcwd())
+        proc = subprocess.Popen(
+            command,
+            shell=True,
+            cwd=cwd,
+            env={**os.environ, "PYTHONUNBUFFERED": "1", **(env or {})},
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+            **kwargs,
+        )
+        with self._lock:
+            job = Job(f"job{next(self._ids)}", command, cwd, proc, RingBuffer(self.ring_lines))
+            self.jobs[job.id] = job
+        threading.Thread(target=self._pump, args=(job,), daemon=True).start()
+        return job
+
+    def _pump(self, job):
+        for line in job.proc.stdout:
+            job.output.append(line)
+            if self.on_output:
+                self.on_output(job.id, line)
+        job.proc.stdout.close()
+
+    def get(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise JobError(f"No job '{job_id}'. Known jobs: {', '.join(self.jobs) or 'none'}.")
+        return job
+
+    def read(self, job_id, since=None, max_lines=200):
+        """New output of a job since the last read (or since line ``since``)."""
+        job = self.get(job_id)
+        text, last, dropped = job.output.read(job.cursor if since is None else since, max_lines)
+        job.cursor = last
+        return text, last, dropped
+
+    def wait_until_ready(self, job_id, port=None, url=None, host="127.0.0.1", timeout=30.0, interval=0.25):
+        """Poll until ``port`` accepts connections or ``url`` answers below HTTP 500.
+
+        Returns ``(ready, detail)``; gives up early if the job exits.
+        """
+        import urllib.error
+        import urllib.request  # ~30 ms of http/email imports, only paid for url checks
+
+        job = self.get(job_id)
+        deadline = time.monotonic() + timeout
+        detail = "no port or url given"
+        while True:
+            if port:
+                try:
+                    with socket.create_connection((host, int(port)), timeout=interval * 4):
+                        detail = f"port {port} is accepting connections"
+                        if not url:
+                            return True, detail
+                except OSError as e:
+                    detail = f"port {port}: {e}"
+            if url:
+                try:
+                    with urllib.request.urlopen(url, timeout=max(1.0, interval * 4)) as response:
+                        return True, f"{url} answered {response.status}"
+                except urllib.error.HTTPError as e:
+                    if e.code < 500:
+                        return True, f"{url} answered {e.code}"
+                    detail = f"{url} answered {e.code}"
+                except (urllib.error.URLError, OSError) as e:
+                    detail = f"{url}: {getattr(e, 'reason', e)}"
+            if job.proc.poll() is not None:
+                return False, f"job exited with code {job.proc.returncode} ({detail})"
+            if time.monotonic() >= deadline:
+                return False, f"not ready after {timeout:g}s ({detail})"
+            time.sleep(interval)
+
+    def stop(self, job_id, grace=5.0):
+        job = self.get(job_id)
+        if job.proc.poll() is None:
+            try:
+                if IS_WINDOWS:
+                    subprocess.run(
+                        ["taskkill", "/F", "/T", "/PID", str(job.proc.pid)],
+                        capture_output=True,
+                    )
+                else:
+                    os.killpg(job.proc.pid, signal.SIGTERM)
+                    try:
+                        job.proc.wait(grace)
+                    except subprocess.TimeoutExpired:
+                        os.killpg(job.proc.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        try:
+            job.proc.wait(grace)
+        except subprocess.TimeoutExpired:
+            pass
+        return job.status()
+
+    def close(self):
+        """Stop every job that is still running."""
+        for job_id in list(self.jobs):
+            self.stop(job_id, grace=2.0)
+
+    def summary(self):
+        running = sum(1 for job in self.jobs.values() if job.proc.poll() is None)
+        return f"🧵 jobs: {len(self.jobs)} started, {running} still running"
+
+
+def build_job_tools(jobs, cwd=None, echo=print):
+    """``start_job``, ``job_output``, ``check_job``, ``stop_job`` and ``list_jobs`` tool functions.
+
+    ``cwd`` is a callable giving the folder new jobs start in (e.g. the shell's cwd);
+    ``echo`` is where calls are reported.
+    Job output (stdout and stderr merged) is returned as ``stdout`` so the
+    ``OutputBounder`` treats it like shell output.
+    """
+
+    def _ready(job, params):
+        if not params.get("port") and not params.get("url"):
+            return ""
+        ready, detail = jobs.wait_until_ready(
+            job.id, params.get("port"), params.get("url"), timeout=float(params.get("timeout", 30))
+        )
+        return f"{'ready' if ready else 'NOT ready'}: {detail}"
+
+    def _output(job, max_lines=40):
+        # Only the latest lines matter for a start or health check; job_output pages the rest.
+        since = max(job.cursor, job.output.written - max_lines)
+        skipped = since - job.cursor
+        text, _, _ = jobs.read(job.id, since, max_lines)
+        return (f"[{skipped} earlier lines skipped; see job_output]\n" if skipped else "") + text
+
+    def start_job(params):
+        params = params if isinstance(params, dict) else {"command": params}
+        echo("🔨 Tool Called: start_job", params.get("command"))
+        try:
+            job = jobs.start(params["command"], params.get("cwd") or (cwd() if cwd else None))
+        except (KeyError, OSError) as e:
+            return f"Error starting job: {e}"
+        result = {"job_id": job.id, "pid": job.proc.pid, "cwd": job.cwd}
+        if params.get("port") or params.get("url"):
+            result["health"] = _ready(job, params)
+        else:
+            time.sleep(float(params.get("settle", 1.0)))
+        result["status"] = job.status()
+        result["stdout"] = _output(job)
+        return result
+
+    def job_output(params):
+        params = params if isinstance(params, dict) else {"job_id": params}
+        echo("🔨 Tool Called: job_output", params.get("job_id"))
+        try:
+            job = jobs.get(params.get("job_id"))
+            text, last, dropped = jobs.read(job.id, params.get("since"), int(params.get("max_lines", 200)))
+        except JobError as e:
+            return str(e)
+        return {
+            "job_id": job.id,
+            "status": job.status(),
+            "stdout": text,
+            "last_line": last,
+            "dropped_lines": dropped,
+        }
+
+    def check_job(params):
+        echo("🔨 Tool Called: check_job", params)
+        try:
+            job = jobs.get(params.get("job_id") if isinstance(params, dict) else params)
+        except JobError as e:
+            return str(e)
+        params = params if isinstance(params, dict) else {}
+        return {"job_id": job.id, "status": job.status(), "health": _ready(job, params), "stdout": _output(job)}
+
+    def stop_job(params):
+        job_id = params.get("job_id") if isinstance(params, dict) else params
+        echo("🔨 Tool Called: stop_job", job_id)
+        try:
+            return {"job_id": job_id, "status": jobs.stop(job_id)}
+        except JobError as e:
+            return str(e)
+
+    def list_jobs(params=None):
+        echo("🔨 Tool Called: list_jobs")
+        return [
+            {"job_id": job.id, "command": job.command, "status": job.status(), "uptime": job.uptime()}
+            for job in jobs.jobs.values()
+        ] or "No jobs."
+
+    return start_job, job_output, check_job, stop_job, list_jobs
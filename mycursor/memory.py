@@ -0,0 +1,330 @@
+"""Retrieval memory over logged session messages.
+
+Instead of replaying a long history into the prompt, each logged message is
+cut into chunks, embedded with a hashing vectorizer (word unigrams and
+bigrams, signed feature hashing, no model to download) and appended to a
+sparse NumPy index; a new query gets the top-k most similar chunks.
+
+Each session has its own index next to its log (``<session>/memory.npz``
+plus the chunk texts in ``memory-chunks.jsonl``). It is updated as messages
+are logged, saved on close, and caught up from the log when opened, so
+messages logged while it was closed are indexed on the next start.
+
+NumPy is optional: without it the agent falls back to replaying the tail.
+"""
+import json
+import math
+import os
+import re
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from .context_window import message_text
+from .session_store import DEFAULT_ROOT, SessionStore, list_sessions
+
+
+DEFAULT_DIM = 1 << int(os.getenv("MYCURSOR_MEMORY_BITS", "18"))
+CHUNK_CHARS = 800
+CHUNK_OVERLAP = 200
+MIN_SCORE = float(os.getenv("MYCURSOR_MEMORY_MIN_SCORE", "0.15"))
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:_[a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have i in is it its of on or that the this to was were will "
+    "with you your me my we our can do does should would could not no yes if then else so".split()
+)
+
+
+class HashingVectorizer:
+    """Sparse, L2-normalized ``(indices, values)`` of a text in ``dim`` hashed features."""
+
+    def __init__(self, dim=DEFAULT_DIM, bigrams=True):
+        if dim & (dim - 1):
+            raise ValueError("dim must be a power of two")
+        self.dim = dim
+        self.bigrams = bigrams
+
+    def tokens(self, text):
+        tokens = []
+        for token in _TOKEN.findall(text.lower()):
+            if token in STOPWORDS:
+                continue
+            tokens.append(token)
+            if "_" in token:  # read_file also matches "read" and "file"
+                tokens.extend(part for part in token.split("_") if part not in STOPWORDS)
+        return tokens
+
+    def transform(self, text):
+        tokens = self.tokens(text)
+        features = Counter(tokens)
+        if self.bigrams:
+            features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        weights = {}
+        mask = self.dim - 1
+        for feature, count in features.items():
+            h = zlib.crc32(feature.encode())
+            index = h & mask
+            weight = (1.0 + math.log(count)) * (1.0 if h & 0x80000000 else -1.0)
+            weights[index] = weights.get(index, 0.0) + weight
+        indices = np.fromiter(weights.keys(), dtype=np.int32, count=len(weights))
+        values = np.fromiter(weights.values(), dtype=np.float32, count=len(weights))
+        norm = float(np.sqrt(np.dot(values, values)))
+        if norm == 0.0:
+            return indices[:0], values[:0]
+        return indices, values / norm
+
+
+def message_chunks(message, size=CHUNK_CHARS, overlap=CHUNK_OVERLAP):
+    """Readable text of a logged message, cut into overlapping chunks.
+
+    Agent steps are rendered as plain text (plans, outputs, the function and
+    input of actions, observations) so the JSON syntax does not dominate.
+    """
+    text = message_text(message)
+    try:
+        value = json.loads(text)
+    except (ValueError, TypeError):
+        value = None
+    if isinstance(value, dict):
+        steps = value.get("steps") if isinstance(value.get("steps"), list) else [value]
+        parts = []
+        for step in steps:
+            if not isinstance(step, dict):
+                continue
+            kind = step.get("step")
+            if kind == "action":
+                parts.append(f"action {step.get('function')}: {json.dumps(step.get('input'), ensure_ascii=False)}")
+            elif kind == "observe":
+                output = step.get("output", step.get("outputs"))
+                parts.append(f"observe: {output if isinstance(output, str) else json.dumps(output, ensure_ascii=False)}")
+            elif step.get("content"):
+                parts.append(f"{kind}: {step.get('content')}")
+        text = "\n".join(parts)
+    text = f"{message.get('role', 'user')}: {text.strip()}"
+    if len(text) <= size:
+        return [text]
+    step = size - overlap
+    return [text[start:start + size] for start in range(0, len(text) - overlap, step)]
+
+
+class _Array:
+    """A NumPy array that grows by doubling, for appends in amortized O(1)."""
+
+    def __init__(self, dtype, data=None):
+        self.data = np.zeros(64, dtype=dtype) if data is None else data
+        self.size = 0 if data is None else len(data)
+
+    def extend(self, values):
+        needed = self.size + len(values)
+        if needed > len(self.data):
+            grown = np.zeros(max(needed, 2 * len(self.data)), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:needed] = values
+        self.size = needed
+
+    def view(self):
+        return self.data[:self.size]
+
+
+class MemoryIndex:
+    """Chunks of one session's messages as rows of a CSR matrix.
+
+    ``count`` is how many messages of the session have been indexed, so the
+    index can be caught up from the log. Chunk texts are appended to a JSONL
+    file and read back only for the hits.
+    """
+
+    def __init__(self, path, vectorizer):
+        self.path = path
+        self.vectorizer = vectorizer
+        self.count = 0
+        self.dirty = False
+        self._chunks_path = os.path.join(path, "memory-chunks.jsonl")
+        self._chunks = None
+        self._load()
+
+    def _empty(self):
+        self.indptr = _Array(np.int64)
+        self.indptr.extend([0])
+        self.indices = _Array(np.int32)
+        self.values = _Array(np.float32)
+        self.refs = _Array(np.int32)
+        self.offsets = _Array(np.int64)
+        self.text_bytes = 0
+        self.count = 0
+
+    def _load(self):
+        self._empty()
+        try:
+            with np.load(os.path.join(self.path, "memory.npz")) as data:
+                if int(data["dim"]) != self.vectorizer.dim:
+                    return  # re-indexed from the log with the new dimension
+                self.indptr = _Array(np.int64, data["indptr"].copy())
+                self.indices = _Array(np.int32, data["indices"].copy())
+                self.values = _Array(np.float32, data["values"].copy())
+                self.refs = _Array(np.int32, data["refs"].copy())
+                self.offsets = _Array(np.int64, data["offsets"].copy())
+                self.text_bytes = int(data["text_bytes"])
+                self.count = int(data["count"])
+        except (OSError, KeyError, ValueError):
+            self._empty()
+
+    def __len__(self):
+        return self.refs.size
+
+    def add(self, number, message):
+        """Index message ``number`` of the session (messages are added in order)."""
+        for chunk in message_chunks(message):
+            indices, values = self.vectorizer.transform(chunk)
+            if not len(indices):
+                continue
+            line = (json.dumps(chunk, ensure_ascii=False) + "\n").encode("utf-8")
+            if self._chunks is None:
+                os.makedirs(self.path, exist_ok=True)
+                self._chunks = open(self._chunks_path, "ab")
+                self._chunks.truncate(self.text_bytes)  # drop chunks written after the last save
+            self._chunks.write(line)
+            self.offsets.extend([self.text_bytes])
+            self.text_bytes += len(line)
+            self.indices.extend(indices)
+            self.values.extend(values)
+            self.indptr.extend([self.indices.size])
+            self.refs.extend([number])
+        self.count = number + 1
+        self.dirty = True
+
+    def scores(self, query):
+        """Cosine similarity of the query vector with every chunk."""
+        indices, values = query
+        if not len(self) or not len(indices):
+            return np.zeros(len(self), dtype=np.float32)
+        dense = np.zeros(self.vectorizer.dim, dtype=np.float32)
+        dense[indices] = values
+        products = self.values.view() * dense[self.indices.view()]
+        return np.add.reduceat(products, self.indptr.view()[:-1]) if products.size else products
+
+    def text(self, chunk):
+        if self._chunks is not None:
+            self._chunks.flush()
+        with open(self._chunks_path, "rb") as f:
+            f.seek(int(self.offsets.view()[chunk]))
+            return json.loads(f.readline())
+
+    def save(self):
+        if not self.dirty:
+            return
+        if self._chunks is not None:
+            self._chunks.flush()
+        os.makedirs(self.path, exist_ok=True)
+        tmp = os.path.join(self.path, "memory.tmp.npz")
+        np.savez(
+            tmp,
+            dim=self.vectorizer.dim,
+            count=self.count,
+            text_bytes=self.text_bytes,
+            indptr=self.indptr.view(),
+            indices=self.indices.view(),
+            values=self.values.view(),
+            refs=self.refs.view(),
+            offsets=self.offsets.view(),
+        )
+        os.replace(tmp, os.path.join(self.path, "memory.npz"))
+        self.dirty = False
+
+    def close(self):
+        self.save()
+        if self._chunks is not None:
+            self._chunks.close()
+            self._chunks = None
+
+    def clear(self):
+        if self._chunks is not None:
+            self._chunks.close()
+            self._chunks = None
+        for name in ("memory.npz", "memory-chunks.jsonl"):
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+        self._empty()
+        self.dirty = False
+
+
+class Memory:
+    """Top-k retrieval over the logs of one session or every session under ``root``.
+
+    ``stores`` maps session names to open ``SessionStore`` objects (the
+    current session); other sessions are read with read-only stores.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, sessions=None, stores=None, vectorizer=None):
+        self.root = root
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.stores = dict(stores or {})
+        self.indexes = {}
+        self.recalls = []
+        for name in sessions if sessions is not None else list_sessions(root):
+            self.open(name)
+
+    def open(self, name):
+        """The index of session ``name``, caught up with its log."""
+        index = self.indexes.get(name)
+        if index is None:
+            index = self.indexes[name] = MemoryIndex(os.path.join(self.root, name), self.vectorizer)
+            store = self.stores.get(name) or SessionStore(name, self.root, readonly=True)
+            if index.count > len(store):
+                index.clear()  # the session was reset behind our back
+            for number, message in enumerate(store.since(index.count), index.count):
+                index.add(number, message)
+            index.save()
+        return index
+
+    def add(self, name, number, message):
+        index = self.open(name)
+        if number >= index.count:
+            index.add(number, message)
+
+    def search(self, query, k=5, exclude=None, min_score=MIN_SCORE):
+        """``(score, session, number, text)`` of the ``k`` best chunks over ``min_score``.
+
+        ``exclude`` maps a session to the first message number that is already
+        in the prompt; chunks of those messages are skipped.
+        """
+        start = time.perf_counter()
+        vector = self.vectorizer.transform(query)
+        candidates = []
+        for name, index in self.indexes.items():
+            scores = index.scores(vector)
+            if not scores.size:
+                continue
+            if exclude and name in exclude:
+                scores = np.where(index.refs.view() < exclude[name], scores, -1.0)
+            top = np.argpartition(-scores, min(k, scores.size - 1))[:k] if scores.size > k else np.arange(scores.size)
+            candidates.extend((float(scores[chunk]), name, int(chunk)) for chunk in top if scores[chunk] >= min_score)
+        candidates.sort(reverse=True)
+        hits = [
+            (score, name, int(self.indexes[name].refs.view()[chunk]), self.indexes[name].text(chunk))
+            for score, name, chunk in candidates[:k]
+        ]
+        self.recalls.append(time.perf_counter() - start)
+        return hits
+
+    def forget(self, name):
+        if name in self.indexes:
+            self.indexes[name].clear()
+
+    def close(self):
+        for index in self.indexes.values():
+            index.close()
+
+    def summary(self):
+        chunks = sum(len(index) for index in self.indexes.values())
+        messages = sum(index.count for index in self.indexes.values())
+        line = f"🧠 memory: {chunks} chunks of {messages} messages in {len(self.indexes)} sessions"
+        if self.recalls:
+            line += f", {len(self.recalls)} recalls ({sum(self.recalls) / len(self.recalls) * 1000:.1f} ms avg)"
+        return line
@@ -0,0 +1,268 @@
+import json
+import os
+import time
+
+from .agent import Agent
+from .completion_cache import CacheMiss
+from .hedging import HedgedProvider
+from .providers import GeminiProvider, OpenAIProvider, ProviderError
+from .step_stream import StepStreamParser
+from .steps import BATCH_PROMPT, observation_message
+from .tool_executor import ActionBatch
+
+
+COMPLETION_CONFIG = {"response_format": {"type": "json_object"}}
+
+SYSTEM_PROMPT = """
+
+You are a helpful AI code assistant specialized in building Python-based applications, including web apps (Flask, Streamlit, Dash), dashboards, and data analysis tools.
+
+You follow the strict reasoning loop:
+1. **Plan** – Break down the user request into clear execution steps. Use internal Tree-of-Thought (ToT) reasoning to explore multiple architectural options, libraries, or approaches. Choose the best strategy.
+2. **Action** – Execute a terminal or file operation using an available tool. Independent actions may be batched (see Batched Steps).
+3. **Observe** – Wait for the result of the executed action (confirmation message, file output, errors, etc.).
+4. **Output** – Summarize progress. If work is not finished, loop back to Plan.
+
+---
+
+## ✅ You Can Build Applications Using:
+- **Flask** (web server and API backends)
+- **Streamlit** (data-driven UIs)
+- **Dash** (Plotly-based dashboards)
+- **Python Scripts** (with pandas, matplotlib, scikit-learn, etc.)
+- **Jupyter / Analysis Reports** (Markdown/HTML exports)
+
+---
+
+## 📦 Project Output Expectations
+
+- Create a root project folder (named from user intent).
+- Setup relevant subfolders (`/scripts`, `/assets`, `/data`, `/models`).
+- Create the local `venv` with its packages using `make_venv` (a cached environment is cloned; no `python -m venv` or `pip install`).
+- Add a `README.md` with run instructions.
+- Automatically generate `.gitignore` and `requirements.txt`.
+- Launch the app with the appropriate command (`flask run`, `streamlit run`, etc.) through `start_job`, never `exec_command` (it would block until the server exits), and verify it with a `port` or `url` health check.
+
+---
+
+## 🛠️ Tool Inputs
+
+What each tool does is listed under "Available functions" at the end; this is what its `input` takes.
+
+- `exec_command`: a command string
+- `make_directory`: a folder path
+- `edit_file`: `file_name`, `folder_path`, `content`
+- `search_replace`: `file_name`, `folder_path`, `search` (exact text, must be unique), `replace`, optional `anchor` (text the search starts after)
+- `replace_lines`: `file_name`, `folder_path`, `start_line`, `end_line` (1-based, inclusive), `content`, optional `expected` (current text of the range)
+- `apply_patch`: `file_name`, `folder_path`, `diff` (unified diff)
+- `read_file`: `file_name`, `folder_path`, optional `start_line`, `end_line` (or `start_byte`, `end_byte`)
+- `list_files`: optional `folder_path`, `pattern` (e.g. `*.py`)
+- `find_symbol`: `name`, optional `file_name`, `folder_path`
+- `start_job`: `command`, optional `port` or `url` to wait for, `timeout` (seconds)
+- `job_output`: `job_id`, optional `max_lines`
+- `check_job`: `job_id`, optional `port`, `url`, `timeout`
+- `stop_job`: `job_id`
+- `list_jobs`: nothing
+- `make_venv`: `folder_path`, `requirements` (list of packages, or the name of a requirements file in the folder), optional `name` (default `venv`)
+- `read_output`: `ref` (from a cut output), optional `start_line`, `end_line`, `grep` (regex filter)
+
+The `exec_command` shell keeps its working directory and activated venv between calls. Jobs start in its current folder but do not inherit the venv activation, so call the venv's python/flask/streamlit directly.
+Use `make_venv` instead of `python -m venv` + `pip install`; use `pip install` only to add packages to an existing venv.
+Prefer `search_replace`, `replace_lines` or `apply_patch` over `edit_file` when changing an existing file: only send the part that changes, never re-emit the whole file.
+Read only what you need: use `find_symbol` or a line range of `read_file` instead of printing whole files with `exec_command`.
+Long outputs come back as `head`, `tail`, `error_lines` and a `ref`; check `error_lines` first and use `read_output` only for the lines you need.
+
+---
+
+
+
+
+## 🧠 Tree-of-Thought Prompting: Sample Reasoning
+
+User Query: "Build a dashboard using Dash to show COVID-19 trends from a CSV file with line charts and filters."
+
+```json
+{ "step": "plan", "content": "The user wants a dashboard using Dash. I will create the folder, install Dash, and build an app with filters and a line chart. First, create the project folder." }
+{ "step": "action", "function": "make_directory", "input": "./covid_dashboard" }
+{ "step": "observe", "output": "Folder created" }
+{ "step": "plan", "content": "Now I will create the virtual environment with the Dash-related packages." }
+{ "step": "action", "function": "make_venv", "input": { "folder_path": "./covid_dashboard", "requirements": ["dash", "pandas"] } }
+{ "step": "observe", "output": "Venv created from a cached environment." }
+{ "step": "plan", "content": "Now I will create 'app.py' with a basic Dash layout and CSV data loading logic." }
+{ "step": "action", "function": "edit_file", "input": {
+    "file_name": "app.py",
+    "folder_path": "./covid_dashboard",
+    "content": "import dash\\nimport dash_core_components as dcc\\nimport dash_html_components as html\\nimport pandas as pd\\n..."
+} }
+{ "step": "observe", "output": "File created." }
+{ "step": "plan", "content": "Now I will create a README.md with run instructions." }
+{ "step": "action", "function": "edit_file", "input": {
+    "file_name": "README.md",
+    "folder_path": "./covid_dashboard",
+    "content": "# COVID Dashboard\\n\\nRun with:\\n```\\ncd covid_dashboard\\nvenv\Scripts\\activate\\npython app.py\\n```"
+} }
+{ "step": "output", "content": "App created. Run it using the README instructions." }
+```
+
+---
+
+You must always follow the strict loop: **Plan → Action → Observe → Output**  
+Use thoughtful reasoning before choosing a package or structure. For analysis apps, consider where to place input data, model files, and helper modules.
+
+You are working on a Windows machine.
+"""
+
+SYSTEM_PROMPT += BATCH_PROMPT
+
+
+def make_directory(folder_path: str) -> str:
+    try:
+        os.makedirs(folder_path, exist_ok=True)
+        return f"Folder '{folder_path}' created successfully."
+    except Exception as e:
+        return f"Error creating folder '{folder_path}': {str(e)}"
+
+
+class OpenAIAgent(Agent):
+    """The gpt-4o loop: JSON-mode steps, streamed and acted on as they parse."""
+
+    name = "openai"
+    prompt = "➡️➡️ Enter your query (or type 'reset'): "
+    exit_command = "thanks"
+    default_session = "default"
+    system_prompt = SYSTEM_PROMPT
+
+    @classmethod
+    def build_provider(cls, hedge):
+        provider = OpenAIProvider("gpt-4o")
+        if hedge:
+            # Race Gemini against a slow gpt-4o step (see hedging.py).
+            provider = HedgedProvider(
+                provider,
+                GeminiProvider("gemini-2.0-flash"),
+                secondary_config={"response_mime_type": "application/json"},
+            )
+        return provider
+
+    def exec_command(self, command: str):
+        try:
+            self.echo("🔨 Tool Called: exec_command", command)
+            return self.shell.run(command)
+        except Exception as e:
+            return f"Error executing command '{command}': {str(e)}"
+
+    def build_tools(self):
+        avialable_tools = {
+            "exec_command": {
+                "description": "Takes a command as input and executes it in the persistent shell session; returns exit_code, stdout, stderr and duration",
+                "fn": self.exec_command,
+                "timeout": 600,
+                "shell": True,
+            },
+            "make_directory": {
+                "description": "Takes a folder name as input and creates the folder inside the project directory",
+                "fn": make_directory,
+                "concurrency": 4,
+                "timeout": 30,
+                "files": True,
+                "path_input": True,
+            },
+        }
+        avialable_tools.update(super().build_tools())
+        avialable_tools["edit_file"]["description"] = (
+            "Takes a file name, content and folder path as an input and edits the file inside the folder directory"
+        )
+        return avialable_tools
+
+    def run_task(self):
+        calls = 0
+        while True:
+            calls += 1
+            self.stats.record_call()
+
+            # Print plan/output text while it streams and start each action of the
+            # batch as soon as its function/input are parsed.
+            parser = StepStreamParser()
+            content = ""
+            open_line = False
+            batch = ActionBatch(self.executor)
+            final = None
+            failed = interrupted = False
+            model_span = self.tracer.start("model", provider=self.provider.name)
+            retries = getattr(self.provider, "retries", 0)
+            busy = parse_time = 0.0
+            first_token = None
+            try:
+                for delta in self.provider.stream(self.context.build(self.messages), COMPLETION_CONFIG):
+                    handled = time.perf_counter()
+                    if first_token is None:
+                        first_token = handled - model_span.start - busy
+                    content += delta
+                    events = parser.feed(delta)
+                    parse_time += time.perf_counter() - handled
+                    for event, step, value in events:
+                        if final or failed:
+                            continue
+                        if event == "delta":
+                            if step in ("plan", "output"):
+                                if not open_line:
+                                    self.echo("✅ " if step == "plan" else "", end="")
+                                    open_line = True
+                                self.echo(value, end="", flush=True)
+                        elif step in ("plan", "output"):
+                            if open_line:
+                                self.echo()
+                                open_line = False
+                            elif step == "plan":
+                                self.echo(f"✅ {value.get('content')}")
+                            else:
+                                self.echo(value.get("content"))
+                            if step == "output":
+                                final = value
+                        elif step == "action":
+                            function = value.get("function")
+                            if isinstance(function, str) and function in self.tools:
+                                batch.add(value)
+                            else:
+                                self.echo("🔴🔴 Function not found.", function)
+                                failed = True
+                        elif step != "observe":
+                            self.echo("🔴🔴 Invalid step.", value)
+                            failed = True
+                    busy += time.perf_counter() - handled
+            except (CacheMiss, ProviderError) as e:
+                self.echo("🔴🔴 Model call failed:", e)
+                model_span.set(error=str(e))
+                failed = interrupted = True
+            self.record_model_call(model_span, retries, busy, first_token)
+            self.tracer.record("parse", parse_time, bytes=len(content))
+            if open_line:
+                self.echo()
+            observations = batch.finish()
+
+            if not parser.steps:
+                if content:
+                    self.echo("🔴🔴 Invalid response.", content)
+                return None, calls
+            if interrupted:
+                # A reply cut off mid-stream is not kept as such: only the steps
+                # that were complete (and acted on) go into the history.
+                content = json.dumps({"steps": parser.steps})
+            self.messages.append({"role": "assistant", "content": content})
+            self.log_message({"role": "assistant", "content": content})
+
+            # Every observation of the batch goes back in a single follow-up call.
+            if observations:
+                observe = {"role": "assistant", "content": observation_message(observations)}
+                self.messages.append(observe)
+                self.log_message(observe)
+                self.stats.record_observation(observe["content"])
+
+            if final:
+                self.stats.complete_task()
+                return final, calls
+            if failed:
+                return None, calls
+
+    def summaries(self):
+        return super().summaries() + ["Exiting..."]
@@ -0,0 +1,74 @@
+"""The stable start of every model request: system prompt plus tool schema.
+
+Providers only reuse a cached prompt prefix when it is byte-identical to the
+last one (OpenAI does this automatically for prompts of 1024+ tokens, Gemini
+through cached contents), so the prefix is assembled once per agent, with
+the tool registry serialized deterministically, and frozen. Its token count
+is computed once as well, instead of on every context-window build.
+"""
+import hashlib
+import json
+
+from .context_window import MESSAGE_OVERHEAD, count_tokens
+
+
+def tool_schema(tools):
+    """The registry as one JSON object per tool, sorted by name, in a fixed serialization."""
+    lines = [
+        json.dumps({"name": name, "description": tool.get("description", "")}, sort_keys=True, separators=(",", ":"))
+        for name, tool in sorted(tools.items())
+    ]
+    return "## Available functions (only these can be called)\n" + "\n".join(lines)
+
+
+class PrefixMessage(dict):
+    """A read-only message dict that carries the prefix's memoized token count."""
+
+    def __init__(self, role, content, tokens, digest):
+        super().__init__(role=role, content=content)
+        self.tokens = tokens
+        self.digest = digest
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("The prompt prefix is immutable.")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _immutable
+
+
+class PromptPrefix:
+    """Builds the frozen first message and keeps per-call prompt-cache stats.
+
+    ``role`` is "system" for OpenAI-style loops and "user" where the prompt is
+    sent as the first turn.
+    """
+
+    def __init__(self, prompt, tools=None, role="system"):
+        text = prompt.rstrip("\n") + "\n\n" + tool_schema(tools) + "\n" if tools else prompt
+        digest = hashlib.sha256(f"{role}\n{text}".encode("utf-8")).hexdigest()
+        self.message = PrefixMessage(role, text, count_tokens(text) + MESSAGE_OVERHEAD, digest)
+        self.calls = []
+
+    @property
+    def tokens(self):
+        return self.message.tokens
+
+    @property
+    def digest(self):
+        return self.message.digest
+
+    def record(self, prompt_tokens, cached_tokens):
+        """Prompt tokens of one model call and how many of them the provider served from its cache."""
+        if prompt_tokens is not None:
+            self.calls.append((prompt_tokens, cached_tokens or 0))
+
+    def summary(self):
+        line = f"🧷 prompt prefix: {self.tokens} tokens ({self.digest[:12]})"
+        if not self.calls:
+            return line
+        prompt = sum(tokens for tokens, _ in self.calls)
+        cached = sum(cached for _, cached in self.calls)
+        share = cached / prompt * 100 if prompt else 0.0
+        return (
+            f"{line}, {cached} of {prompt} prompt tokens cached by the provider "
+            f"({share:.0f}%) over {len(self.calls)} calls"
+        )
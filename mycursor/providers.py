@@ -0,0 +1,442 @@
+import datetime
+import json
+import os
+import random
+import threading
+import time
+
+from .context_window import message_text
+from .prompt_prefix import PrefixMessage
+
+
+DEFAULT_TIMEOUT = float(os.getenv("MYCURSOR_TIMEOUT", "120"))
+DEFAULT_RPM = float(os.getenv("MYCURSOR_RPM", "60"))
+DEFAULT_RETRIES = int(os.getenv("MYCURSOR_RETRIES", "3"))
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# Gemini context caching is only tried for prefixes of at least this many
+# tokens (the API's minimum); smaller ones rely on implicit caching.
+GEMINI_CACHE_MIN_TOKENS = int(os.getenv("MYCURSOR_GEMINI_CACHE_MIN_TOKENS", "4096"))
+GEMINI_CACHE_TTL = int(os.getenv("MYCURSOR_GEMINI_CACHE_TTL", "3600"))
+
+
+class ProviderError(Exception):
+    """A model call failed for good (after retries, or not retryable)."""
+
+
+class TransientError(ProviderError):
+    """A model call failed in a way that is worth retrying.
+
+    ``retry_after`` is the wait in seconds the backend asked for, if any.
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(ProviderError):
+    """The per-request deadline passed before the model answered."""
+
+
+class Completion:
+    __slots__ = ("text", "usage", "model")
+
+    def __init__(self, text, usage=None, model=None):
+        self.text = text
+        self.usage = usage or {}
+        self.model = model
+
+
+class PerThread:
+    """An attribute with its own value on every thread, starting from ``default()``.
+
+    Per-call state (``last_usage``, ``retries``) is kept this way because one
+    provider can serve several sessions at once, each on its own thread.
+    """
+
+    def __init__(self, default):
+        self.default = default
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def _local(self, obj):
+        return obj.__dict__.setdefault("_per_thread", threading.local())
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        local = self._local(obj)
+        if not hasattr(local, self.name):
+            setattr(local, self.name, self.default())
+        return getattr(local, self.name)
+
+    def __set__(self, obj, value):
+        setattr(self._local(obj), self.name, value)
+
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by all threads using a provider."""
+
+    def __init__(self, rate_per_minute=DEFAULT_RPM, burst=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst or max(1.0, rate_per_minute / 6)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline=None):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise DeadlineExceeded("Rate limit wait would pass the request deadline.")
+            time.sleep(wait)
+
+
+class Provider:
+    """Common interface of the model backends.
+
+    ``stream()`` yields the text of the reply as it arrives and ``complete()``
+    returns it at once. Both go through the rate limiter, retry transient
+    failures with jittered exponential backoff, and give up once the
+    per-request deadline (``timeout`` seconds) has passed. Messages are plain
+    ``{"role", "content"}`` dicts; backends convert them to their own format.
+    ``last_usage`` has ``prompt_tokens``, ``completion_tokens`` and
+    ``cached_tokens`` (prompt tokens served from the provider's prompt cache).
+    It and the ``retries`` count are kept per thread, so one provider (with
+    its rate limiter and HTTP client) can be shared by concurrent sessions.
+    """
+
+    name = "provider"
+    last_usage = PerThread(dict)
+    retries = PerThread(int)
+
+    def __init__(
+        self,
+        model,
+        timeout=DEFAULT_TIMEOUT,
+        max_retries=DEFAULT_RETRIES,
+        backoff=0.5,
+        max_backoff=20.0,
+        limiter=None,
+    ):
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.limiter = limiter or TokenBucket()
+
+    # Backends implement these two. `remaining` is the time left until the deadline.
+    def _stream(self, messages, config, remaining):
+        raise NotImplementedError
+
+    def _is_retryable(self, exc):
+        return isinstance(exc, TransientError)
+
+    def _retry_after(self, exc):
+        return getattr(exc, "retry_after", None)
+
+    def stream(self, messages, config=None, timeout=None):
+        deadline = time.monotonic() + (timeout or self.timeout)
+        return self._stream_with_retries(messages, config or {}, deadline)
+
+    def complete(self, messages, config=None, timeout=None):
+        text = "".join(self.stream(messages, config, timeout))
+        return Completion(text, self.last_usage, self.model)
+
+    def _stream_with_retries(self, messages, config, deadline):
+        attempt = 0
+        while True:
+            started = False
+            try:
+                self.limiter.acquire(deadline)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DeadlineExceeded(f"{self.name}: request deadline passed.")
+                for delta in self._stream(messages, config, remaining):
+                    started = True
+                    # Only time spent waiting on the provider counts: the deadline
+                    # is pushed back by however long the consumer held on to the
+                    # delta (e.g. running a tool call before asking for more).
+                    handed_out = time.monotonic()
+                    yield delta
+                    deadline += time.monotonic() - handed_out
+                    if time.monotonic() > deadline:
+                        raise DeadlineExceeded(f"{self.name}: request deadline passed mid-stream.")
+                return
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                # Once text has been handed out a retry would duplicate it.
+                if started or attempt >= self.max_retries or not self._is_retryable(e):
+                    if isinstance(e, ProviderError):
+                        raise
+                    raise ProviderError(f"{self.name}: {e}") from e
+                delay = self._retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                if time.monotonic() + delay > deadline:
+                    raise DeadlineExceeded(f"{self.name}: no time left to retry ({e}).") from e
+                attempt += 1
+                self.retries += 1
+                time.sleep(delay)
+
+
+class OpenAIProvider(Provider):
+    name = "openai"
+
+    def __init__(self, model="gpt-4o", api_key=None, base_url=None, **kwargs):
+        super().__init__(model, **kwargs)
+        self.api_key = api_key
+        self.base_url = base_url
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        # The SDK is imported and the client built on first use, so starting the
+        # CLI (or using only the other backend) does not pay for it. One client
+        # per provider keeps the HTTP connection pool warm across calls; retries
+        # are handled here so the SDK's own are turned off.
+        with self._client_lock:
+            if self._client is None:
+                from openai import OpenAI
+
+                self._client = OpenAI(
+                    api_key=self.api_key or os.getenv("OPENAPI_KEY"),
+                    base_url=self.base_url or os.getenv("OPENAI_BASE_URL"),
+                    max_retries=0,
+                )
+            return self._client
+
+    def _stream(self, messages, config, remaining):
+        # Prompt caching is automatic for a repeated prefix; the cache key keeps
+        # requests with the same prefix on the same cache shard.
+        if messages and isinstance(messages[0], PrefixMessage):
+            config = {"extra_body": {"prompt_cache_key": messages[0].digest[:32]}, **config}
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": m["role"], "content": message_text(m)} for m in messages],
+            stream=True,
+            stream_options={"include_usage": True},
+            timeout=remaining,
+            **config,
+        )
+        try:
+            for chunk in stream:
+                if chunk.usage:
+                    usage = chunk.usage.model_dump()
+                    usage["cached_tokens"] = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+                    self.last_usage = usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+
+    def _is_retryable(self, exc):
+        import openai
+
+        if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        return getattr(exc, "status_code", None) in RETRYABLE_STATUS
+
+    def _retry_after(self, exc):
+        response = getattr(exc, "response", None)
+        try:
+            return float(response.headers["retry-after"])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return None
+
+
+class GeminiProvider(Provider):
+    name = "gemini"
+
+    def __init__(self, model="gemini-2.0-flash", api_key=None, base_url=None, **kwargs):
+        super().__init__(model, **kwargs)
+        self.api_key = api_key
+        self.base_url = base_url
+        self.genai = None
+        self._client = None
+        self._client_lock = threading.Lock()
+        # Prefix digest -> (model bound to its cached content or None, expiry).
+        self._cached_models = {}
+
+    @property
+    def client(self):
+        # Configured on first use, like OpenAIProvider.client.
+        with self._client_lock:
+            if self._client is None:
+                import google.generativeai as genai
+
+                options = {}
+                base_url = self.base_url or os.getenv("GEMINI_BASE_URL")
+                if base_url:
+                    options = {"transport": "rest", "client_options": {"api_endpoint": base_url}}
+                genai.configure(api_key=self.api_key or os.getenv("GEMINI_API_KEY"), **options)
+                self.genai = genai
+                self._client = genai.GenerativeModel(self.model)
+            return self._client
+
+    @staticmethod
+    def to_contents(messages):
+        contents = []
+        for message in messages:
+            role = "model" if message.get("role") in ("assistant", "model") else "user"
+            contents.append({"role": role, "parts": [message_text(message)]})
+        return contents
+
+    def _cached_model(self, prefix):
+        """A model bound to a server-side cache of ``prefix``, or None where that is not available."""
+        if prefix.tokens < GEMINI_CACHE_MIN_TOKENS:
+            return None
+        with self._client_lock:
+            model, expires = self._cached_models.get(prefix.digest, (None, 0.0))
+            if time.monotonic() < expires:
+                return model
+            try:
+                cached = self.genai.caching.CachedContent.create(
+                    model=f"models/{self.model}",
+                    display_name=f"mycursor-{prefix.digest[:16]}",
+                    contents=self.to_contents([prefix]),
+                    ttl=datetime.timedelta(seconds=GEMINI_CACHE_TTL),
+                )
+                model = self.genai.GenerativeModel.from_cached_content(cached)
+            except Exception:  # model, API version or endpoint without context caching
+                model = None
+            # Renewed a minute before the cache expires; a failure is not retried for a TTL either.
+            self._cached_models[prefix.digest] = (model, time.monotonic() + GEMINI_CACHE_TTL - 60)
+            return model
+
+    def _stream(self, messages, config, remaining):
+        client = self.client
+        if messages and isinstance(messages[0], PrefixMessage):
+            cached_model = self._cached_model(messages[0])
+            if cached_model is not None:
+                client, messages = cached_model, messages[1:]
+        response = client.generate_content(
+            self.to_contents(messages),
+            generation_config=self.genai.types.GenerationConfig(**config),
+            stream=True,
+            request_options={"timeout": remaining},
+        )
+        produced = False
+        for chunk in response:
+            if chunk.candidates and chunk.candidates[0].content.parts:
+                produced = True
+                yield chunk.candidates[0].content.parts[0].text
+            if getattr(chunk, "usage_metadata", None):
+                usage = chunk.usage_metadata
+                self.last_usage = {
+                    "prompt_tokens": usage.prompt_token_count,
+                    "completion_tokens": usage.candidates_token_count,
+                    "cached_tokens": getattr(usage, "cached_content_token_count", 0) or 0,
+                }
+        if not produced:
+            raise ProviderError("Gemini did not return a valid response.")
+
+    def _is_retryable(self, exc):
+        from google.api_core import exceptions
+
+        return isinstance(
+            exc,
+            (
+                exceptions.TooManyRequests,
+                exceptions.ServiceUnavailable,
+                exceptions.InternalServerError,
+                exceptions.DeadlineExceeded,
+            ),
+        ) or getattr(exc, "code", None) in RETRYABLE_STATUS
+
+
+class FakeProvider(Provider):
+    """Offline provider that replays scripted replies.
+
+    ``replies`` is a list of strings or step dicts (served in order and then
+    repeated from the start) or a callable ``(messages) -> reply``. ``errors``
+    are raised, one per call, before the first reply is served, and
+    ``latency``/``token_delay`` add artificial delays.
+    """
+
+    name = "fake"
+
+    def __init__(self, replies, model="fake", errors=(), latency=0.0, token_delay=0.0, chunk_size=8, **kwargs):
+        kwargs.setdefault("limiter", TokenBucket(rate_per_minute=1e9))
+        super().__init__(model, **kwargs)
+        self.replies = replies
+        self.errors = list(errors)
+        self.latency = latency
+        self.token_delay = token_delay
+        self.chunk_size = chunk_size
+        self.calls = []
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _reply(self, messages):
+        if callable(self.replies):
+            reply = self.replies(messages)
+        else:
+            with self._lock:
+                reply = self.replies[self._next % len(self.replies)]
+                self._next += 1
+        return reply if isinstance(reply, str) else json.dumps(reply)
+
+    def _stream(self, messages, config, remaining):
+        with self._lock:
+            self.calls.append(messages)
+            error = self.errors.pop(0) if self.errors else None
+        if self.latency:
+            time.sleep(min(self.latency, remaining))
+            if self.latency > remaining:
+                raise DeadlineExceeded(f"{self.name}: request deadline passed.")
+        if error:
+            raise error
+        text = self._reply(messages)
+        for i in range(0, len(text), self.chunk_size):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield text[i:i + self.chunk_size]
+        self.last_usage = {"prompt_tokens": 0, "completion_tokens": (len(text) + 3) // 4, "cached_tokens": 0}
+
+
+class CachedProvider:
+    """Serves replies from a ``CompletionCache`` and only calls the provider on a miss.
+
+    ``last_hit`` tells whether the last ``stream()`` was served from the cache.
+    """
+
+    def __init__(self, provider, cache):
+        self.provider = provider
+        self.cache = cache
+        self.last_hit = False
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    def stream(self, messages, config=None, timeout=None):
+        key = self.cache.key(self.provider.model, config or {}, messages)
+        cached = self.cache.get(key)
+        self.last_hit = cached is not None
+        if cached is not None:
+            return iter([cached])
+        return self._stream_and_store(key, self.provider.stream(messages, config, timeout))
+
+    def _stream_and_store(self, key, deltas):
+        text = ""
+        for delta in deltas:
+            text += delta
+            yield delta
+        self.cache.put(key, text, model=self.provider.model)
+
+    def complete(self, messages, config=None, timeout=None):
+        return Completion("".join(self.stream(messages, config, timeout)), self.provider.last_usage, self.provider.model)
+
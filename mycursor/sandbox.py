@@ -0,0 +1,57 @@
+import os
+
+
+class SandboxError(Exception):
+    pass
+
+
+class Sandbox:
+    """Keeps the path arguments of file tools inside one folder.
+
+    Wraps the ``"files": True`` entries of a tool registry: ``folder_path`` is
+    resolved against ``root`` (relative or absolute, symlinks followed) and a
+    ``folder_path``/``file_name`` that ends up outside of it is refused before
+    the tool runs. Tools marked ``"path_input": True`` take a bare path string,
+    which is resolved the same way. The shell and job tools are not covered:
+    they only start in ``root``, a command can still ``cd`` out of it.
+    """
+
+    def __init__(self, root):
+        os.makedirs(root, exist_ok=True)
+        self.root = os.path.realpath(root)
+
+    def resolve(self, path):
+        full = os.path.realpath(os.path.join(self.root, path))
+        if full != self.root and not full.startswith(self.root + os.sep):
+            raise SandboxError(f"'{path}' is outside the session workspace.")
+        return full
+
+    def params(self, params, path_input=False):
+        if isinstance(params, str) and path_input:
+            return self.resolve(params)
+        if isinstance(params, dict):
+            params = dict(params)
+            folder = self.resolve(params.get("folder_path") or ".")
+            if params.get("file_name"):
+                self.resolve(os.path.join(folder, params["file_name"]))
+            params["folder_path"] = folder
+        return params
+
+    def wrap(self, fn, path_input=False):
+        def sandboxed(params=None):
+            try:
+                params = self.params(params, path_input)
+            except SandboxError as e:
+                return f"Error: {e}"
+            return fn(params)
+
+        return sandboxed
+
+    def tools(self, tools):
+        """A copy of the registry with every file tool wrapped."""
+        wrapped = {}
+        for name, tool in tools.items():
+            if tool.get("files"):
+                tool = {**tool, "fn": self.wrap(tool["fn"], tool.get("path_input", False))}
+            wrapped[name] = tool
+        return wrapped
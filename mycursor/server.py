@@ -0,0 +1,401 @@
+"""Multi-session HTTP server: many isolated agent sessions in one process.
+
+    python -m mycursor.server --port 8700 --root .mycursor-server
+
+    POST   /sessions               {"provider": "openai"|"gemini", "name": ...}  -> {"id", ...}
+    GET    /sessions               -> [{"id", "provider", "messages", "pending"}, ...]
+    POST   /sessions/<id>/queries  {"query": ...}  -> text/event-stream
+    DELETE /sessions/<id>
+    GET    /metrics                Prometheus text (see tracing.py)
+
+A query streams back as server-sent events: ``queued`` (how many queries of
+the session are ahead of it), ``text`` (what the REPL would print, in chunks)
+and a final ``done`` with the output step (or the error) of the query.
+
+Every session has its own history (``<root>/sessions/<id>``), workspace
+(``<root>/workspaces/<id>``, also the shell's starting folder) and sandboxed
+file tools. The shell and background job tools are left out unless the
+server is started with ``--shell``: they run with the server's own
+permissions, so they can reach other sessions' workspaces and the host. The event loop only does I/O: a session's queries run one at a
+time on a bounded task pool (the provider SDKs are synchronous), and every
+session's tool calls share one bounded tool pool. A session accepts at most
+``max_pending`` queries (running plus queued) and answers 429 beyond that; a
+client that reads its stream slowly holds up its own session, not others.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .completion_cache import CompletionCache
+from .session_store import valid_session_name
+from .tracing import Tracer
+from .venv_cache import VenvCache
+
+
+MAX_BODY_BYTES = 1024 * 1024
+EVENT_QUEUE = 256
+
+_SESSION_PATH = re.compile(r"^/sessions/(?P<id>[\w.-]+)(?P<queries>/queries)?$")
+
+REASONS = {
+    200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 429: "Too Many Requests",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class EventStream:
+    """Events of one query, handed from the agent's thread to the HTTP response.
+
+    ``put()`` blocks the agent thread while the queue is full, so a slow reader
+    slows its own session down; once the client is gone, events are dropped.
+    """
+
+    def __init__(self, loop, size=EVENT_QUEUE):
+        self.loop = loop
+        self.queue = asyncio.Queue(size)
+        self.closed = False
+
+    def put(self, event, data):
+        if not self.closed:
+            asyncio.run_coroutine_threadsafe(self.queue.put((event, data)), self.loop).result()
+
+    def detach(self):
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+
+class Session:
+    def __init__(self, id, provider, agent):
+        self.id = id
+        self.provider = provider
+        self.agent = agent
+        self.pending = 0
+        self.stream = None
+        self.lock = asyncio.Lock()
+
+    def echo(self, *args, sep=" ", end="\n", flush=False):
+        stream = self.stream
+        if stream is not None:
+            stream.put("text", sep.join(str(arg) for arg in args) + end)
+
+    def info(self):
+        return {"id": self.id, "provider": self.provider, "messages": len(self.agent.store), "pending": self.pending}
+
+
+class AgentServer:
+    def __init__(
+        self,
+        root=".mycursor-server",
+        max_sessions=100,
+        max_pending=2,
+        task_workers=32,
+        tool_workers=16,
+        shell_tools=False,
+        cache=None,
+        tracer=None,
+    ):
+        self.root = os.path.abspath(root)
+        self.max_sessions = max_sessions
+        self.max_pending = max_pending
+        self.shell_tools = shell_tools
+        self.cache = cache or CompletionCache.from_env()
+        self.tracer = tracer or Tracer.from_env()
+        # One wheel cache and set of template venvs for every session.
+        self.venvs = VenvCache()
+        # One provider per backend for every session, so they share its rate
+        # limiter and HTTP connection pool; built on first use.
+        self.providers = {}
+        self._providers_lock = threading.Lock()
+        self.sessions = {}
+        self.tasks = ThreadPoolExecutor(max_workers=task_workers, thread_name_prefix="task")
+        self.tools = ThreadPoolExecutor(max_workers=tool_workers, thread_name_prefix="tool")
+        self.rejected = 0
+        self._ids = itertools.count(1)
+        self._server = None
+
+    # -- sessions --------------------------------------------------------------
+
+    async def create_session(self, provider="openai", name=None):
+        if provider not in ("openai", "gemini"):
+            raise HTTPError(400, f"Unknown provider '{provider}'.")
+        if len(self.sessions) >= self.max_sessions:
+            raise HTTPError(503, f"Session limit of {self.max_sessions} reached.")
+        id = name or f"s{int(time.time())}-{next(self._ids)}"
+        if not valid_session_name(id):
+            raise HTTPError(400, f"Invalid session name '{id}'.")
+        if id in self.sessions:
+            raise HTTPError(400, f"Session '{id}' is already open.")
+        session = Session(id, provider, None)
+        self.sessions[id] = session
+        try:
+            session.agent = await asyncio.get_running_loop().run_in_executor(
+                self.tasks, self._create_agent, session
+            )
+        except Exception:
+            del self.sessions[id]
+            raise
+        return session
+
+    def _provider(self, name):
+        from .cli import create_provider
+
+        with self._providers_lock:
+            if name not in self.providers:
+                self.providers[name] = create_provider(name)
+            return self.providers[name]
+
+    def _create_agent(self, session):
+        from .cli import create_agent
+
+        return create_agent(
+            session.provider,
+            session.id,
+            cache=self.cache,
+            backend=self._provider(session.provider),
+            root=os.path.join(self.root, "workspaces", session.id),
+            store_root=os.path.join(self.root, "sessions"),
+            tracer=self.tracer,
+            pool=self.tools,
+            sandbox=True,
+            shell_tools=self.shell_tools,
+            venvs=self.venvs,
+            memory="session",  # users never recall each other's sessions
+            echo=session.echo,
+        )
+
+    def get(self, id):
+        session = self.sessions.get(id)
+        if session is None or session.agent is None:
+            raise HTTPError(404, f"No session '{id}'.")
+        return session
+
+    async def close_session(self, id):
+        session = self.get(id)
+        del self.sessions[id]
+        async with session.lock:
+            await asyncio.get_running_loop().run_in_executor(self.tasks, session.agent.close)
+
+    def admit(self, session):
+        """Count a query against the session's limit, or refuse it with a 429."""
+        if session.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPError(429, f"Session '{session.id}' has {session.pending} queries pending.", {"Retry-After": "1"})
+        session.pending += 1
+
+    async def run_query(self, session, query, stream):
+        """Run an admitted query after the ones queued before it; returns the final step."""
+        try:
+            async with session.lock:
+                session.stream = stream
+                try:
+                    return await asyncio.get_running_loop().run_in_executor(self.tasks, session.agent.ask, query)
+                finally:
+                    session.stream = None
+        finally:
+            session.pending -= 1
+
+    # -- HTTP ------------------------------------------------------------------
+
+    async def handle(self, reader, writer):
+        try:
+            method, path, body = await self._read_request(reader)
+            await self.route(method, path, body, writer)
+        except HTTPError as e:
+            await self._send_json(writer, e.status, {"error": str(e)}, e.headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            await self._send_json(writer, 500, {"error": f"{type(e).__name__}: {e}"})
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _read_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:
+            raise HTTPError(400, "Malformed request line.")
+        method, target, _ = request_line
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"Request body over {MAX_BODY_BYTES} bytes.")
+        body = {}
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except ValueError:
+                raise HTTPError(400, "Request body is not valid JSON.")
+        return method, target.split("?")[0], body
+
+    async def route(self, method, path, body, writer):
+        if path == "/sessions":
+            if method == "GET":
+                return await self._send_json(writer, 200, [s.info() for s in self.sessions.values() if s.agent])
+            if method == "POST":
+                session = await self.create_session(body.get("provider", "openai"), body.get("name"))
+                return await self._send_json(writer, 201, session.info())
+            raise HTTPError(405, f"{method} not allowed on {path}.")
+        if path == "/metrics" and method == "GET":
+            text = self.tracer.metrics.render()
+            return await self._send(writer, 200, text.encode(), "text/plain; version=0.0.4")
+        if path == "/healthz" and method == "GET":
+            return await self._send_json(writer, 200, self.summary())
+        match = _SESSION_PATH.match(path)
+        if not match:
+            raise HTTPError(404, f"No route for {path}.")
+        if match.group("queries"):
+            if method != "POST":
+                raise HTTPError(405, f"{method} not allowed on {path}.")
+            if not isinstance(body.get("query"), str) or not body["query"].strip():
+                raise HTTPError(400, "Missing 'query'.")
+            return await self._stream_query(self.get(match.group("id")), body["query"], writer)
+        if method == "GET":
+            return await self._send_json(writer, 200, self.get(match.group("id")).info())
+        if method == "DELETE":
+            await self.close_session(match.group("id"))
+            return await self._send(writer, 204, b"")
+        raise HTTPError(405, f"{method} not allowed on {path}.")
+
+    async def _stream_query(self, session, query, writer):
+        stream = EventStream(asyncio.get_running_loop())
+        # Rejections are answered before the event stream starts.
+        self.admit(session)
+        stream.queue.put_nowait(("queued", {"ahead": session.pending - 1}))
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n"
+        )
+        task = asyncio.ensure_future(self.run_query(session, query, stream))
+        try:
+            while True:
+                getter = asyncio.ensure_future(stream.queue.get())
+                done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    break
+                event, data = getter.result()
+                writer.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+                await writer.drain()
+            # The task is over; send what it emitted last, then the result.
+            while not stream.queue.empty():
+                event, data = stream.queue.get_nowait()
+                writer.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+            try:
+                final = task.result()
+                result = {"final": final, "completed": bool(final)}
+            except Exception as e:
+                result = {"final": None, "completed": False, "error": str(e)}
+            writer.write(f"event: done\ndata: {json.dumps(result)}\n\n".encode())
+            await writer.drain()
+        except (ConnectionError, OSError):
+            # The client went away: the query still runs to the end (so the
+            # history stays consistent), its events are dropped.
+            stream.detach()
+
+    async def _send(self, writer, status, data, content_type="application/json", headers=None):
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Length: {len(data)}", "Connection: close"]
+        if data:
+            head.append(f"Content-Type: {content_type}")
+        head.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+        await writer.drain()
+
+    async def _send_json(self, writer, status, payload, headers=None):
+        await self._send(writer, status, json.dumps(payload, default=str).encode(), headers=headers)
+
+    # -- lifecycle -------------------------------------------------------------
+
+    async def start(self, host="127.0.0.1", port=8700):
+        self._server = await asyncio.start_server(self.handle, host, port, limit=MAX_BODY_BYTES)
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for id in list(self.sessions):
+            if self.sessions[id].agent is not None:
+                await self.close_session(id)
+        self.tasks.shutdown(wait=False, cancel_futures=True)
+        self.tools.shutdown(wait=False, cancel_futures=True)
+        self.tracer.close()
+
+    def summary(self):
+        return {
+            "sessions": len(self.sessions),
+            "pending": sum(session.pending for session in self.sessions.values()),
+            "rejected": self.rejected,
+        }
+
+
+async def serve(args):
+    server = AgentServer(
+        args.root,
+        max_sessions=args.max_sessions,
+        max_pending=args.max_pending,
+        task_workers=args.task_workers,
+        tool_workers=args.tool_workers,
+        shell_tools=args.shell,
+    )
+    listener = await server.start(args.host, args.port)
+    port = listener.sockets[0].getsockname()[1]
+    print(f"🛰️ mycursor server on http://{args.host}:{port} (root {server.root})", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="mycursor-server", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--root", default=".mycursor-server", help="folder of the session logs and workspaces")
+    parser.add_argument("--max-sessions", type=int, default=100)
+    parser.add_argument("--max-pending", type=int, default=2, help="queries a session may have running or queued")
+    parser.add_argument("--task-workers", type=int, default=32, help="queries running at once, over all sessions")
+    parser.add_argument("--tool-workers", type=int, default=16, help="tool calls running at once, over all sessions")
+    parser.add_argument(
+        "--shell", action="store_true",
+        help="give sessions the shell and background job tools (not sandboxed: they can reach the whole host)",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        pass
+    else:
+        load_dotenv()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import json
+import os
+import re
+import shutil
+import time
+
+
+DEFAULT_ROOT = os.getenv("MYCURSOR_SESSIONS_DIR", "sessions")
+DEFAULT_SEGMENT_BYTES = 4 * 1024 * 1024
+
+# fsync policies: never fsync, fsync on every flush, or flush+fsync every message.
+FSYNC_NEVER = "never"
+FSYNC_FLUSH = "flush"
+FSYNC_ALWAYS = "always"
+
+
+def valid_session_name(name):
+    """Session names are single folder names under the root: ``[\\w.-]+``, not starting with a dot."""
+    return isinstance(name, str) and re.fullmatch(r"[\w.-]+", name) is not None and not name.startswith(".")
+
+
+def list_sessions(root=DEFAULT_ROOT):
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if valid_session_name(name) and os.path.isfile(os.path.join(root, name, "index.json"))
+    )
+
+
+class SessionStore:
+    """Append-only, segmented message log for one named session.
+
+    Messages are buffered and written as JSON lines to size-capped segment
+    files (``<root>/<name>/segment-000001.jsonl``, ...). ``index.json`` keeps the
+    message count and size of every segment plus the byte offset of every
+    ``index_every``-th message, so the tail of a long session can be loaded
+    without reading it from the start.
+
+    With ``readonly=True`` (reading another process's session) nothing is
+    created, repaired or written.
+    """
+
+    def __init__(
+        self,
+        name="default",
+        root=DEFAULT_ROOT,
+        segment_bytes=DEFAULT_SEGMENT_BYTES,
+        flush_every=16,
+        flush_interval=2.0,
+        fsync=FSYNC_FLUSH,
+        index_every=64,
+        readonly=False,
+    ):
+        if not valid_session_name(name):
+            raise ValueError(f"Invalid session name '{name}'.")
+        self.name = name
+        self.root = root
+        self.path = os.path.join(root, name)
+        self.segment_bytes = segment_bytes
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.index_every = index_every
+        self.readonly = readonly
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._file = None
+        if not readonly:
+            os.makedirs(self.path, exist_ok=True)
+        self.segments = self._load_index()
+
+    # -- index ---------------------------------------------------------------
+
+    def _index_path(self):
+        return os.path.join(self.path, "index.json")
+
+    def _segment_path(self, segment):
+        return os.path.join(self.path, segment["file"])
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                segments = json.load(f)["segments"]
+        except (OSError, ValueError, KeyError):
+            segments = [
+                {"file": file, "count": 0, "bytes": 0, "offsets": []}
+                for file in (sorted(os.listdir(self.path)) if os.path.isdir(self.path) else [])
+                if file.startswith("segment-")
+            ]
+        if self.readonly:
+            return segments
+        # Messages written after the last index update (e.g. a crash between
+        # the data write and the index write) are recovered by scanning.
+        for segment in segments:
+            path = self._segment_path(segment)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if size != segment["bytes"]:
+                self._rescan(segment, start=segment["bytes"] if size > segment["bytes"] else 0)
+            if size > segment["bytes"]:
+                # Drop a torn last line so the next append starts on a fresh line.
+                with open(path, "r+b") as f:
+                    f.truncate(segment["bytes"])
+        return segments
+
+    def _rescan(self, segment, start=0):
+        if start == 0:
+            segment.update(count=0, bytes=0, offsets=[])
+        with open(self._segment_path(segment), "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn write at the end of the file
+                self._note(segment, offset)
+                offset += len(line)
+        segment["bytes"] = offset
+
+    def _note(self, segment, offset):
+        if segment["count"] % self.index_every == 0:
+            segment["offsets"].append(offset)
+        segment["count"] += 1
+
+    def _write_index(self):
+        tmp = self._index_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"segments": self.segments}, f)
+        os.replace(tmp, self._index_path())
+
+    # -- writing -------------------------------------------------------------
+
+    def append(self, message):
+        if self.readonly:
+            raise OSError(f"Session '{self.name}' is open read-only.")
+        self._buffer.append((json.dumps(message) + "\n").encode("utf-8"))
+        if (
+            self.fsync == FSYNC_ALWAYS
+            or len(self._buffer) >= self.flush_every
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def _current_segment(self):
+        if not self.segments or self.segments[-1]["bytes"] >= self.segment_bytes:
+            if self._file:
+                self._file.close()
+                self._file = None
+            number = len(self.segments) + 1
+            self.segments.append(
+                {"file": f"segment-{number:06d}.jsonl", "count": 0, "bytes": 0, "offsets": []}
+            )
+        segment = self.segments[-1]
+        if self._file is None:
+            self._file = open(self._segment_path(segment), "ab")
+        return segment
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer or self.readonly:
+            return
+        for line in self._buffer:
+            segment = self._current_segment()
+            self._file.write(line)
+            self._note(segment, segment["bytes"])
+            segment["bytes"] += len(line)
+        self._buffer = []
+        self._file.flush()
+        if self.fsync != FSYNC_NEVER:
+            os.fsync(self._file.fileno())
+        self._write_index()
+
+    def close(self):
+        self.flush()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def reset(self):
+        """Delete every message of this session."""
+        root, path = os.path.realpath(self.root), os.path.realpath(self.path)
+        if os.path.dirname(path) != root:
+            raise OSError(f"Refusing to delete '{path}': it is not a session folder under '{root}'.")
+        self._buffer = []
+        if self._file:
+            self._file.close()
+            self._file = None
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
+        self.segments = []
+        self._write_index()
+
+    def import_jsonl(self, path):
+        """Append the messages of a plain JSONL log (e.g. the old session_memory.jsonl)."""
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    self._buffer.append((json.dumps(json.loads(line)) + "\n").encode("utf-8"))
+                except json.JSONDecodeError:
+                    continue
+        self.flush()
+
+    # -- reading -------------------------------------------------------------
+
+    def __len__(self):
+        return sum(segment["count"] for segment in self.segments) + len(self._buffer)
+
+    def _read_segment(self, segment, skip=0):
+        """Yield the messages of a segment, starting after ``skip`` messages."""
+        offsets = segment["offsets"]
+        block = min(skip // self.index_every, len(offsets) - 1)
+        offset = 0
+        if block > 0:
+            offset = offsets[block]
+            skip -= block * self.index_every
+        with open(self._segment_path(segment), "rb") as f:
+            f.seek(offset)
+            remaining = segment["bytes"] - offset
+            for line in f:
+                remaining -= len(line)
+                if remaining < 0:
+                    break
+                if skip:
+                    skip -= 1
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def __iter__(self):
+        self.flush()
+        for segment in self.segments:
+            yield from self._read_segment(segment)
+
+    def since(self, start):
+        """The messages from number ``start`` (0-based) on, skipping the segments before it."""
+        self.flush()
+        for segment in self.segments:
+            if start >= segment["count"]:
+                start -= segment["count"]
+                continue
+            yield from self._read_segment(segment, start)
+            start = 0
+
+    def tail(self, n):
+        """The last ``n`` messages, reading only the segments that hold them."""
+        self.flush()
+        if n <= 0:
+            return []
+        needed, first = n, len(self.segments)
+        while first > 0 and needed > 0:
+            first -= 1
+            needed -= self.segments[first]["count"]
+        messages = []
+        for i in range(first, len(self.segments)):
+            skip = -needed if i == first and needed < 0 else 0
+            messages.extend(self._read_segment(self.segments[i], skip))
+        return messages
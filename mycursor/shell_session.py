@@ -0,0 +1,221 @@
+import os
+import queue
+import shlex
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+
+
+DEFAULT_BUFFER_BYTES = 64 * 1024
+DEFAULT_TIMEOUT = 600
+
+IS_WINDOWS = os.name == "nt"
+
+
+class BoundedBuffer:
+    """Keeps the last ``limit`` characters written to it and counts the rest.
+
+    With ``spill=True`` everything written is also kept in a temporary file
+    once the limit is first exceeded, so ``getvalue(complete=True)`` can
+    return the whole stream while memory stays bounded during the run.
+    """
+
+    def __init__(self, limit=DEFAULT_BUFFER_BYTES, spill=False):
+        self.limit = limit
+        self.dropped = 0
+        self.spill = spill
+        self._file = None
+        self._chunks = deque()
+        self._size = 0
+
+    def write(self, text):
+        if self._file is not None:
+            self._file.write(text)
+        self._chunks.append(text)
+        self._size += len(text)
+        if self._size > self.limit and self.spill and self._file is None:
+            self._file = tempfile.TemporaryFile("w+", encoding="utf-8", errors="replace", newline="")
+            self._file.writelines(self._chunks)
+        while self._size > self.limit:
+            head = self._chunks.popleft()
+            excess = self._size - self.limit
+            if len(head) > excess:
+                self._chunks.appendleft(head[excess:])
+                head = head[:excess]
+            self._size -= len(head)
+            self.dropped += len(head)
+
+    def getvalue(self, complete=False):
+        if complete and self._file is not None:
+            self._file.seek(0)
+            return self._file.read()
+        text = "".join(self._chunks)
+        if self.dropped:
+            return f"[... {self.dropped} characters truncated ...]\n" + text
+        return text
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ShellSession:
+    """A long-lived shell that keeps its working directory and environment.
+
+    Commands run one at a time in the same ``bash`` (or ``cmd.exe`` on Windows)
+    process, so ``cd`` and venv activation carry over between calls. Each call
+    returns the exit code, timing and the (bounded) stdout/stderr.
+    With ``complete=True`` the whole stdout/stderr is returned instead, for
+    callers that bound it themselves (e.g. with an ``OutputBounder``, which
+    needs the head of a long log as well as its tail); only the last
+    ``buffer_bytes`` are held in memory while the command runs.
+    """
+
+    def __init__(self, cwd=None, buffer_bytes=DEFAULT_BUFFER_BYTES, on_output=None, complete=False):
+        self.cwd = os.path.abspath(cwd or os.getcwd())
+        self.buffer_bytes = buffer_bytes
+        self.complete = complete
+        self.on_output = on_output
+        self._lock = threading.Lock()
+        self._marker = f"__MYCURSOR_DONE_{uuid.uuid4().hex}"
+        self._proc = None
+        self._lines = None
+
+    def _start(self):
+        if IS_WINDOWS:
+            args = ["cmd.exe", "/Q", "/K"]
+            kwargs = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            args = ["bash", "--noprofile", "--norc"]
+            kwargs = {"start_new_session": True}
+        self._proc = subprocess.Popen(
+            args,
+            cwd=self.cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+            **kwargs,
+        )
+        self._lines = queue.Queue()
+        for name, stream in (("stdout", self._proc.stdout), ("stderr", self._proc.stderr)):
+            threading.Thread(
+                target=self._pump, args=(name, stream, self._lines), daemon=True
+            ).start()
+
+    @staticmethod
+    def _pump(name, stream, lines):
+        for line in stream:
+            lines.put((name, line))
+        lines.put((name, None))
+
+    def _script(self, command):
+        if IS_WINDOWS:
+            return (
+                f"{command}\n"
+                f"echo {self._marker} %ERRORLEVEL% %CD%\n"
+                f"echo {self._marker} 1>&2\n"
+            )
+        # The command is one quoted argument to eval, so a syntax error in it
+        # (an unbalanced quote, say) fails that command and the markers still run.
+        return (
+            f"eval {shlex.quote(command)} < /dev/null\n"
+            f'echo "{self._marker} $? $PWD"\n'
+            f'echo "{self._marker}" >&2\n'
+        )
+
+    def run(self, command, timeout=DEFAULT_TIMEOUT):
+        with self._lock:
+            if self._proc is None or self._proc.poll() is not None:
+                self._start()
+            buffers = {
+                "stdout": BoundedBuffer(self.buffer_bytes, spill=self.complete),
+                "stderr": BoundedBuffer(self.buffer_bytes, spill=self.complete),
+            }
+            start = time.perf_counter()
+            self._proc.stdin.write(self._script(command))
+            self._proc.stdin.flush()
+
+            exit_code = None
+            pending = {"stdout", "stderr"}
+            timed_out = False
+            while pending:
+                remaining = timeout - (time.perf_counter() - start)
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                try:
+                    name, line = self._lines.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+                if line is None:
+                    pending.discard(name)
+                    continue
+                index = line.find(self._marker)
+                if index == -1:
+                    buffers[name].write(line)
+                    if self.on_output:
+                        self.on_output(name, line)
+                    continue
+                if index:
+                    buffers[name].write(line[:index])
+                pending.discard(name)
+                if name == "stdout":
+                    exit_code, cwd = self._parse_marker(line[index:])
+                    if cwd:
+                        self.cwd = cwd
+
+            if timed_out:
+                self.close()
+            elif exit_code is None:
+                # The shell itself exited (e.g. the command ran `exit`).
+                exit_code = self._proc.wait()
+                self._proc = None
+
+            stdout = buffers["stdout"].getvalue(self.complete)
+            stderr = buffers["stderr"].getvalue(self.complete)
+            for buffer in buffers.values():
+                buffer.close()
+
+        return {
+            "exit_code": exit_code,
+            "stdout": stdout,
+            "stderr": stderr,
+            "duration": round(time.perf_counter() - start, 3),
+            "cwd": self.cwd,
+            "timed_out": timed_out,
+        }
+
+    def _parse_marker(self, line):
+        parts = line.rstrip("\r\n").split(" ", 2)
+        try:
+            exit_code = int(parts[1])
+        except (IndexError, ValueError):
+            exit_code = None
+        cwd = parts[2].strip() if len(parts) > 2 else None
+        return exit_code, cwd
+
+    def close(self):
+        if self._proc is None:
+            return
+        if self._proc.poll() is None:
+            try:
+                if IS_WINDOWS:
+                    subprocess.run(
+                        ["taskkill", "/F", "/T", "/PID", str(self._proc.pid)],
+                        capture_output=True,
+                    )
+                else:
+                    os.killpg(self._proc.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        self._proc.wait()
+        self._proc = None
@@ -0,0 +1,300 @@
+import json
+import re
+
+
+# A trailing, not yet complete escape sequence inside a streamed string:
+# a lone backslash or a partial \uXXXX, and a high surrogate waiting for its pair.
+_PARTIAL_ESCAPE = re.compile(r'(\\u[0-9a-fA-F]{0,3}|\\)$')
+_HIGH_SURROGATE = re.compile(r'\\u[dD][89abAB][0-9a-fA-F]{2}$')
+
+_WHITESPACE = " \t\r\n"
+
+_DECODER = json.JSONDecoder()
+# What a JSON object has to start with: a key or the closing brace.
+_OBJECT_START = re.compile(r'\{[ \t\r\n]*["}]')
+
+
+class _Frame:
+    __slots__ = ("kind", "track", "holds_steps", "fields", "key", "expect", "start", "dispatched")
+
+    def __init__(self, kind, track=False, holds_steps=False):
+        self.kind = kind
+        self.track = track
+        self.holds_steps = holds_steps
+        self.fields = {}
+        self.key = None
+        self.expect = "key"
+        self.start = None
+        self.dispatched = False
+
+
+class StepStreamParser:
+    """Incremental parser for the `{"step": ...}` objects the agent streams back.
+
+    Both a single step object and a ``{"steps": [...]}`` batch are understood;
+    every step of a batch is reported on its own as soon as it is ready.
+    Feed it text chunks as they arrive; every call returns a list of events:
+
+    - ``("delta", step, text)`` – newly decoded characters of the step's
+      ``content`` string, emitted while the string is still streaming.
+    - ``("step", step, fields)`` – a step is ready to act on. Actions marked
+      ``"independent"`` before their input are emitted as soon as their
+      ``function`` and ``input`` fields are complete; every other step when
+      its object closes, so a trailing ``"independent"`` is not lost.
+
+    The text is scanned exactly once, so the cost is linear in the response size.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._delta_pos = None
+        self.steps = []
+
+    def feed(self, chunk: str):
+        self._buf += chunk
+        events = []
+        buf = self._buf
+        for i in range(self._pos, len(buf)):
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._end_string(i, events)
+                continue
+            if c == '"':
+                if self._stack:
+                    self._in_string = True
+                    self._start_string(i)
+            elif c == "{" or c == "[":
+                self._open(c, i)
+            elif c == "}" or c == "]":
+                self._close(i, events)
+            elif c == ",":
+                self._comma(i, events)
+            elif c == ":":
+                frame = self._top()
+                if frame is not None and frame.track and frame.expect == "colon":
+                    frame.expect = "value"
+            elif c not in _WHITESPACE:
+                frame = self._top()
+                if frame is not None and frame.track and frame.expect == "value":
+                    frame.expect = "in_value"
+                    frame.start = i
+        self._pos = len(buf)
+        if self._delta_pos is not None:
+            self._emit_delta(len(buf), events, final=False)
+        return events
+
+    def _top(self):
+        return self._stack[-1] if self._stack else None
+
+    def _start_string(self, i):
+        frame = self._top()
+        if frame is None or not frame.track:
+            return
+        if frame.expect == "key":
+            frame.start = i
+        elif frame.expect == "value":
+            frame.expect = "in_value"
+            frame.start = i
+            if frame.key == "content":
+                self._delta_pos = i + 1
+
+    def _end_string(self, i, events):
+        frame = self._top()
+        if frame is None or not frame.track:
+            return
+        if frame.expect == "key":
+            frame.key = json.loads(self._buf[frame.start:i + 1])
+            frame.expect = "colon"
+        elif frame.expect == "in_value":
+            if self._delta_pos is not None:
+                self._emit_delta(i, events, final=True)
+            self._finish_value(frame, self._buf[frame.start:i + 1], events)
+
+    def _open(self, c, i):
+        parent = self._top()
+        if parent is None:
+            # Anything before the first brace (fences, prose) is skipped.
+            if c == "{":
+                self._stack.append(_Frame(c, track=True))
+            return
+        if parent.holds_steps:
+            self._stack.append(_Frame(c, track=c == "{"))
+            return
+        holds_steps = False
+        if parent.track and parent.expect == "value":
+            parent.expect = "in_value"
+            parent.start = i
+            holds_steps = c == "[" and parent.key == "steps"
+        self._stack.append(_Frame(c, holds_steps=holds_steps))
+
+    def _close(self, i, events):
+        if not self._stack:
+            return
+        frame = self._stack.pop()
+        if frame.track:
+            if frame.expect == "in_value":
+                self._finish_value(frame, self._buf[frame.start:i], events)
+            self._complete(frame, events)
+            return
+        parent = self._top()
+        if parent is not None and parent.track and parent.expect == "in_value":
+            self._finish_value(parent, self._buf[parent.start:i + 1], events)
+
+    def _comma(self, i, events):
+        frame = self._top()
+        if frame is None or not frame.track:
+            return
+        if frame.expect == "in_value":
+            self._finish_value(frame, self._buf[frame.start:i], events)
+        frame.expect = "key"
+
+    def _finish_value(self, frame, raw, events):
+        try:
+            frame.fields[frame.key] = json.loads(raw)
+        except json.JSONDecodeError:
+            frame.fields[frame.key] = raw.strip()
+        frame.expect = "comma"
+        fields = frame.fields
+        if (
+            not frame.dispatched
+            and fields.get("step") == "action"
+            and "function" in fields
+            and "input" in fields
+            and "independent" in fields
+        ):
+            frame.dispatched = True
+            self._emit_step(fields, events)
+
+    def _complete(self, frame, events):
+        if not frame.dispatched and "step" in frame.fields:
+            frame.dispatched = True
+            self._emit_step(frame.fields, events)
+
+    def _emit_step(self, fields, events):
+        step = dict(fields)
+        self.steps.append(step)
+        events.append(("step", step.get("step"), step))
+
+    def _emit_delta(self, end, events, final):
+        raw = self._buf[self._delta_pos:end]
+        if not final:
+            partial = _PARTIAL_ESCAPE.search(raw)
+            if partial and (partial.group(1) != "\\" or self._escape):
+                raw = raw[:partial.start()]
+            surrogate = _HIGH_SURROGATE.search(raw)
+            if surrogate:
+                raw = raw[:surrogate.start()]
+        if raw:
+            try:
+                text = json.loads('"' + raw + '"')
+            except json.JSONDecodeError:
+                text = None
+            if text:
+                frame = self._top()
+                events.append(("delta", frame.fields.get("step"), text))
+            if text is not None:
+                self._delta_pos += len(raw)
+        if final:
+            self._delta_pos = None
+
+
+class JSONObjectExtractor:
+    """Pulls every top-level JSON object out of a stream of text chunks.
+
+    Text outside objects (markdown fences, prose before or after) is skipped,
+    and braces inside strings are ignored, so nested inputs and code content
+    are handled. Each character is scanned once: the offsets of open braces
+    are kept on a stack, and every closed ``{...}`` is remembered under the
+    one enclosing it, so when an outer candidate turns out not to be JSON
+    (e.g. `{name}` in prose) the inner ones are tried without rescanning.
+    Consumed text is dropped from the buffer as soon as an object completes.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._offset = 0
+        self._pos = 0
+        # Open brackets: (stream offset of a "{", or None for "[", closed objects inside it).
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self.errors = 0
+
+    def feed(self, chunk: str):
+        self._buf += chunk
+        objects = []
+        buf, stack, offset = self._buf, self._stack, self._offset
+        i = self._pos
+        while i < len(buf):
+            c = buf[i]
+            if not stack:
+                if c == "{":
+                    stack.append((offset + i, []))
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c == "{":
+                stack.append((offset + i, []))
+            elif c == "[":
+                stack.append((None, []))
+            elif c == "}" or c == "]":
+                start, inner = stack.pop()
+                candidates = inner if start is None else [(start, offset + i + 1, inner)]
+                if stack:
+                    stack[-1][1].extend(candidates)
+                else:
+                    self._resolve(candidates, objects)
+            i += 1
+        if not stack:
+            self._buf, self._offset, self._pos = "", offset + len(buf), 0
+        else:
+            cut = stack[0][0] - offset
+            self._buf, self._offset, self._pos = buf[cut:], offset + cut, len(buf) - cut
+        return objects
+
+    def _resolve(self, candidates, objects):
+        """Decode closed candidates in order; one that is not JSON falls back to those inside it."""
+        todo = candidates[::-1]
+        while todo:
+            start, end, inner = todo.pop()
+            # Prose like `{name}` is turned down here, before paying for a decode error.
+            if _OBJECT_START.match(self._buf, start - self._offset):
+                try:
+                    obj, stop = _DECODER.raw_decode(self._buf, start - self._offset)
+                    if stop == end - self._offset:
+                        objects.append(obj)
+                        continue
+                except json.JSONDecodeError:
+                    pass
+            self.errors += 1
+            todo.extend(reversed(inner))
+
+    def close(self):
+        """Objects still recoverable at the end of the stream.
+
+        An unbalanced brace in prose can swallow a real object that follows
+        it; the complete objects inside every brace left open are returned.
+        """
+        objects = []
+        for _, inner in self._stack:
+            self._resolve(inner, objects)
+        errors = self.errors
+        self.__init__()
+        self.errors = errors
+        return objects
@@ -0,0 +1,127 @@
+import json
+
+from .context_window import count_tokens
+from .tool_executor import ActionBatch
+
+
+# Appended to the system prompts of both agents. One response may carry a whole
+# batch of steps, so plans and independent actions no longer cost a model call each.
+BATCH_PROMPT = """
+---
+
+## ⚡ Batched Steps
+
+When the next steps do not depend on an observation you have not seen yet, return them
+together in a single JSON object instead of one step per response:
+
+```json
+{ "steps": [
+    { "step": "plan", "content": "Create the project folder and the app file." },
+    { "step": "action", "function": "<tool>", "input": "<input>" },
+    { "step": "action", "function": "<tool>", "input": "<input>" }
+] }
+```
+
+All actions of a batch are executed in order and every observation is sent back to you
+in one message. Add `"independent": true` to an action that does not depend on the
+actions before it (e.g. writing several unrelated files), before its `"input"`;
+independent actions run concurrently. Stop a batch as soon as a step needs an observation, and finish the task
+with an `output` step (it may be the last step of a batch).
+"""
+
+
+def parse_steps(obj):
+    """Normalize a model reply into a list of step dicts.
+
+    Accepts a single step object, a ``{"steps": [...]}`` batch or a bare list.
+    """
+    if isinstance(obj, list):
+        return [step for step in obj if isinstance(step, dict)]
+    if isinstance(obj, dict):
+        if isinstance(obj.get("steps"), list):
+            return parse_steps(obj["steps"])
+        if "step" in obj:
+            return [obj]
+    return []
+
+
+def run_steps(steps, executor, report=None):
+    """Run a batch of steps in order on a ``ToolExecutor``.
+
+    Returns ``(observations, final)`` where ``final`` is the ``output`` step that
+    ended the batch, or None if the model still has work to do.
+    """
+    batch = ActionBatch(executor)
+    for step in steps:
+        if report:
+            report(step)
+        kind = step.get("step")
+        if kind == "action":
+            batch.add(step)
+        elif kind == "output":
+            return batch.finish(), step
+    return batch.finish(), None
+
+
+def observation_message(observations):
+    """Serialize the observations of one batch into a single `observe` step."""
+    if len(observations) == 1:
+        return json.dumps({"step": "observe", "output": observations[0]["output"]})
+    return json.dumps({"step": "observe", "outputs": observations})
+
+
+class CallStats:
+    """Counts model calls and the observation bytes/tokens fed back per completed task."""
+
+    def __init__(self):
+        self.calls = 0
+        self.tasks = 0
+        self.task_calls = 0
+        self.observed_bytes = 0
+        self.observed_tokens = 0
+        self.task_bytes = 0
+        self.task_tokens = 0
+        self._current = 0
+        self._bytes = 0
+        self._tokens = 0
+
+    def start_task(self):
+        self._current = 0
+        self._bytes = 0
+        self._tokens = 0
+
+    def record_call(self):
+        self.calls += 1
+        self._current += 1
+
+    def record_observation(self, text):
+        size, tokens = len(text.encode("utf-8")), count_tokens(text)
+        self.observed_bytes += size
+        self.observed_tokens += tokens
+        self._bytes += size
+        self._tokens += tokens
+
+    def complete_task(self):
+        self.tasks += 1
+        self.task_calls += self._current
+        self.task_bytes += self._bytes
+        self.task_tokens += self._tokens
+        self._current = 0
+        self._bytes = 0
+        self._tokens = 0
+
+    @property
+    def calls_per_task(self):
+        return self.task_calls / self.tasks if self.tasks else 0.0
+
+    def summary(self):
+        per_task = ""
+        if self.tasks:
+            per_task = (
+                f", {self.task_bytes / self.tasks:.0f} observation bytes "
+                f"({self.task_tokens / self.tasks:.0f} tokens) per task"
+            )
+        return (
+            f"📊 {self.tasks} tasks completed, {self.calls} model calls, "
+            f"{self.calls_per_task:.1f} calls per completed task{per_task}"
+        )
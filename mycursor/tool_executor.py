@@ -0,0 +1,197 @@
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+
+DEFAULT_TIMEOUT = 120
+
+
+class _Pending:
+    __slots__ = ("name", "step", "future", "timeout", "deadline", "started", "parent")
+
+    def __init__(self, name, step, timeout=None, parent=None):
+        self.name = name
+        self.step = step
+        self.future = Future()
+        self.timeout = timeout
+        self.deadline = None
+        self.started = threading.Event()
+        self.parent = parent
+
+
+class ToolExecutor:
+    """Runs agent actions on a shared thread pool.
+
+    Each entry of the tool registry may set ``"concurrency"`` (how many calls of
+    that tool can run at once, default 1) and ``"timeout"`` in seconds. Calls
+    over a tool's concurrency wait in a queue here rather than on a pool
+    worker, and the timeout only starts once a call is running; a call that
+    overruns it is reported as an observation and the worker thread is left to
+    finish in the background since Python threads cannot be killed.
+    ``bound`` (e.g. an ``OutputBounder``) is applied on the worker thread to the
+    output of every tool not marked ``"paged": True`` (tools that already page
+    their own output). With a ``tracer``, every call is recorded as a ``tool``
+    span under the span that was current when it was submitted. A ``pool``
+    passed in (e.g. one bounded pool for every session of the server) is
+    shared and left running by ``shutdown()``.
+    """
+
+    def __init__(self, tools, max_workers=8, default_timeout=DEFAULT_TIMEOUT, bound=None, tracer=None, pool=None):
+        self.tools = tools
+        self.default_timeout = default_timeout
+        self.bound = bound
+        self.tracer = tracer
+        self._owns_pool = pool is None
+        self._pool = pool or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._lock = threading.Lock()
+        self._running = dict.fromkeys(tools, 0)
+        self._waiting = {name: deque() for name in tools}
+
+    def submit(self, step):
+        name = step.get("function")
+        # A malformed action (no function, or not a string) is reported like an unknown one.
+        tool = self.tools.get(name) if isinstance(name, str) else None
+        if not tool:
+            pending = _Pending(name, step)
+            pending.future.set_result({"function": name, "output": f"Function '{name}' not found."})
+            pending.started.set()
+            return pending
+        parent = self.tracer.current() if self.tracer else None
+        pending = _Pending(name, step, tool.get("timeout", self.default_timeout), parent)
+        with self._lock:
+            self._waiting[name].append(pending)
+        self._dispatch(name)
+        return pending
+
+    def _dispatch(self, name):
+        """Hand queued calls of ``name`` to the pool while it is under its concurrency."""
+        limit = self.tools[name].get("concurrency", 1)
+        while True:
+            with self._lock:
+                if self._running[name] >= limit or not self._waiting[name]:
+                    return
+                pending = self._waiting[name].popleft()
+                if pending.future.cancelled():
+                    pending.started.set()
+                    continue
+                self._running[name] += 1
+            try:
+                self._pool.submit(self._run, pending)
+            except RuntimeError:  # the pool was shut down
+                with self._lock:
+                    self._running[name] -= 1
+                pending.future.cancel()
+                pending.started.set()
+
+    def _run(self, pending):
+        try:
+            if not pending.future.set_running_or_notify_cancel():
+                return
+            if pending.timeout:
+                pending.deadline = time.monotonic() + pending.timeout
+            pending.started.set()
+            pending.future.set_result(
+                self._call(pending.name, self.tools[pending.name], pending.step.get("input"), pending.parent)
+            )
+        finally:
+            pending.started.set()
+            with self._lock:
+                self._running[pending.name] -= 1
+            self._dispatch(pending.name)
+
+    def _call(self, name, tool, tool_input, parent=None):
+        start = time.perf_counter()
+        error = None
+        try:
+            output = tool["fn"](tool_input)
+            if self.bound is not None and not tool.get("paged"):
+                output = self.bound(output)
+        except Exception as e:
+            output = error = f"Error running '{name}': {e}"
+        if self.tracer is not None:
+            self.tracer.record(
+                "tool",
+                time.perf_counter() - start,
+                parent,
+                function=name,
+                observation_bytes=len(json.dumps(output, default=str)),
+                error=error,
+            )
+        return {"function": name, "output": output}
+
+    def collect(self, pending):
+        """Wait for a submitted call and return its observation."""
+        # A call queued behind a hung one gets its timeout to start; if it has not
+        # started by then it is dropped, so it never runs after being reported.
+        if not pending.started.wait(pending.timeout) and self.cancel(pending):
+            return {
+                "function": pending.name,
+                "output": f"Error: '{pending.name}' did not start within {pending.timeout}s "
+                "(earlier calls of it are still running); it was not run.",
+            }
+        if pending.future.cancelled():
+            return {"function": pending.name, "output": f"Error: '{pending.name}' was cancelled before it started."}
+        timeout = None
+        if pending.deadline is not None:
+            timeout = max(0.0, pending.deadline - time.monotonic())
+        try:
+            return pending.future.result(timeout=timeout)
+        except FutureTimeout:
+            return {"function": pending.name, "output": f"Error: '{pending.name}' timed out after {pending.timeout}s."}
+
+    def cancel(self, pending):
+        """Drop a call that has not started yet; returns False if it is already running or done."""
+        cancelled = pending.future.cancel()
+        if cancelled:
+            pending.started.set()
+        return cancelled
+
+    def run(self, actions):
+        """Run a list of actions and return their observations in order."""
+        batch = ActionBatch(self)
+        for step in actions:
+            batch.add(step)
+        return batch.finish()
+
+    def shutdown(self):
+        with self._lock:
+            waiting = [pending for queue in self._waiting.values() for pending in queue]
+        for pending in waiting:
+            self.cancel(pending)
+        if self._owns_pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ActionBatch:
+    """Collects the actions of one model response.
+
+    Actions marked ``"independent": true`` are started right away and may run
+    concurrently with each other. Any other action first waits for everything
+    before it, so it sees their effects. Observations always come back in the
+    order the model listed the actions.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.observations = []
+        self._pending = []
+
+    def add(self, step):
+        independent = bool(step.get("independent"))
+        if not independent:
+            self._drain()
+        self._pending.append(self.executor.submit(step))
+        if not independent:
+            self._drain()
+
+    def _drain(self):
+        for pending in self._pending:
+            self.observations.append(self.executor.collect(pending))
+        self._pending = []
+
+    def finish(self):
+        self._drain()
+        return self.observations
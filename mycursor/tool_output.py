@@ -0,0 +1,182 @@
+import hashlib
+import os
+import re
+import threading
+
+
+DEFAULT_ROOT = os.getenv("MYCURSOR_OUTPUTS_DIR", os.path.join(".cache", "outputs"))
+# Outputs longer than this many characters are cut to head/tail and spilled to disk.
+DEFAULT_MAX_CHARS = int(os.getenv("MYCURSOR_OUTPUT_CHARS", "4000"))
+
+_ERROR_LINE = re.compile(
+    r"error|exception|traceback|failed|fatal|cannot|not found|denied|warning", re.IGNORECASE
+)
+
+
+class OutputStore:
+    """Content-addressed store of full tool outputs.
+
+    Each output is saved once as ``<root>/<id[:2]>/<id>.txt`` where ``id`` is
+    the first 16 hex digits of its SHA-256, so the same build log spilled twice
+    costs one file. ``page()`` serves line ranges of a stored output.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _path(self, ref):
+        if not re.fullmatch(r"[0-9a-f]{16}", ref or ""):
+            raise KeyError(f"'{ref}' is not an output reference.")
+        return os.path.join(self.root, ref[:2], ref + ".txt")
+
+    def put(self, text):
+        data = text.encode("utf-8", errors="replace")
+        ref = hashlib.sha256(data).hexdigest()[:16]
+        path = self._path(ref)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+        return ref
+
+    def get(self, ref):
+        try:
+            with open(self._path(ref), "r", encoding="utf-8", newline="") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise KeyError(f"No stored output '{ref}'.") from None
+
+    def page(self, ref, start_line=1, end_line=None, pattern=None, max_chars=DEFAULT_MAX_CHARS):
+        """Numbered lines of a stored output, optionally only those matching ``pattern``.
+
+        Returns ``(text, last_line, total_lines)``; ``text`` stops at ``max_chars``.
+        """
+        lines = self.get(ref).splitlines()
+        total = len(lines)
+        end = min(total, end_line or total)
+        regex = re.compile(pattern, re.IGNORECASE) if pattern else None
+        out, size, last = [], 0, start_line - 1
+        for number in range(max(1, start_line), end + 1):
+            line = lines[number - 1]
+            if regex and not regex.search(line):
+                last = number
+                continue
+            entry = f"{number}: {line}"
+            if out and size + len(entry) + 1 > max_chars:
+                break
+            out.append(entry)
+            size += len(entry) + 1
+            last = number
+        return "\n".join(out), last, total
+
+
+def error_lines(text, limit=10):
+    """The first ``limit`` lines that look like errors or warnings."""
+    found = []
+    for line in text.splitlines():
+        if _ERROR_LINE.search(line):
+            found.append(line.strip()[:300])
+            if len(found) == limit:
+                break
+    return found
+
+
+class OutputBounder:
+    """Keeps tool observations small before they reach the message history.
+
+    Text longer than ``max_chars`` is replaced by its first ``head_lines`` and
+    last ``tail_lines`` lines (each side capped to half of ``max_chars``), the
+    lines that look like errors, and a reference id under which the full text
+    was spilled to the ``OutputStore``. Shell results keep their exit code,
+    duration and cwd; only ``stdout``/``stderr`` are bounded.
+    """
+
+    def __init__(self, store=None, max_chars=DEFAULT_MAX_CHARS, head_lines=20, tail_lines=40):
+        self.store = store or OutputStore()
+        self.max_chars = max_chars
+        self.head_lines = head_lines
+        self.tail_lines = tail_lines
+        self.spilled = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, output):
+        if isinstance(output, dict) and ("stdout" in output or "stderr" in output):
+            bounded = dict(output)
+            limit = self.max_chars // 2 if output.get("stdout") and output.get("stderr") else self.max_chars
+            for stream in ("stdout", "stderr"):
+                text = output.get(stream) or ""
+                if len(text) > limit:
+                    bounded[stream] = self._bound(text, limit)
+            return bounded
+        if isinstance(output, str) and len(output) > self.max_chars:
+            return self._bound(output, self.max_chars)
+        return output
+
+    def _bound(self, text, limit):
+        ref = self.store.put(text)
+        lines = text.splitlines()
+        half = limit // 2
+        head = _clip("\n".join(lines[:self.head_lines]), half)
+        tail = _clip("\n".join(lines[-self.tail_lines:]), half, from_end=True)
+        omitted = max(0, len(lines) - self.head_lines - self.tail_lines)
+        bounded = {
+            "ref": ref,
+            "total_lines": len(lines),
+            "total_bytes": len(text.encode("utf-8", errors="replace")),
+            "head": head,
+            "tail": tail,
+            "error_lines": error_lines(text),
+            "note": f"{omitted} lines omitted; page through them with read_output(ref, start_line, end_line, grep).",
+        }
+        with self._lock:
+            self.spilled += 1
+            self.bytes_in += bounded["total_bytes"]
+            self.bytes_out += len(head) + len(tail)
+        return bounded
+
+    def summary(self):
+        return (
+            f"📦 tool output: {self.spilled} outputs spilled to {self.store.root}, "
+            f"{self.bytes_in} bytes kept out of context ({self.bytes_out} bytes of head/tail kept)"
+        )
+
+
+def _clip(text, limit, from_end=False):
+    if len(text) <= limit:
+        return text
+    return "…" + text[-limit:] if from_end else text[:limit] + "…"
+
+
+def build_read_output(store, max_chars=DEFAULT_MAX_CHARS * 3 // 4, echo=print):
+    """The ``read_output`` tool: pages through a spilled output by reference id.
+
+    Pages stay under the bounder's limit so they are never spilled again.
+    """
+
+    def read_output(params) -> str:
+        params = params if isinstance(params, dict) else {"ref": params}
+        ref = params.get("ref")
+        echo("🔨 Tool Called: read_output", ref)
+        try:
+            end = params.get("end_line")
+            text, last, total = store.page(
+                ref,
+                int(params.get("start_line", 1)),
+                int(end) if end else None,
+                params.get("grep"),
+                max_chars,
+            )
+        except (KeyError, re.error) as e:
+            return f"Error reading output: {e}"
+        header = f"output {ref}: lines {params.get('start_line', 1)}-{last} of {total}"
+        if last < (min(int(end), total) if end else total):
+            header += f" (continue with start_line {last + 1})"
+        return f"{header}\n{text}" if text else f"{header}\nNo matching lines."
+
+    return read_output
@@ -0,0 +1,293 @@
+"""Spans and metrics for the agent loops.
+
+Every user query, model call, parse, tool call and log write becomes a span
+with its latency and attributes (tokens, retries, observation bytes, ...).
+Spans are appended to a JSONL trace and aggregated into Prometheus metrics,
+written to a text file after every query and optionally served over HTTP.
+
+    python -m mycursor.tracing [.cache/trace.jsonl]   # p50/p95 per stage
+"""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+
+from .hedging import percentile
+
+
+DEFAULT_TRACE_FILE = os.getenv("MYCURSOR_TRACE_FILE", os.path.join(".cache", "trace.jsonl"))
+DEFAULT_METRICS_FILE = os.getenv("MYCURSOR_METRICS_FILE", os.path.join(".cache", "metrics.prom"))
+
+# The in-process p50/p95 summary is over the latest this many spans of each stage,
+# so a long-running server does not keep every duration it ever saw.
+DURATION_WINDOW = 10_000
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Numeric span attributes that are summed into Prometheus counters.
+COUNTED = (
+    "prompt_tokens",
+    "cached_prompt_tokens",
+    "uncached_prompt_tokens",
+    "completion_tokens",
+    "retries",
+    "observation_bytes",
+)
+
+
+class Span:
+    __slots__ = ("tracer", "id", "trace", "parent", "name", "start", "wall", "attrs")
+
+    def __init__(self, tracer, name, parent, attrs):
+        self.tracer = tracer
+        self.id = uuid.uuid4().hex[:16]
+        self.parent = parent.id if parent else None
+        self.trace = parent.trace if parent else self.id
+        self.name = name
+        self.start = time.perf_counter()
+        self.wall = time.time()
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def end(self, duration=None, **attrs):
+        """Close the span; ``duration`` overrides the measured wall time."""
+        self.attrs.update(attrs)
+        self.tracer._finish(self, time.perf_counter() - self.start if duration is None else duration)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.attrs["error"] = f"{exc_type.__name__}: {exc}"
+        self.end()
+        return False
+
+
+class Metrics:
+    """Prometheus-style latency histograms per stage (and tool), plus counters."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, duration, attrs):
+        labels = (("stage", name),)
+        if name == "tool" and "function" in attrs:
+            labels += (("tool", str(attrs["function"])),)
+        with self._lock:
+            counts, total, count = self.histograms.get(labels, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    counts[i] += 1
+            self.histograms[labels] = (counts, total + duration, count + 1)
+            for key in COUNTED:
+                value = attrs.get(key)
+                if isinstance(value, (int, float)) and value:
+                    self._add(f"mycursor_{key}_total", (("stage", name),), value)
+            if attrs.get("error"):
+                self._add("mycursor_errors_total", (("stage", name),), 1)
+
+    def _add(self, metric, labels, value):
+        key = (metric, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def render(self):
+        """The metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP mycursor_stage_seconds Latency of agent loop stages.",
+            "# TYPE mycursor_stage_seconds histogram",
+        ]
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self.histograms.items()):
+                base = ",".join(f'{key}="{value}"' for key, value in labels)
+                for bound, bucket in zip(self.buckets, counts):
+                    lines.append(f'mycursor_stage_seconds_bucket{{{base},le="{bound}"}} {bucket}')
+                lines.append(f'mycursor_stage_seconds_bucket{{{base},le="+Inf"}} {count}')
+                lines.append(f"mycursor_stage_seconds_sum{{{base}}} {total:.6f}")
+                lines.append(f"mycursor_stage_seconds_count{{{base}}} {count}")
+            metric = None
+            for (name, labels), value in sorted(self.counters.items()):
+                if name != metric:
+                    lines.append(f"# TYPE {name} counter")
+                    metric = name
+                base = ",".join(f'{key}="{value}"' for key, value in labels)
+                lines.append(f"{name}{{{base}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve ``/metrics`` from a daemon thread; returns the server."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                found = self.path.split("?")[0] in ("/", "/metrics")
+                body = metrics.render().encode("utf-8") if found else b"not found\n"
+                self.send_response(200 if found else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+class Tracer:
+    """Creates spans, appends them to a JSONL trace and feeds the metrics.
+
+    ``start()`` opens a span whose parent defaults to the innermost span opened
+    on the same thread; work handed to other threads (tool calls) passes
+    ``parent`` explicitly. ``record()`` adds a span whose duration was measured
+    elsewhere, e.g. time spent parsing spread over a whole stream. ``summary()``
+    counts every span but takes percentiles over the last ``window`` of each stage.
+    """
+
+    def __init__(
+        self, path=DEFAULT_TRACE_FILE, metrics_path=DEFAULT_METRICS_FILE, metrics_port=None, window=DURATION_WINDOW
+    ):
+        self.path = path
+        self.metrics_path = metrics_path
+        self.metrics = Metrics()
+        self.window = window
+        self.durations = {}
+        self.counts = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._file = None
+        self._server = self.metrics.serve(metrics_port) if metrics_port else None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = open(path, "a", encoding="utf-8")
+
+    @classmethod
+    def from_env(cls):
+        """MYCURSOR_TRACE=0 turns off the trace and metrics files; MYCURSOR_METRICS_PORT serves /metrics."""
+        enabled = os.getenv("MYCURSOR_TRACE", "1") != "0"
+        port = os.getenv("MYCURSOR_METRICS_PORT")
+        return cls(
+            DEFAULT_TRACE_FILE if enabled else None,
+            DEFAULT_METRICS_FILE if enabled else None,
+            int(port) if port else None,
+        )
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def start(self, name, parent=None, **attrs):
+        span = Span(self, name, parent or self.current(), attrs)
+        self._stack().append(span)
+        return span
+
+    def span(self, name, parent=None, **attrs):
+        """``start()`` for use as a context manager."""
+        return self.start(name, parent, **attrs)
+
+    def record(self, name, duration, parent=None, **attrs):
+        span = Span(self, name, parent or self.current(), attrs)
+        span.start -= duration
+        span.wall -= duration
+        self._finish(span, duration)
+
+    def _finish(self, span, duration):
+        stack = self._stack()
+        if span in stack:
+            stack.remove(span)
+        self.metrics.observe(span.name, duration, span.attrs)
+        with self._lock:
+            if span.name not in self.durations:
+                self.durations[span.name] = deque(maxlen=self.window)
+            self.durations[span.name].append(duration)
+            self.counts[span.name] = self.counts.get(span.name, 0) + 1
+            if self._file is not None:
+                record = {
+                    "trace": span.trace,
+                    "span": span.id,
+                    "parent": span.parent,
+                    "name": span.name,
+                    "start": round(span.wall, 6),
+                    "duration": round(duration, 6),
+                    **{key: value for key, value in span.attrs.items() if value is not None},
+                }
+                self._file.write(json.dumps(record, default=str) + "\n")
+
+    def flush(self):
+        """Flush the trace and rewrite the metrics file; called after every query."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+        if self.metrics_path:
+            self.metrics.write(self.metrics_path)
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self._server is not None:
+            self._server.shutdown()
+
+    def summary(self):
+        with self._lock:
+            return format_summary(self.durations, self.counts)
+
+
+def format_summary(durations, counts=None):
+    lines = [f"⏱️ {'stage':<10}{'count':>7}{'p50':>10}{'p95':>10}{'max':>10}"]
+    for name, values in sorted(durations.items()):
+        count = counts[name] if counts else len(values)
+        lines.append(
+            f"   {name:<10}{count:>7}"
+            f"{percentile(values, 50):>9.3f}s{percentile(values, 95):>9.3f}s{max(values):>9.3f}s"
+        )
+    return "\n".join(lines)
+
+
+def summarize(path):
+    """Per-stage latency percentiles and token totals of a JSONL trace."""
+    durations, totals = {}, dict.fromkeys(COUNTED, 0)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                span = json.loads(line)
+            except ValueError:
+                continue  # torn last line of a live trace
+            durations.setdefault(span["name"], []).append(span["duration"])
+            for key in COUNTED:
+                if isinstance(span.get(key), (int, float)):
+                    totals[key] += span[key]
+    lines = [format_summary(durations)]
+    lines.append("   " + ", ".join(f"{key} {value}" for key, value in totals.items()))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(summarize(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TRACE_FILE))
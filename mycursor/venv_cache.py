@@ -0,0 +1,340 @@
+"""Shared wheel cache and template virtualenvs for scaffolded projects.
+
+A project venv is made by cloning a template venv that already has the
+requirements installed, instead of running ``python -m venv`` and
+``pip install`` again. Templates are keyed by a hash of the normalized
+requirement set (plus the Python version and platform); site-packages is
+hardlinked into the new venv and only the files that embed the venv path
+(``bin/``/``Scripts/`` and ``pyvenv.cfg``) are copied and rewritten.
+
+Wheels are kept in ``<root>/wheels`` and templates are only ever installed
+from there (``pip install --no-index``). Online, missing wheels are fetched
+with ``pip wheel`` first; offline (``--offline`` / MYCURSOR_OFFLINE=1) the
+wheel cache plus MYCURSOR_WHEELS (a local wheel directory) must hold
+everything.
+
+    python -m mycursor.venv_cache create ./covid_dashboard/venv dash pandas
+    python -m mycursor.venv_cache create ./app/venv -r requirements.txt --offline --wheels ./wheels
+    python -m mycursor.venv_cache warm flask     # build the template ahead of time
+    python -m mycursor.venv_cache list
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+
+DEFAULT_ROOT = os.getenv("MYCURSOR_VENV_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "mycursor"))
+MARKER = "mycursor-template.json"
+LOCK_TIMEOUT = 1800
+
+IS_WINDOWS = os.name == "nt"
+BIN_DIR = "Scripts" if IS_WINDOWS else "bin"
+
+
+class VenvError(Exception):
+    pass
+
+
+def normalize_requirements(requirements):
+    """Sorted, de-duplicated requirement lines with PEP 503 names, from a list or requirements text."""
+    if isinstance(requirements, str):
+        requirements = requirements.splitlines()
+    lines = set()
+    for line in requirements:
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        if line.startswith("-"):
+            raise VenvError(f"Unsupported requirement option '{line}'; list the packages instead.")
+        match = re.match(r"([A-Za-z0-9][A-Za-z0-9._-]*)(.*)", line)
+        if not match:
+            raise VenvError(f"Invalid requirement '{line}'.")
+        name, rest = match.groups()
+        lines.add(re.sub(r"[-_.]+", "-", name).lower() + re.sub(r"\s+", "", rest))
+    return sorted(lines)
+
+
+def requirements_key(requirements):
+    """Template key: a hash of the requirement set, the Python version and the platform."""
+    payload = json.dumps({
+        "requirements": normalize_requirements(requirements),
+        "python": platform.python_version(),
+        "implementation": sys.implementation.name,
+        "platform": f"{sys.platform}-{platform.machine()}",
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _python(venv):
+    return os.path.join(venv, BIN_DIR, "python.exe" if IS_WINDOWS else "python")
+
+
+def _run(command, what):
+    proc = subprocess.run(command, capture_output=True, text=True, encoding="utf-8", errors="replace")
+    if proc.returncode != 0:
+        output = (proc.stdout + proc.stderr).strip().splitlines()
+        raise VenvError(f"{what} failed ({proc.returncode}):\n" + "\n".join(output[-20:]))
+    return proc.stdout
+
+
+class VenvCache:
+    def __init__(self, root=DEFAULT_ROOT, wheel_dirs=None, offline=None, python=sys.executable):
+        self.root = os.path.abspath(root)
+        self.wheels = os.path.join(self.root, "wheels")
+        self.templates = os.path.join(self.root, "templates")
+        if wheel_dirs is None:
+            wheel_dirs = [path for path in os.getenv("MYCURSOR_WHEELS", "").split(os.pathsep) if path]
+        self.wheel_dirs = [os.path.abspath(path) for path in wheel_dirs]
+        if offline is None:
+            offline = os.getenv("MYCURSOR_OFFLINE") == "1"
+        self.offline = offline
+        self.python = python
+        self.hits = 0
+        self.builds = 0
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _find_links(self):
+        args = []
+        for path in [self.wheels] + self.wheel_dirs:
+            args += ["--find-links", path]
+        return args
+
+    def fetch(self, requirements):
+        """Put wheels for ``requirements`` and their dependencies in the wheel cache."""
+        if self.offline or not requirements:
+            return
+        _run(
+            [self.python, "-m", "pip", "wheel", "--quiet", "--disable-pip-version-check",
+             "--wheel-dir", self.wheels, *self._find_links(), *requirements],
+            "pip wheel",
+        )
+
+    def template(self, requirements):
+        """Path of the template venv for ``requirements``, built on first use.
+
+        Returns ``(path, built)``; concurrent callers (threads or processes)
+        wait for a build in progress instead of starting another one.
+        """
+        requirements = normalize_requirements(requirements)
+        key = requirements_key(requirements)
+        os.makedirs(self.wheels, exist_ok=True)
+        os.makedirs(self.templates, exist_ok=True)
+        path = os.path.join(self.templates, key)
+        if os.path.exists(os.path.join(path, MARKER)):
+            return path, False
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock, _FileLock(path + ".lock"):
+            if os.path.exists(os.path.join(path, MARKER)):
+                return path, False
+            shutil.rmtree(path, ignore_errors=True)  # a build that died half-way
+            start = time.perf_counter()
+            try:
+                self.fetch(requirements)
+                _run([self.python, "-m", "venv", path], "python -m venv")
+                if requirements:
+                    _run(
+                        [_python(path), "-m", "pip", "install", "--quiet", "--disable-pip-version-check",
+                         "--no-index", *self._find_links(), *requirements],
+                        "pip install" + (" (offline)" if self.offline else ""),
+                    )
+            except Exception:
+                shutil.rmtree(path, ignore_errors=True)
+                raise
+            with open(os.path.join(path, MARKER), "w", encoding="utf-8") as f:
+                json.dump({
+                    "key": key,
+                    "requirements": requirements,
+                    "python": platform.python_version(),
+                    "created": time.time(),
+                    "build_seconds": round(time.perf_counter() - start, 2),
+                }, f, indent=2)
+            self.builds += 1
+            return path, True
+
+    def create(self, dest, requirements, link=True):
+        """Make a venv at ``dest`` with ``requirements`` installed, cloned from a template.
+
+        With ``link`` the template's files are hardlinked (falling back to a
+        copy across filesystems); otherwise they are copied. Returns a dict
+        with the venv's python, the template key and whether it was a hit.
+        """
+        dest = os.path.abspath(dest)
+        if os.path.exists(dest) and os.listdir(dest):
+            raise VenvError(f"'{dest}' already exists and is not empty.")
+        start = time.perf_counter()
+        template, built = self.template(requirements)
+        if not built:
+            self.hits += 1
+        clone_venv(template, dest, link)
+        return {
+            "venv": dest,
+            "python": _python(dest),
+            "template": os.path.basename(template),
+            "cached": not built,
+            "seconds": round(time.perf_counter() - start, 2),
+        }
+
+    def list(self):
+        entries = []
+        if not os.path.isdir(self.templates):
+            return entries
+        for key in sorted(os.listdir(self.templates)):
+            try:
+                with open(os.path.join(self.templates, key, MARKER), encoding="utf-8") as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def summary(self):
+        return f"🐍 venv cache: {self.hits} template hits, {self.builds} templates built"
+
+
+class _FileLock:
+    """Exclusive lock file, so separate processes do not build the same template twice."""
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return self
+            except FileExistsError:
+                try:
+                    # A lock older than the timeout belongs to a build that died.
+                    if time.time() - os.path.getmtime(self.path) > self.timeout:
+                        os.remove(self.path)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise VenvError(f"Timed out waiting for {self.path}.")
+                time.sleep(0.2)
+
+    def __exit__(self, *exc):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def clone_venv(template, dest, link=True):
+    """Copy a venv, rewriting the files that embed its absolute path.
+
+    Those files (scripts and activators in ``bin``/``Scripts``, ``pyvenv.cfg``)
+    get fresh copies; with ``link`` every other file is hardlinked, which is
+    safe because pip replaces files rather than writing into them.
+    """
+    old, new = template.encode(), os.path.abspath(dest).encode()
+    rewrite = {os.path.join(template, BIN_DIR), os.path.join(template, "pyvenv.cfg")}
+
+    def copy(src, dst):
+        if src == os.path.join(template, MARKER):
+            return dst
+        if os.path.dirname(src) in rewrite or src in rewrite:
+            if os.path.islink(src):
+                os.symlink(os.readlink(src), dst)
+                return dst
+            with open(src, "rb") as f:
+                data = f.read()
+            if old in data:
+                with open(dst, "wb") as f:
+                    f.write(data.replace(old, new))
+                shutil.copymode(src, dst)
+                return dst
+            return shutil.copy2(src, dst)
+        if link:
+            try:
+                os.link(src, dst)
+                return dst
+            except OSError:
+                pass
+        return shutil.copy2(src, dst)
+
+    shutil.copytree(template, dest, symlinks=True, copy_function=copy, dirs_exist_ok=True)
+
+
+def build_venv_tools(cache, cwd=None, echo=print):
+    """``make_venv`` tool function over ``cache``.
+
+    ``cwd`` is a callable giving the folder relative paths start from (e.g. the shell's cwd);
+    ``echo`` is where calls are reported.
+    """
+
+    def make_venv(params) -> str:
+        echo("🔨 Tool Called: make_venv", params)
+        try:
+            if isinstance(params, str):
+                params = {"folder_path": params}
+            folder = params.get("folder_path") or "."
+            if cwd is not None:
+                folder = os.path.join(cwd(), folder)
+            requirements = params.get("requirements") or []
+            if isinstance(requirements, str):
+                path = os.path.join(folder, requirements)
+                if os.path.isfile(path):
+                    with open(path, encoding="utf-8") as f:
+                        requirements = f.read()
+                else:
+                    requirements = requirements.replace(",", " ").split()
+            name = os.path.basename(params.get("name") or "venv")
+            result = cache.create(os.path.join(folder, name), requirements)
+            return {**result, "note": "Run the venv's python directly; no pip install is needed for these requirements."}
+        except (VenvError, OSError) as e:
+            return f"Error creating venv: {e}"
+
+    return make_venv
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m mycursor.venv_cache", description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    parser.add_argument("--wheels", action="append", help="local wheel directory (repeatable)")
+    parser.add_argument("--offline", action="store_true", default=None, help="never contact a package index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("create", "warm"):
+        command = commands.add_parser(name)
+        if name == "create":
+            command.add_argument("dest")
+            command.add_argument("--copy", action="store_true", help="copy instead of hardlinking")
+        command.add_argument("packages", nargs="*")
+        command.add_argument("-r", "--requirement", action="append", default=[])
+    commands.add_parser("list")
+    args = parser.parse_args(argv)
+
+    cache = VenvCache(args.root, args.wheels, args.offline)
+    try:
+        if args.command == "list":
+            for entry in cache.list():
+                print(f"{entry['key']}  python {entry['python']}  {' '.join(entry['requirements']) or '(empty)'}")
+            return
+        requirements = list(args.packages)
+        for path in args.requirement:
+            with open(path, encoding="utf-8") as f:
+                requirements += f.read().splitlines()
+        if args.command == "warm":
+            path, built = cache.template(requirements)
+            print(("built " if built else "cached ") + path)
+        else:
+            print(json.dumps(cache.create(args.dest, requirements, link=not args.copy), indent=2))
+    except VenvError as e:
+        print(f"🔴 {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_BASE_URL = os.getenv("WTTR_BASE_URL", "https://wttr.in")
+
+
+class WeatherError(Exception):
+    pass
+
+
+class WeatherClient:
+    """wttr.in client with connection pooling and a per-city TTL cache.
+
+    A cached answer younger than ``ttl`` seconds is returned as is. One that is
+    older but younger than ``stale_ttl`` is still returned immediately while a
+    background refresh fetches a new one (stale-while-revalidate). ``get_many``
+    looks up several cities concurrently over the same pooled session.
+    """
+
+    def __init__(
+        self,
+        base_url=DEFAULT_BASE_URL,
+        ttl=600,
+        stale_ttl=3600,
+        timeout=10,
+        max_workers=8,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="weather")
+        self._cache = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _fetch(self, city):
+        url = f"{self.base_url}/{quote(city)}?format=%C+%t"
+        response = self.session.get(url, timeout=self.timeout)
+        if response.status_code != 200:
+            raise WeatherError(f"wttr.in returned {response.status_code} for {city}")
+        return response.text.strip()
+
+    def _refresh(self, key, city):
+        try:
+            value = self._fetch(city)
+            with self._lock:
+                self._cache[key] = (value, time.monotonic())
+        except (requests.RequestException, WeatherError):
+            pass  # keep serving the stale value until it expires
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, city):
+        key = " ".join(city.lower().split())
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                value, fetched = entry
+                age = now - fetched
+                if age < self.ttl:
+                    self.hits += 1
+                    return value
+                if age < self.stale_ttl:
+                    self.hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        self._pool.submit(self._refresh, key, city)
+                    return value
+            self.misses += 1
+        value = self._fetch(city)
+        with self._lock:
+            self._cache[key] = (value, time.monotonic())
+        return value
+
+    def get_many(self, cities):
+        """Weather for several cities, fetched concurrently. Failures map to exceptions."""
+        futures = {city: self._pool.submit(self.get, city) for city in cities}
+        results = {}
+        for city, future in futures.items():
+            try:
+                results[city] = future.result()
+            except (requests.RequestException, WeatherError) as e:
+                results[city] = e
+        return results
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        self.session.close()
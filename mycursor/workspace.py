@@ -0,0 +1,334 @@
+import ast
+import fnmatch
+import mmap
+import os
+import re
+import threading
+from array import array
+
+
+# Largest slice a single read returns; the model pages on with start_line.
+READ_MAX_BYTES = int(os.getenv("MYCURSOR_READ_BYTES", "20000"))
+
+IGNORED_DIRS = {".git", ".hg", ".svn", "venv", ".venv", "env", "node_modules", "__pycache__", ".cache", "sessions"}
+
+PYTHON_EXTENSIONS = {".py"}
+JS_EXTENSIONS = {".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx"}
+
+_JS_SYMBOL = re.compile(
+    r"^(?:export\s+(?:default\s+)?)?(?:"
+    r"(?:async\s+)?function\s*\*?\s*(?P<function>[A-Za-z_$][\w$]*)"
+    r"|class\s+(?P<class>[A-Za-z_$][\w$]*)"
+    r"|(?:const|let|var)\s+(?P<variable>[A-Za-z_$][\w$]*)\s*="
+    r")",
+    re.MULTILINE,
+)
+
+
+def _map(path):
+    """Read-only mmap of ``path``, or None for an empty file."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def line_offsets(data):
+    """Byte offset of the start of every line (plus the end of the data)."""
+    offsets = array("Q", [0])
+    offsets.extend(m.end() for m in re.finditer(b"\n", data))
+    if offsets[-1] != len(data):
+        offsets.append(len(data))
+    return offsets
+
+
+def _python_symbols(source):
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    symbols = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            kind = "class" if isinstance(node, ast.ClassDef) else "def"
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            symbols.append((node.name, kind, start, node.end_lineno))
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            symbols.append((node.targets[0].id, "var", node.lineno, node.end_lineno))
+    return symbols
+
+
+def _js_symbols(source):
+    symbols = []
+    for match in _JS_SYMBOL.finditer(source):
+        kind = match.lastgroup
+        name = match.group(kind)
+        start = source.count("\n", 0, match.start()) + 1
+        symbols.append((name, kind, start, start + _block_lines(source, match.end())))
+    return symbols
+
+
+def _block_lines(source, index):
+    """Newlines between ``index`` and the end of the statement or braced block there."""
+    depth, quote, i = 0, None, index
+    while i < len(source):
+        char = source[i]
+        if quote:
+            if char == "\\":
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+        elif char in "{([":
+            depth += 1
+        elif char in "})]":
+            depth -= 1
+            if depth == 0 and char == "}":
+                break
+        elif depth == 0 and char in ";\n" and source[index:i].strip():
+            break
+        i += 1
+    return source.count("\n", index, i)
+
+
+class _Entry:
+    __slots__ = ("size", "mtime", "symbols", "offsets")
+
+    def __init__(self, size, mtime):
+        self.size = size
+        self.mtime = mtime
+        self.symbols = None
+        self.offsets = None
+
+
+class WorkspaceIndex:
+    """Index of the files under ``root``: sizes, mtimes and top-level symbols.
+
+    ``refresh()`` walks the tree and only re-parses files whose size or mtime
+    changed, so keeping the index current is a stat per file. Line offsets are
+    computed lazily on the first ranged read of a file and reused until it
+    changes; reads go through ``mmap`` and only copy the requested slice.
+    """
+
+    def __init__(self, root=".", ignored_dirs=IGNORED_DIRS, max_files=20000):
+        self.root = os.path.abspath(root)
+        self.ignored_dirs = set(ignored_dirs)
+        self.max_files = max_files
+        self.files = {}
+        self.parsed = 0
+        self._lock = threading.Lock()
+
+    def _walk(self):
+        stack = [self.root]
+        while stack:
+            folder = stack.pop()
+            try:
+                entries = list(os.scandir(folder))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in self.ignored_dirs:
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+    def refresh(self):
+        """Bring the index up to date; returns the number of changed files."""
+        with self._lock:
+            seen, changed = set(), 0
+            for entry in self._walk():
+                if len(seen) >= self.max_files:
+                    break
+                path = os.path.relpath(entry.path, self.root).replace(os.sep, "/")
+                stat = entry.stat(follow_symlinks=False)
+                seen.add(path)
+                known = self.files.get(path)
+                if known is None or known.size != stat.st_size or known.mtime != stat.st_mtime_ns:
+                    self.files[path] = _Entry(stat.st_size, stat.st_mtime_ns)
+                    changed += 1
+            for path in set(self.files) - seen:
+                del self.files[path]
+                changed += 1
+            return changed
+
+    def relative(self, path):
+        """``path`` (absolute, or relative to the root) as an index key."""
+        return os.path.relpath(os.path.join(self.root, path), self.root).replace(os.sep, "/")
+
+    def _entry(self, path):
+        """The up-to-date entry of one file, re-stat'ed so reads never see stale offsets."""
+        relative = self.relative(path)
+        stat = os.stat(os.path.join(self.root, relative))
+        with self._lock:
+            entry = self.files.get(relative)
+            if entry is None or entry.size != stat.st_size or entry.mtime != stat.st_mtime_ns:
+                entry = self.files[relative] = _Entry(stat.st_size, stat.st_mtime_ns)
+            return relative, entry
+
+    def symbols(self, path):
+        relative, entry = self._entry(path)
+        if entry.symbols is None:
+            extension = os.path.splitext(relative)[1].lower()
+            symbols = []
+            if extension in PYTHON_EXTENSIONS or extension in JS_EXTENSIONS:
+                with open(os.path.join(self.root, relative), encoding="utf-8", errors="replace") as f:
+                    source = f.read()
+                parse = _python_symbols if extension in PYTHON_EXTENSIONS else _js_symbols
+                symbols = parse(source)
+                self.parsed += 1
+            entry.symbols = symbols
+        return entry.symbols
+
+    def read_lines(self, path, start_line=1, end_line=None, max_bytes=READ_MAX_BYTES):
+        """Lines ``start_line``..``end_line`` (1-based, inclusive) and the last line returned.
+
+        Returns ``(text, last_line, total_lines, cut)``. Stops early once
+        ``max_bytes`` have been read, at a line boundary; a single line longer
+        than that (minified JS, a data dump) is cut at ``max_bytes`` and ``cut``
+        is the file byte offset to continue from, otherwise None.
+        """
+        relative, entry = self._entry(path)
+        data = _map(os.path.join(self.root, relative))
+        if data is None:
+            return "", 0, 0
+        try:
+            if entry.offsets is None:
+                entry.offsets = line_offsets(data)
+            offsets = entry.offsets
+            total = len(offsets) - 1
+            start = max(1, start_line)
+            end = min(total, end_line or total)
+            if start > end:
+                return "", start - 1, total, None
+            stop = end
+            while stop > start and offsets[stop] - offsets[start - 1] > max_bytes:
+                stop = start + (stop - start) // 2
+            cut = None
+            if offsets[stop] - offsets[start - 1] > max_bytes:
+                cut = offsets[start - 1] + max_bytes
+                while cut > offsets[start - 1] and data[cut] & 0xC0 == 0x80:  # inside a UTF-8 character
+                    cut -= 1
+            text = data[offsets[start - 1]:cut or offsets[stop]].decode("utf-8", errors="replace")
+            return text, stop, total, cut
+        finally:
+            data.close()
+
+    def read_bytes(self, path, start=0, end=None):
+        relative, _ = self._entry(path)
+        data = _map(os.path.join(self.root, relative))
+        if data is None:
+            return b""
+        try:
+            return data[start:end]
+        finally:
+            data.close()
+
+    def find_symbol(self, name, path=None):
+        """``(path, name, kind, start, end)`` of every top-level symbol called ``name``."""
+        if path:
+            candidates = [self.relative(path)]
+        else:
+            self.refresh()
+            candidates = sorted(self.files)
+        matches = []
+        for candidate in candidates:
+            for symbol in self.symbols(candidate):
+                if symbol[0] == name:
+                    matches.append((candidate,) + symbol)
+        return matches
+
+    def summary(self):
+        return f"🗂️ workspace index: {len(self.files)} files, {self.parsed} parsed for symbols"
+
+
+def _numbered(text, first_line):
+    lines = text.splitlines()
+    width = len(str(first_line + len(lines)))
+    return "\n".join(f"{first_line + i:>{width}}: {line}" for i, line in enumerate(lines))
+
+
+def _path(params):
+    if isinstance(params, str):
+        return params
+    file_name = params["file_name"]
+    folder_path = params.get("folder_path")
+    return os.path.join(folder_path, file_name) if folder_path else file_name
+
+
+def build_read_tools(index, echo=print):
+    """``read_file``, ``list_files`` and ``find_symbol`` tool functions over ``index``.
+
+    Calls are reported through ``echo``.
+    """
+
+    def read_file(params) -> str:
+        path = params
+        try:
+            path = _path(params)
+            echo("🔨 Tool Called: read_file", path)
+            options = params if isinstance(params, dict) else {}
+            if "start_byte" in options or "end_byte" in options:
+                start = int(options.get("start_byte", 0))
+                end = int(options["end_byte"]) if options.get("end_byte") is not None else None
+                if end is None or end - start > READ_MAX_BYTES:
+                    end = start + READ_MAX_BYTES
+                return index.read_bytes(path, start, end).decode("utf-8", errors="replace")
+            start = int(options.get("start_line", 1))
+            end = options.get("end_line")
+            text, last, total, cut = index.read_lines(path, start, int(end) if end else None)
+            if not text:
+                return f"'{path}' has {total} lines; nothing in the requested range."
+            result = f"{path} lines {start}-{last} of {total}\n{_numbered(text, start)}"
+            if cut is not None:
+                result += f"\n… line {start} is cut at {READ_MAX_BYTES} bytes; continue with start_byte {cut}."
+            elif last < (min(int(end), total) if end else total):
+                result += f"\n… truncated; continue with start_line {last + 1}."
+            return result
+        except Exception as e:
+            return f"Error reading '{path}': {e}"
+
+    def list_files(params=None) -> str:
+        echo("🔨 Tool Called: list_files", params)
+        params = params if isinstance(params, dict) else {"pattern": params} if params else {}
+        index.refresh()
+        prefix = index.relative(params["folder_path"]) + "/" if params.get("folder_path") else ""
+        if prefix == "./":
+            prefix = ""
+        pattern = params.get("pattern") or "*"
+        lines = []
+        for path in sorted(index.files):
+            if not path.startswith(prefix) or not fnmatch.fnmatch(os.path.basename(path), pattern):
+                continue
+            if len(lines) == 200:
+                lines.append("… more files; narrow folder_path or pattern.")
+                break
+            names = ", ".join(symbol[0] for symbol in index.symbols(path))
+            lines.append(f"{path} ({index.files[path].size} B)" + (f": {names}" if names else ""))
+        return "\n".join(lines) or "No matching files."
+
+    def find_symbol(params) -> str:
+        try:
+            name = params if isinstance(params, str) else params["name"]
+            path = _path(params) if isinstance(params, dict) and params.get("file_name") else None
+            echo("🔨 Tool Called: find_symbol", name, path or "")
+            matches = index.find_symbol(name, path)
+            if not matches:
+                return f"No top-level symbol '{name}' found."
+            parts = []
+            for match_path, _, kind, start, end in matches[:5]:
+                text, last, _, cut = index.read_lines(match_path, start, end)
+                part = f"{match_path} lines {start}-{last} ({kind} {name})\n{_numbered(text, start)}"
+                if cut is not None:
+                    part += f"\n… cut at {READ_MAX_BYTES} bytes; continue with read_file start_byte {cut}."
+                elif last < end:
+                    part += f"\n… truncated; continue with read_file start_line {last + 1}."
+                parts.append(part)
+            if len(matches) > 5:
+                parts.append(f"… {len(matches) - 5} more matches; pass file_name to narrow it down.")
+            return "\n\n".join(parts)
+        except Exception as e:
+            return f"Error finding symbol: {e}"
+
+    return read_file, list_files, find_symbol
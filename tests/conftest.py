@@ -0,0 +1,41 @@
+import pytest
+
+from mycursor.completion_cache import CompletionCache
+from mycursor.providers import FakeProvider
+from mycursor.tracing import Tracer
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """A scratch folder as the cwd, since the file tools resolve relative paths from there."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def make_agent(workdir):
+    """Build an agent of ``cls`` whose model replies are scripted."""
+    agents = []
+
+    def make(cls, replies, **options):
+        provider = options.pop("provider", None) or FakeProvider(replies)
+        options.setdefault("echo", lambda *args, **kwargs: None)
+        options.setdefault("cache", CompletionCache(enabled=False))
+        agent = cls(
+            session="test",
+            root=str(workdir),
+            store_root=str(workdir / "sessions"),
+            tracer=Tracer(None, None),
+            memory=None,
+            provider=provider,
+            **options,
+        )
+        agents.append(agent)
+        return agent
+
+    yield make
+    for agent in agents:
+        agent.executor.shutdown()
+        agent.jobs.close()
+        agent.shell.close()
+        agent.store.close()
@@ -0,0 +1,140 @@
+import atexit
+import json
+
+import pytest
+
+from mycursor.completion_cache import CompletionCache
+from mycursor.gemini_agent import GeminiAgent
+from mycursor.openai_agent import OpenAIAgent
+from mycursor.providers import FakeProvider
+
+
+def logged(agent):
+    return list(agent.store)
+
+
+def test_openai_loop_runs_a_batch_and_finishes(workdir, make_agent):
+    agent = make_agent(OpenAIAgent, [
+        {"steps": [
+            {"step": "plan", "content": "Write two files."},
+            {"step": "action", "function": "edit_file", "independent": True,
+             "input": {"file_name": "a.txt", "folder_path": "./proj", "content": "a"}},
+            {"step": "action", "function": "edit_file", "independent": True,
+             "input": {"file_name": "b.txt", "folder_path": "./proj", "content": "b"}},
+        ]},
+        {"step": "output", "content": "Wrote both."},
+    ])
+    final = agent.ask("write a and b")
+    assert final == {"step": "output", "content": "Wrote both."}
+    assert (workdir / "proj" / "a.txt").read_text() == "a"
+    assert (workdir / "proj" / "b.txt").read_text() == "b"
+    observe = json.loads(logged(agent)[2]["content"])
+    assert observe["step"] == "observe" and len(observe["outputs"]) == 2
+    assert agent.stats.tasks == 1
+
+
+def test_openai_loop_gives_up_on_an_unknown_function(make_agent):
+    agent = make_agent(OpenAIAgent, [{"step": "action", "function": "nope", "input": ""}])
+    assert agent.ask("do it") is None
+
+
+def test_openai_tool_time_does_not_count_against_the_model_deadline(make_agent):
+    reply = {"steps": [
+        {"step": "action", "function": "exec_command", "input": "sleep 1.5"},
+        {"step": "output", "content": "Slept."},
+    ]}
+    agent = make_agent(OpenAIAgent, None, provider=FakeProvider([reply], timeout=1, chunk_size=4))
+    assert agent.ask("sleep") == {"step": "output", "content": "Slept."}
+
+
+def test_openai_cut_off_reply_is_not_logged(make_agent):
+    reply = {"steps": [
+        {"step": "action", "function": "make_directory", "input": "./d"},
+        {"step": "output", "content": "x" * 400},
+    ]}
+    provider = FakeProvider([reply], timeout=0.3, chunk_size=4, token_delay=0.01, max_retries=0)
+    agent = make_agent(OpenAIAgent, None, provider=provider)
+    assert agent.ask("go") is None
+    assistant = [m for m in logged(agent) if m["role"] == "assistant" and "observe" not in m["content"]]
+    assert json.loads(assistant[0]["content"]) == {"steps": [reply["steps"][0]]}
+
+
+def test_gemini_loop_extracts_steps_from_prose(workdir, make_agent):
+    agent = make_agent(GeminiAgent, [
+        'Plan:\n```json\n{"step": "action", "function": "edit_file", '
+        '"input": {"file_name": "a.txt", "content": "hi"}}\n```',
+        '{"step": "output", "content": "Done."}',
+    ])
+    assert agent.ask("write a") == {"step": "output", "content": "Done."}
+    assert (workdir / "a.txt").read_text() == "hi"
+
+
+def test_gemini_loop_keeps_observations_of_a_final_batch(make_agent):
+    agent = make_agent(GeminiAgent, [{"steps": [
+        {"step": "action", "function": "replace_lines",
+         "input": {"file_name": "missing.txt", "start_line": 1, "content": "x"}},
+        {"step": "output", "content": "Done."},
+    ]}])
+    assert agent.ask("edit") == {"step": "output", "content": "Done."}
+    observe = json.loads(logged(agent)[-1]["content"])
+    assert observe["step"] == "observe"
+    assert observe["output"].startswith("Error")
+
+
+def test_tool_calls_are_reported_through_echo(workdir, make_agent, capsys):
+    lines = []
+    agent = make_agent(OpenAIAgent, [
+        {"steps": [
+            {"step": "action", "function": "edit_file", "input": {"file_name": "a.txt", "content": "a"}},
+            {"step": "action", "function": "read_file", "input": "a.txt"},
+            {"step": "action", "function": "list_jobs", "input": ""},
+        ]},
+        {"step": "output", "content": "Done."},
+    ], echo=lambda *args, **kwargs: lines.append(" ".join(map(str, args))))
+    agent.ask("write and read a")
+    called = [line for line in lines if "Tool Called" in line]
+    assert called == [
+        "🔨 Tool Called: edit_file a.txt",
+        "🔨 Tool Called: read_file a.txt",
+        "🔨 Tool Called: list_jobs",
+    ]
+    assert "Tool Called" not in capsys.readouterr().out
+
+
+def test_close_unregisters_the_job_cleanup(make_agent, monkeypatch):
+    registered = []
+    monkeypatch.setattr(atexit, "register", registered.append)
+    monkeypatch.setattr(atexit, "unregister", registered.remove)
+    agent = make_agent(OpenAIAgent, [])
+    assert registered == [agent.jobs.close]
+    agent.close()
+    assert registered == []
+
+
+def test_a_cache_hit_in_another_session_does_not_mark_this_call_cached(make_agent, tmp_path):
+    cache = CompletionCache(str(tmp_path / "cache"))
+
+    def reply(messages):
+        cache.hits += 1  # another session sharing the cache gets a hit meanwhile
+        return {"step": "output", "content": "Done."}
+
+    agent = make_agent(OpenAIAgent, None, provider=FakeProvider(reply), cache=cache)
+    agent.ask("go")
+    assert agent.provider.last_hit is False
+    assert len(agent.prefix.calls) == 1
+    agent.messages = agent.initial_messages()
+    agent.ask("go")
+    assert agent.provider.last_hit is True
+
+
+@pytest.mark.parametrize("action", [{"step": "action", "input": "x"}, {"step": "action", "function": ["edit_file"]}])
+def test_openai_malformed_action_is_reported_not_raised(make_agent, action):
+    agent = make_agent(OpenAIAgent, [action])
+    assert agent.ask("do it") is None
+
+
+@pytest.mark.parametrize("action", [{"step": "action", "input": "x"}, {"step": "action", "function": ["edit_file"]}])
+def test_gemini_malformed_action_is_observed_not_raised(make_agent, action):
+    agent = make_agent(GeminiAgent, [json.dumps(action), {"step": "output", "content": "ok"}])
+    assert agent.ask("do it") == {"step": "output", "content": "ok"}
+    assert "not found" in logged(agent)[2]["content"]
@@ -0,0 +1,46 @@
+from mycursor.edit_tools import apply_patch, edit_file, replace_lines, search_replace
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8", newline="")
+
+
+def test_edit_file_creates_folders(workdir):
+    result = edit_file({"file_name": "app.py", "folder_path": "./proj/src", "content": "x = 1\n"})
+    assert "successfully" in result
+    assert (workdir / "proj" / "src" / "app.py").read_text() == "x = 1\n"
+
+
+def test_search_replace_needs_a_unique_match(workdir):
+    write(workdir / "a.py", "a = 1\na = 1\nb = 2\n")
+    result = search_replace({"file_name": "a.py", "search": "a = 1", "replace": "a = 3"})
+    assert result.startswith("Conflict")
+    assert (workdir / "a.py").read_text() == "a = 1\na = 1\nb = 2\n"
+
+    result = search_replace({"file_name": "a.py", "search": "a = 1", "replace": "a = 3", "anchor": "a = 1\n"})
+    assert result.startswith("Replaced")
+    assert (workdir / "a.py").read_text() == "a = 1\na = 3\nb = 2\n"
+
+
+def test_replace_lines_checks_expected_text(workdir):
+    write(workdir / "a.txt", "one\ntwo\nthree\n")
+    result = replace_lines({"file_name": "a.txt", "start_line": 2, "end_line": 2, "content": "2", "expected": "zwei"})
+    assert result.startswith("Conflict")
+    result = replace_lines({"file_name": "a.txt", "start_line": 2, "end_line": 2, "content": "2", "expected": "two"})
+    assert result.startswith("Replaced")
+    assert (workdir / "a.txt").read_text() == "one\n2\nthree\n"
+
+
+def test_replace_lines_on_a_missing_file_is_an_error(workdir):
+    assert replace_lines({"file_name": "nope.txt", "start_line": 1, "content": "x"}).startswith("Error")
+
+
+def test_apply_patch_keeps_crlf_and_is_all_or_nothing(workdir):
+    write(workdir / "a.txt", "one\r\ntwo\r\nthree\r\n")
+    diff = "@@ -1,3 +1,3 @@\n one\n-two\n+TWO\n three\n"
+    assert apply_patch({"file_name": "a.txt", "diff": diff}).startswith("Patch applied")
+    assert (workdir / "a.txt").read_bytes() == b"one\r\nTWO\r\nthree\r\n"
+
+    bad = diff.replace("-two\n+TWO", "-TWO\n+2") + "@@ -9,1 +9,1 @@\n-missing\n+x\n"
+    assert apply_patch({"file_name": "a.txt", "diff": bad}).startswith("Conflict")
+    assert (workdir / "a.txt").read_bytes() == b"one\r\nTWO\r\nthree\r\n"
@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from mycursor.hedging import HedgedProvider
+from mycursor.providers import FakeProvider, ProviderError
+
+PRIMARY = {"step": "output", "content": "primary"}
+SECONDARY = {"step": "output", "content": "secondary"}
+
+
+def hedged(primary, secondary, **options):
+    options.setdefault("initial_delay", 0.1)
+    return HedgedProvider(primary, secondary, **options)
+
+
+def test_a_fast_primary_wins_without_hedging():
+    provider = hedged(FakeProvider([PRIMARY]), FakeProvider([SECONDARY]))
+    assert '"primary"' in provider.complete([]).text
+    assert provider.hedged == 0 and provider.secondary_wins == 0
+
+
+def test_a_slow_primary_loses_to_the_secondary():
+    provider = hedged(FakeProvider([PRIMARY], latency=1.0), FakeProvider([SECONDARY]))
+    start = time.monotonic()
+    completion = provider.complete([])
+    assert '"secondary"' in completion.text
+    assert time.monotonic() - start < 0.8
+    assert provider.hedged == 1 and provider.secondary_wins == 1
+    assert completion.usage["completion_tokens"] > 0
+
+
+def test_an_invalid_primary_reply_starts_the_secondary_at_once():
+    provider = hedged(FakeProvider(["Sorry, I cannot help."]), FakeProvider([SECONDARY]), initial_delay=5.0)
+    start = time.monotonic()
+    assert '"secondary"' in provider.complete([]).text
+    assert time.monotonic() - start < 1.0
+
+
+def test_both_sides_failing_raises():
+    provider = hedged(
+        FakeProvider([PRIMARY], errors=[ValueError("primary down")], max_retries=0),
+        FakeProvider([SECONDARY], errors=[ValueError("secondary down")], max_retries=0),
+    )
+    with pytest.raises(ProviderError, match="primary down.*secondary down"):
+        provider.complete([])
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from mycursor.providers import DeadlineExceeded, FakeProvider, ProviderError, TokenBucket, TransientError
+
+
+def test_transient_errors_are_retried():
+    provider = FakeProvider(["ok"], errors=[TransientError("503"), TransientError("429")], backoff=0.01)
+    assert provider.complete([]).text == "ok"
+    assert provider.retries == 2
+    assert len(provider.calls) == 3
+
+
+def test_other_errors_are_not_retried():
+    provider = FakeProvider(["ok"], errors=[ValueError("bad request")], backoff=0.01)
+    with pytest.raises(ProviderError, match="bad request"):
+        provider.complete([])
+    assert provider.retries == 0
+
+
+def test_retries_are_capped():
+    provider = FakeProvider(["ok"], errors=[TransientError("503")] * 3, backoff=0.01, max_retries=2)
+    with pytest.raises(TransientError):
+        provider.complete([])
+    assert provider.retries == 2
+
+
+def test_retry_after_is_honoured():
+    provider = FakeProvider(["ok"], errors=[TransientError("429", retry_after=0.3)], backoff=0.0)
+    start = time.monotonic()
+    assert provider.complete([]).text == "ok"
+    assert time.monotonic() - start >= 0.3
+
+
+def test_retry_after_past_the_deadline_gives_up():
+    provider = FakeProvider(["ok"], errors=[TransientError("429", retry_after=5)], timeout=1)
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        provider.complete([])
+    assert time.monotonic() - start < 1
+
+
+def test_token_bucket_paces_calls():
+    bucket = TokenBucket(rate_per_minute=600, burst=1)
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.18
+
+
+def test_token_bucket_wait_past_the_deadline_raises():
+    bucket = TokenBucket(rate_per_minute=6, burst=1)
+    bucket.acquire()
+    with pytest.raises(DeadlineExceeded):
+        bucket.acquire(deadline=time.monotonic() + 1)
+
+
+def test_limiter_is_applied_to_every_attempt():
+    provider = FakeProvider(["ok"], errors=[TransientError("503")], backoff=0.0,
+                            limiter=TokenBucket(rate_per_minute=600, burst=1))
+    start = time.monotonic()
+    provider.complete([])
+    assert time.monotonic() - start >= 0.09
+
+
+def test_usage_and_retries_are_kept_per_thread():
+    provider = FakeProvider(["ok"], errors=[TransientError("503")], backoff=0.0)
+    provider.complete([])
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append((provider.last_usage, provider.retries)))
+    thread.start()
+    thread.join()
+    assert seen == [({}, 0)]
+    assert provider.retries == 1 and provider.last_usage["completion_tokens"] == 1
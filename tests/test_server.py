@@ -0,0 +1,20 @@
+from mycursor.completion_cache import CompletionCache
+from mycursor.providers import FakeProvider
+from mycursor.server import AgentServer, Session
+from mycursor.tracing import Tracer
+
+
+def test_sessions_share_one_provider_and_no_shell_by_default(workdir):
+    server = AgentServer(root=str(workdir), cache=CompletionCache(enabled=False), tracer=Tracer(None, None))
+    provider = FakeProvider([{"step": "output", "content": "hi"}])
+    server.providers["openai"] = provider
+    agents = [server._create_agent(Session(id, "openai", None)) for id in ("a", "b")]
+    try:
+        assert all(agent.provider.provider is provider for agent in agents)
+        assert "exec_command" not in agents[0].tools and "start_job" not in agents[0].tools
+        assert agents[0].ask("hello") == {"step": "output", "content": "hi"}
+    finally:
+        for agent in agents:
+            agent.close()
+        server.tasks.shutdown()
+        server.tools.shutdown()
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from mycursor.openai_agent import OpenAIAgent
+from mycursor.session_store import SessionStore, list_sessions
+
+
+def fill(store, n):
+    for i in range(n):
+        store.append({"role": "user", "content": f"message {i}"})
+
+
+def contents(messages):
+    return [message["content"] for message in messages]
+
+
+def test_tail_and_since_across_segments(tmp_path):
+    store = SessionStore("s", str(tmp_path), segment_bytes=200, flush_every=1, index_every=4)
+    fill(store, 50)
+    assert len(store.segments) > 1
+    assert contents(store.tail(3)) == ["message 47", "message 48", "message 49"]
+    assert contents(store.since(45)) == [f"message {i}" for i in range(45, 50)]
+    assert len(list(store)) == 50
+    store.close()
+
+    reopened = SessionStore("s", str(tmp_path))
+    assert len(reopened) == 50
+    assert contents(reopened.tail(1)) == ["message 49"]
+    assert list_sessions(str(tmp_path)) == ["s"]
+
+
+def test_buffered_messages_are_counted_and_read(tmp_path):
+    store = SessionStore("s", str(tmp_path), flush_every=100, flush_interval=3600)
+    fill(store, 3)
+    assert len(store) == 3
+    assert contents(store.tail(2)) == ["message 1", "message 2"]
+
+
+def test_unindexed_writes_are_recovered(tmp_path):
+    store = SessionStore("s", str(tmp_path), flush_every=1)
+    fill(store, 2)
+    store.close()
+    # A message written after the last index update, as after a crash.
+    segment = tmp_path / "s" / store.segments[-1]["file"]
+    with open(segment, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"role": "user", "content": "message 2"}) + "\n")
+    assert contents(SessionStore("s", str(tmp_path)).tail(5)) == ["message 0", "message 1", "message 2"]
+
+
+def test_reset_and_readonly(tmp_path):
+    store = SessionStore("s", str(tmp_path), flush_every=1)
+    fill(store, 5)
+    readonly = SessionStore("s", str(tmp_path), readonly=True)
+    assert len(readonly) == 5
+    with pytest.raises(OSError):
+        readonly.append({"role": "user", "content": "x"})
+    assert not (tmp_path / "missing").exists()
+    assert len(SessionStore("missing", str(tmp_path), readonly=True)) == 0
+    assert not (tmp_path / "missing").exists()
+
+    store.reset()
+    assert len(store) == 0
+    assert store.tail(5) == []
+
+
+@pytest.mark.parametrize("name", ["..", ".", "", "/", "../x", "a/b", ".hidden"])
+def test_names_outside_the_root_are_refused(tmp_path, name):
+    with pytest.raises(ValueError):
+        SessionStore(name, str(tmp_path / "sessions"))
+
+
+def test_reset_never_deletes_outside_the_root(tmp_path):
+    (tmp_path / "app.py").write_text("keep me")
+    (tmp_path / "sessions").mkdir()
+    (tmp_path / "sessions" / "link").symlink_to(tmp_path)
+    store = SessionStore("link", str(tmp_path / "sessions"))
+    with pytest.raises(OSError):
+        store.reset()
+    assert (tmp_path / "app.py").read_text() == "keep me"
+
+
+def test_switching_to_an_invalid_session_keeps_the_current_one(make_agent):
+    agent = make_agent(OpenAIAgent, [])
+    assert agent.handle("session ..")
+    assert agent.store.name == "test"
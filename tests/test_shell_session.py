@@ -0,0 +1,42 @@
+import sys
+
+import pytest
+
+from mycursor.shell_session import IS_WINDOWS, BoundedBuffer, ShellSession
+from mycursor.tool_output import OutputBounder, OutputStore
+
+
+def test_bounded_buffer_keeps_the_whole_stream_when_spilling():
+    buffer = BoundedBuffer(10, spill=True)
+    for i in range(100):
+        buffer.write(f"{i}\n")
+    assert buffer.getvalue().startswith("[... ")
+    assert buffer.getvalue(complete=True) == "".join(f"{i}\n" for i in range(100))
+    buffer.close()
+
+
+@pytest.mark.skipif(IS_WINDOWS, reason="uses bash")
+def test_long_output_is_spilled_with_its_head(tmp_path):
+    shell = ShellSession(cwd=tmp_path, buffer_bytes=1024, complete=True)
+    try:
+        result = shell.run(f"{sys.executable} -c \"[print('line', i) for i in range(5000)]\"")
+    finally:
+        shell.close()
+    bounder = OutputBounder(OutputStore(str(tmp_path / "outputs")))
+    stdout = bounder(result)["stdout"]
+    assert stdout["head"].startswith("line 0\nline 1\n")
+    assert stdout["total_lines"] == 5000
+    assert bounder.store.get(stdout["ref"]) == result["stdout"]
+
+
+@pytest.mark.skipif(IS_WINDOWS, reason="uses bash")
+def test_unbalanced_quote_fails_fast_and_keeps_the_shell(tmp_path):
+    shell = ShellSession(cwd=tmp_path)
+    try:
+        shell.run("mkdir sub && cd sub")
+        result = shell.run("echo don't", timeout=10)
+        assert result["exit_code"] != 0 and not result["timed_out"]
+        assert "matching" in result["stderr"]
+        assert shell.run("pwd")["stdout"].strip().endswith("sub")
+    finally:
+        shell.close()
@@ -0,0 +1,69 @@
+import json
+
+from mycursor.step_stream import JSONObjectExtractor, StepStreamParser
+
+
+def feed_chars(parser, text):
+    """Feed one character at a time, the worst case for a streaming parser."""
+    events = []
+    for char in text:
+        events.extend(parser.feed(char))
+    return events
+
+
+def test_batch_steps_and_content_deltas():
+    reply = {"steps": [
+        {"step": "plan", "content": "Write \"app.py\" ✓"},
+        {"step": "action", "function": "edit_file", "input": {"file_name": "a.py", "content": "{[}]"}},
+        {"step": "output", "content": "Done."},
+    ]}
+    parser = StepStreamParser()
+    events = feed_chars(parser, json.dumps(reply))
+    assert parser.steps == reply["steps"]
+    deltas = "".join(text for event, step, text in events if event == "delta" and step == "plan")
+    assert deltas == reply["steps"][0]["content"]
+
+
+def test_independent_action_is_dispatched_before_its_object_closes():
+    text = '{"step": "action", "independent": true, "function": "f", "input": {"a": 1}, "note": "xyz"}'
+    parser = StepStreamParser()
+    for i, char in enumerate(text):
+        if parser.feed(char):
+            break
+    assert i < text.index('"note"') + 1
+    assert parser.steps[0]["independent"] is True
+
+
+def test_trailing_independent_flag_is_kept():
+    text = '{"step": "action", "function": "f", "input": {"a": 1}, "independent": true}'
+    parser = StepStreamParser()
+    feed_chars(parser, text)
+    assert parser.steps == [{"step": "action", "function": "f", "input": {"a": 1}, "independent": True}]
+
+
+def test_extractor_skips_prose_and_fences():
+    text = 'Sure {name}! Here:\n```json\n{"step": "plan", "content": "a } b"}\n```\n{"step": "output", "content": "ok"}'
+    extractor = JSONObjectExtractor()
+    objects = feed_chars(extractor, text)
+    objects.extend(extractor.close())
+    assert objects == [{"step": "plan", "content": "a } b"}, {"step": "output", "content": "ok"}]
+
+
+def test_extractor_recovers_an_object_after_an_unbalanced_brace():
+    extractor = JSONObjectExtractor()
+    objects = extractor.feed('oops { {"step": "output", "content": "ok"}')
+    objects += extractor.close()
+    assert objects == [{"step": "output", "content": "ok"}]
+
+
+def test_extractor_recovers_an_object_inside_prose_braces():
+    extractor = JSONObjectExtractor()
+    objects = extractor.feed('{see {"step": "output", "content": "{ok}"} here}')
+    assert objects == [{"step": "output", "content": "{ok}"}]
+
+
+def test_extractor_handles_deep_unbalanced_input():
+    extractor = JSONObjectExtractor()
+    assert extractor.feed("{a " * 5000 + "}" * 5000) == []
+    assert extractor.feed("{" * 5000) == []
+    assert extractor.close() == []
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from mycursor.tool_executor import ToolExecutor
+
+
+def sleeper(state, lock):
+    def sleep(seconds):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(float(seconds))
+        with lock:
+            state["running"] -= 1
+        return f"slept {seconds}"
+
+    return sleep
+
+
+def test_concurrency_limit_is_respected():
+    state, lock = {"running": 0, "peak": 0}, threading.Lock()
+    executor = ToolExecutor({"sleep": {"fn": sleeper(state, lock), "concurrency": 2, "timeout": 5}})
+    try:
+        actions = [{"function": "sleep", "input": 0.1, "independent": True} for _ in range(6)]
+        observations = executor.run(actions)
+    finally:
+        executor.shutdown()
+    assert [o["output"] for o in observations] == ["slept 0.1"] * 6
+    assert state["peak"] == 2
+
+
+def test_a_call_that_overruns_its_timeout_is_reported():
+    executor = ToolExecutor({"sleep": {"fn": lambda s: time.sleep(float(s)), "timeout": 0.2}})
+    try:
+        start = time.monotonic()
+        [observation] = executor.run([{"function": "sleep", "input": 1}])
+    finally:
+        executor.shutdown()
+    assert "timed out after 0.2s" in observation["output"]
+    assert time.monotonic() - start < 0.8
+
+
+def test_a_queued_call_that_cannot_start_in_time_is_dropped():
+    release, ran = threading.Event(), []
+
+    def hang(label):
+        ran.append(label)
+        release.wait(5)
+        return label
+
+    executor = ToolExecutor({"hang": {"fn": hang, "concurrency": 1, "timeout": 0.2}})
+    try:
+        observations = executor.run([
+            {"function": "hang", "input": "first", "independent": True},
+            {"function": "hang", "input": "second", "independent": True},
+        ])
+        release.set()
+        time.sleep(0.2)
+    finally:
+        executor.shutdown()
+    assert "timed out" in observations[0]["output"]
+    assert "did not start within 0.2s" in observations[1]["output"]
+    assert ran == ["first"]
+
+
+def test_observations_come_back_in_the_listed_order():
+    executor = ToolExecutor({"sleep": {"fn": lambda s: time.sleep(float(s)) or s, "concurrency": 4, "timeout": 5}})
+    try:
+        delays = [0.15, 0.0, 0.1, 0.05]
+        actions = [{"function": "sleep", "input": d, "independent": True} for d in delays]
+        actions.insert(2, {"function": "missing", "input": ""})
+        observations = executor.run(actions)
+    finally:
+        executor.shutdown()
+    assert [o["output"] for o in observations] == [0.15, 0.0, "Function 'missing' not found.", 0.1, 0.05]
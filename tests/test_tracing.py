@@ -0,0 +1,12 @@
+from mycursor.tracing import Tracer
+
+
+def test_summary_keeps_a_bounded_window_per_stage():
+    tracer = Tracer(None, None, window=100)
+    for i in range(1000):
+        tracer.record("tool", i / 1000)
+    assert len(tracer.durations["tool"]) == 100
+    assert tracer.counts["tool"] == 1000
+    line = tracer.summary().splitlines()[1]
+    assert line.split()[:2] == ["tool", "1000"]
+    assert min(tracer.durations["tool"]) == 0.9
@@ -0,0 +1,24 @@
+from mycursor.workspace import READ_MAX_BYTES, WorkspaceIndex, build_read_tools
+
+
+def silent(*args, **kwargs):
+    pass
+
+
+def test_read_file_cuts_an_over_long_line(tmp_path):
+    (tmp_path / "big.js").write_text("var a='" + "é" * 250_000 + "';\nvar b=1;\n", encoding="utf-8")
+    read_file, _, _ = build_read_tools(WorkspaceIndex(str(tmp_path)), echo=silent)
+    page = read_file(str(tmp_path / "big.js"))
+    assert len(page.encode("utf-8")) < READ_MAX_BYTES + 200
+    assert "�" not in page
+    cut = int(page.rsplit("start_byte ", 1)[1].rstrip("."))
+    rest = read_file({"file_name": str(tmp_path / "big.js"), "start_byte": cut})
+    assert rest.startswith("é")
+
+
+def test_find_symbol_cuts_minified_code(tmp_path):
+    (tmp_path / "app.min.js").write_text("function f(){return '" + "x" * 100_000 + "'}\n")
+    _, _, find_symbol = build_read_tools(WorkspaceIndex(str(tmp_path)), echo=silent)
+    source = find_symbol({"name": "f", "file_name": str(tmp_path / "app.min.js")})
+    assert len(source) < READ_MAX_BYTES + 200
+    assert "start_byte" in source